@@ -0,0 +1,148 @@
+# app/__init__.py
+"""
+create_app() builds the Flask app. The modules of this package each hold one subsystem and
+register their routes, error handlers and CLI commands on one blueprint (extensions.bp).
+Importing the package builds no app, opens no connection and creates no table (see `flask init-db`).
+"""
+from flask import Flask, current_app
+from flask_cors import CORS
+from werkzeug.security import generate_password_hash
+import copy
+import os
+
+import click
+from sqlalchemy import event
+
+from .cache import MemoryCache
+from .config import BASE_DIR, CONFIGS, DEFAULT_CONFIG, SQLITE_PROFILES
+from .events import MemoryBroker
+from .extensions import bp, db
+from .history import attach_archives
+from .instrumentation import enable_instrumentation
+from .matching import MatchingEngine
+from .metrics import PLATFORM_KEY, rebuild_summaries
+from .migrations import migrate
+from .models import DonorProfile, NPOProfile, PlatformSummary, User
+from .outbox import NotificationWorker, default_sinks
+from .rows import default_rows_encoder
+from .writes import WriteQueue
+# every module with routes, error handlers or CLI commands registers them on bp when imported
+from . import (analytics, archive, auth, dashboards, donations, events, export, feedback, frontend,  # noqa: F401
+               inventory, matching, metrics, migrations, pickups, rollups, routing, search)
+
+
+# -----------------------------
+# Database engines
+# -----------------------------
+def configure_sqlite_engine(engine, pragmas, begin_mode, read_only=False):
+    """Apply pragmas on connect and take over BEGIN from pysqlite so begin_mode is honoured."""
+    if read_only:
+        # journal_mode needs a write; query_only guards against accidental writes
+        pragmas = {k: v for k, v in pragmas.items() if k != 'journal_mode'}
+        pragmas['query_only'] = 'ON'
+        begin_mode = 'DEFERRED'
+
+    @event.listens_for(engine, 'connect')
+    def on_connect(dbapi_conn, connection_record):
+        dbapi_conn.isolation_level = None  # SQLAlchemy emits BEGIN itself, below
+        cursor = dbapi_conn.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+        cursor.close()
+
+    @event.listens_for(engine, 'begin')
+    def on_begin(conn):
+        conn.exec_driver_sql(f"BEGIN {begin_mode}")
+
+    @event.listens_for(engine, 'checkout')
+    def on_checkout(dbapi_conn, connection_record, connection_proxy):
+        attach_archives(dbapi_conn, connection_record.info)
+
+
+def configure_engines():
+    pragmas = {**SQLITE_PROFILES[current_app.config['SQLITE_PROFILE']], **current_app.config['SQLITE_PRAGMAS']}
+    for name, engine in db.engines.items():
+        configure_sqlite_engine(engine, pragmas, current_app.config['SQLITE_BEGIN_MODE'], read_only=(name == 'replica'))
+
+
+# -----------------------------
+# Database initialization and seed
+# -----------------------------
+def init_db(seed=True):
+    db.create_all()
+    migrate()
+    if not PlatformSummary.query.get(PLATFORM_KEY['summary_id']):
+        # first start on an existing database: backfill the summaries once
+        rebuild_summaries()
+    if seed:
+        if not User.query.filter_by(email='admin@example.com').first():
+            admin = User(
+                name='Admin User',
+                email='admin@example.com',
+                password_hash=generate_password_hash('admin123'),
+                role='admin'
+            )
+            db.session.add(admin)
+            # create small seed donor + npo so metrics can be tested
+            donor_user = User(name='Seed Donor', email='donor@example.com', password_hash=generate_password_hash('donor123'), role='donor')
+            npo_user = User(name='Seed NPO', email='npo@example.com', password_hash=generate_password_hash('npo123'), role='npo')
+            db.session.add_all([donor_user, npo_user])
+            db.session.flush()  # get ids
+            donor_profile = DonorProfile(donor_store_id=donor_user.user_id, first_name='Seed', last_name='Donor', email=donor_user.email)
+            npo_profile = NPOProfile(npo_id=npo_user.user_id, npo_name='Seed NPO', email=npo_user.email)
+            db.session.add_all([donor_profile, npo_profile])
+            db.session.commit()
+
+
+@bp.cli.command('init-db')
+@click.option('--seed/--no-seed', default=True, help="Also create the admin, sample donor and sample NPO accounts.")
+def init_db_command(seed):
+    """Create missing tables, apply migrations, backfill summaries and seed the default accounts."""
+    init_db(seed=seed)
+    click.echo("Database initialised." + (" Default accounts are in place." if seed else ""))
+
+
+# -----------------------------
+# Application factory
+# -----------------------------
+def create_app(config=None, **overrides):
+    """
+    Build an app bound to its own database; returns the app.
+    config names a CONFIGS preset (default APP_CONFIG, else 'production'), and overrides
+    are settings on top of it, e.g. create_app('testing', DATABASE_PATH=path).
+    Nothing is connected or created here: engines open connections on first use and the
+    schema is left to `flask init-db`. Each app gets its own cache, broker, write queue,
+    notification workers and matching index, so a process can hold several (e.g. in tests).
+    """
+    app = Flask(__name__, root_path=BASE_DIR, static_folder="static", template_folder="templates")
+    app.config.update(copy.deepcopy(DEFAULT_CONFIG))
+    app.config.update(CONFIGS[config or os.environ.get('APP_CONFIG', 'production')], **overrides)
+    path = app.config['DATABASE_PATH']
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{path}"
+    if app.config['SQLITE_READ_REPLICA']:
+        app.config['SQLALCHEMY_BINDS'] = {'replica': {'url': f"sqlite:///file:{path}?mode=ro&uri=true", 'pool_size': 10}}
+
+    db.init_app(app)
+    CORS(app)
+    app.register_blueprint(bp)
+    app.extensions.update(
+        rows_encoder=app.config['JSON_ROWS_ENCODER'] or default_rows_encoder(),
+        response_cache=app.config['RESPONSE_CACHE_BACKEND'] or MemoryCache(app.config['RESPONSE_CACHE_MAX_ENTRIES'], app.config['RESPONSE_CACHE_TTL']),
+        event_broker=app.config['EVENT_BROKER'] or MemoryBroker(app.config['EVENT_BUFFER']),
+        notification_sinks=app.config['NOTIFY_SINKS'] or default_sinks(),
+        write_queue=WriteQueue(app),
+        notification_worker=NotificationWorker(app),
+        matching_engine=MatchingEngine(),
+    )
+    # relationship setup would otherwise land on the first ORM query; preloaded, it is done once for every worker
+    db.configure_mappers()
+    with app.app_context():
+        configure_engines()
+        engines = list(db.engines.values())
+    if app.config['METRICS_ENABLED']:
+        enable_instrumentation(app, engines)
+    if hasattr(os, 'register_at_fork'):
+        # a worker forked from a preloaded app (gunicorn --preload) must not share the parent's
+        # pooled SQLite connections: drop them, without closing them under the parent, and open its own
+        os.register_at_fork(after_in_child=lambda: [engine.dispose(close=False) for engine in engines])
+    return app
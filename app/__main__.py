@@ -0,0 +1,8 @@
+# app/__main__.py
+"""Development server: python -m app (debugger and reloader; creates and seeds the database on every start)."""
+from . import create_app, init_db
+
+app = create_app('development')
+with app.app_context():
+    init_db(seed=True)
+app.run()
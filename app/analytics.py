@@ -0,0 +1,311 @@
+# app/analytics.py
+from flask import current_app, request, jsonify
+from datetime import datetime
+import json
+import os
+import re
+
+import click
+
+from .extensions import bp, db
+from .helpers import json_error, parse_iso_datetime
+from .history import ARCHIVED_MODELS, history_sources
+from .models import (DistributionCenter, DonationItem, DonationRecord, DonorProfile, FeedbackReview, NPOProfile, Pickup,
+                     SortingRecord)
+from .rows import table_columns
+
+
+# -----------------------------
+# Analytics (columnar snapshots)
+# -----------------------------
+# Reports run on pandas frames loaded from snapshot files, never on the live database.
+# `flask analytics-refresh` (cron, off-peak) reads rows above each table's primary-key
+# watermark in chunks and appends them to the table's snapshot. A snapshot is one .npy file
+# per column in <ANALYTICS_DIR>/<table>.<generation>/ plus <table>.json, which names the
+# current generation. Readers memory-map the files, so workers share one copy in the page
+# cache. Integer NULLs are stored as 0, and text columns as categorical codes whose
+# categories live in the JSON. pandas and numpy are imported lazily, so only analytics pays for them.
+# table -> (model, {column: kind}, incremental); non-incremental tables are small and re-read whole
+ANALYTICS_TABLES = {
+    'donations': (DonationRecord, {'donation_id': 'int32', 'donor_store_id': 'int32', 'npo_id': 'int32', 'donation_date': 'datetime',
+                                   'donation_amount': 'float64', 'donation_type': 'category'}, True),
+    'donation_items': (DonationItem, {'item_id': 'int32', 'donation_id': 'int32', 'item_name': 'category',
+                                      'item_quantity': 'int32', 'item_value': 'float64'}, True),
+    'pickups': (Pickup, {'pickup_id': 'int32', 'donor_store_id': 'int32', 'scheduled_date': 'datetime', 'status': 'category'}, True),
+    'feedback': (FeedbackReview, {'review_id': 'int32', 'donor_store_id': 'int32', 'npo_id': 'int32', 'rating': 'int8',
+                                  'review_date': 'datetime'}, True),
+    'sorting': (SortingRecord, {'sorting_id': 'int32', 'center_id': 'int32', 'sorted_category': 'category',
+                                'sorted_quantity': 'int32', 'sorted_date': 'datetime'}, True),
+    'donors': (DonorProfile, {'donor_store_id': 'int32', 'city': 'category', 'state': 'category'}, False),
+    'npos': (NPOProfile, {'npo_id': 'int32', 'npo_name': 'category', 'city': 'category'}, False),
+    'centers': (DistributionCenter, {'center_id': 'int32', 'center_name': 'category', 'city': 'category'}, False),
+}
+_analytics_frames = {}  # snapshot .json path -> (its mtime, frame, meta) as last loaded
+
+
+class SnapshotMissing(Exception):
+    pass
+
+
+def analytics_dir():
+    return current_app.config['ANALYTICS_DIR'] or os.path.join(os.path.dirname(os.path.abspath(current_app.config['DATABASE_PATH'])), 'analytics')
+
+
+def _analytics_meta(table):
+    try:
+        with open(os.path.join(analytics_dir(), f"{table}.json"), encoding='utf-8') as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return None
+
+
+def _analytics_columns(meta):
+    """The snapshot's columns as arrays memory-mapped from its files."""
+    import numpy as np
+    directory = os.path.join(analytics_dir(), f"{meta['table']}.{meta['generation']}")
+    return {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r') for name in meta['columns']}
+
+
+def _analytics_arrays(chunk, columns, categories):
+    """One read_sql chunk as numpy arrays of each column's kind; new text values extend categories."""
+    import numpy as np
+    import pandas as pd
+    arrays = {}
+    for name, kind in columns.items():
+        values = chunk[name]
+        if kind == 'datetime':
+            arrays[name] = pd.to_datetime(values, format='ISO8601', errors='coerce').to_numpy('datetime64[s]')
+        elif kind == 'category':
+            known = categories[name]
+            seen = set(known)
+            known.extend(v for v in values.dropna().unique() if v not in seen)  # codes already written never change
+            arrays[name] = pd.Categorical(values, categories=known).codes.astype(np.int32)
+        else:
+            values = pd.to_numeric(values, errors='coerce')
+            arrays[name] = (values if kind == 'float64' else values.fillna(0)).to_numpy(kind)
+    return arrays
+
+
+def refresh_analytics(rebuild=False):
+    """
+    Append rows above each table's watermark to its snapshot (every row with rebuild, archives
+    included); returns {table: rows read}. All tables are read in one transaction, so the
+    snapshots agree with each other. Edits to rows already in a snapshot only show after a rebuild.
+    """
+    import numpy as np
+    import pandas as pd
+    os.makedirs(analytics_dir(), exist_ok=True)
+    conn = db.session.connection()
+    read = {}
+    try:
+        for table, (model, columns, incremental) in ANALYTICS_TABLES.items():
+            current = _analytics_meta(table)
+            base = current if incremental and not rebuild else None
+            pk = model.__mapper__.primary_key[0].name
+            watermark = base['watermark'] if base else 0
+            categories = {name: list(base['categories'][name]) if base else [] for name, kind in columns.items() if kind == 'category'}
+            chunks = []
+            for entity, criteria in history_sources(model, model in ARCHIVED_MODELS):
+                t = db.inspect(entity).selectable
+                stmt = db.select(*table_columns(entity, *columns)).where(t.c[pk] > watermark, *criteria).order_by(t.c[pk])
+                for chunk in pd.read_sql(stmt, conn, chunksize=current_app.config['ANALYTICS_CHUNK_ROWS']):
+                    chunks.append(_analytics_arrays(chunk, columns, categories))
+            read[table] = sum(len(chunk[pk]) for chunk in chunks)
+            if base and not read[table]:
+                continue
+            if base:
+                chunks.insert(0, _analytics_columns(base))
+            arrays = {name: np.concatenate([chunk[name] for chunk in chunks]) if chunks else np.empty(0, _analytics_dtype(kind))
+                      for name, kind in columns.items()}
+            _write_snapshot(table, arrays, {
+                'table': table,
+                'generation': (current['generation'] if current else 0) + 1,
+                'watermark': int(arrays[pk].max(initial=watermark)),
+                'rows': len(arrays[pk]),
+                'refreshed_at': datetime.utcnow().isoformat(timespec='seconds'),
+                'columns': columns,
+                'categories': categories,
+            })
+    finally:
+        db.session.rollback()  # end the read transaction
+    return read
+
+
+def _analytics_dtype(kind):
+    return {'datetime': 'datetime64[s]', 'category': 'int32'}.get(kind, kind)
+
+
+def _write_snapshot(table, arrays, meta):
+    """Write a new generation of table's snapshot, switch <table>.json to it, then drop all but the previous generation."""
+    import numpy as np
+    directory = analytics_dir()
+    generation_dir = os.path.join(directory, f"{table}.{meta['generation']}")
+    os.makedirs(generation_dir, exist_ok=True)
+    for name, values in arrays.items():
+        np.save(os.path.join(generation_dir, f"{name}.npy"), values)
+    path = os.path.join(directory, f"{table}.json")
+    with open(path + '.tmp', 'w', encoding='utf-8') as fh:
+        json.dump(meta, fh, separators=(',', ':'))
+    os.replace(path + '.tmp', path)
+    # readers that loaded the previous generation's JSON may not have opened its files yet
+    pattern = re.compile(rf"^{re.escape(table)}\.(\d+)$")
+    for name in os.listdir(directory):
+        m = pattern.match(name)
+        if m and int(m.group(1)) < meta['generation'] - 1:
+            for filename in os.listdir(os.path.join(directory, name)):
+                os.remove(os.path.join(directory, name, filename))
+            os.rmdir(os.path.join(directory, name))
+
+
+def analytics_frame(table):
+    """
+    (frame, meta) of table's snapshot, loaded again only when a refresh has replaced it.
+    Raises SnapshotMissing before the first `flask analytics-refresh`.
+    """
+    import pandas as pd
+    path = os.path.join(analytics_dir(), f"{table}.json")
+    try:
+        stamp = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        raise SnapshotMissing(f"no analytics snapshot of {table}: run `flask analytics-refresh`") from None
+    cached = _analytics_frames.get(path)
+    if cached and cached[0] == stamp:
+        return cached[1], cached[2]
+    meta = _analytics_meta(table)
+    data = _analytics_columns(meta)
+    for name, kind in meta['columns'].items():
+        if kind == 'category':
+            data[name] = pd.Categorical.from_codes(data[name], categories=meta['categories'][name])
+    frame = pd.DataFrame(data, copy=False)
+    _analytics_frames[path] = (stamp, frame, meta)
+    return frame, meta
+
+
+@bp.cli.command('analytics-refresh')
+@click.option('--rebuild', is_flag=True, help="Re-read every row (archives included) instead of only new ones.")
+def analytics_refresh_command(rebuild):
+    """Bring the analytics snapshots up to date with the database (run off-peak)."""
+    for table, rows in refresh_analytics(rebuild).items():
+        click.echo(f"{table}: {rows} row(s) read.")
+
+
+def _in_period(frame, column, since=None, until=None):
+    if since is not None:
+        frame = frame[frame[column] >= since]
+    if until is not None:
+        frame = frame[frame[column] < until]
+    return frame
+
+
+def _report_rows(frame):
+    """A report frame as JSON-ready dicts: plain Python scalars, None for missing values."""
+    frame = frame.reset_index()
+    return frame.astype(object).where(frame.notna(), None).to_dict('records')
+
+
+def _donated(donations):
+    """Donations without NPO requests, as the KPIs count them."""
+    return donations[donations['donation_type'] != 'request']
+
+
+def _with_line_value(items):
+    """items with item_value as the line's value (unit value x quantity), as the KPIs sum it."""
+    return items.assign(item_value=items['item_value'] * items['item_quantity'])
+
+
+def donations_by_city(donations, items, donors, since=None, until=None, limit=None):
+    """Donations, amount donated, items donated and their value per donor city, busiest first. Requests are left out."""
+    donations = _in_period(_donated(donations), 'donation_date', since, until)
+    donations = donations.assign(city=donations['donor_store_id'].map(donors.set_index('donor_store_id')['city']))
+    per_city = donations.groupby('city', observed=True, dropna=False).agg(
+        donations=('donation_id', 'size'), donation_amount=('donation_amount', 'sum'))
+    items = _with_line_value(items).merge(donations[['donation_id', 'city']], on='donation_id')
+    per_city = per_city.join(items.groupby('city', observed=True, dropna=False).agg(
+        items=('item_quantity', 'sum'), item_value=('item_value', 'sum')))
+    per_city = per_city.fillna({'items': 0, 'item_value': 0}).astype({'items': 'int64'}).round(2)
+    return _report_rows(per_city.sort_values('donations', ascending=False).head(limit))
+
+
+def categories_by_center(sorting, centers, since=None, until=None, limit=None):
+    """Quantity sorted into each category at each center, largest first within a center."""
+    sorting = _in_period(sorting, 'sorted_date', since, until)
+    per_category = sorting.groupby(['center_id', 'sorted_category'], observed=True).agg(
+        records=('sorting_id', 'size'), quantity=('sorted_quantity', 'sum')).reset_index()
+    per_category = per_category.merge(centers[['center_id', 'center_name']], on='center_id', how='left')
+    per_category = per_category.sort_values(['center_id', 'quantity'], ascending=[True, False])
+    per_category['center_id'] = per_category['center_id'].where(per_category['center_id'] > 0).astype('Int64')  # 0: no center
+    return _report_rows(per_category.set_index('center_id').head(limit))
+
+
+def ratings_by_npo(feedback, npos, since=None, until=None, limit=None):
+    """Per reviewed NPO: review count, average rating and how many reviews gave each rating."""
+    import numpy as np
+    feedback = _in_period(feedback, 'review_date', since, until)
+    feedback = feedback[(feedback['npo_id'] > 0) & feedback['rating'].between(1, 5)]
+    counts = feedback.groupby(['npo_id', 'rating']).size().unstack(fill_value=0).reindex(columns=range(1, 6), fill_value=0)
+    reviews = counts.sum(axis=1)
+    out = counts.index.to_frame(index=False).merge(npos[['npo_id', 'npo_name']], on='npo_id', how='left')
+    out['reviews'] = reviews.to_numpy()
+    out['average_rating'] = np.round(counts.to_numpy() @ np.arange(1, 6) / reviews.to_numpy(), 2)
+    rows = _report_rows(out.set_index('npo_id'))
+    for row, distribution in zip(rows, counts.to_numpy().tolist()):
+        row['ratings'] = dict(zip(map(str, range(1, 6)), distribution))
+    rows.sort(key=lambda row: row['reviews'], reverse=True)
+    return rows[:limit]
+
+
+def pickups_by_month(pickups, since=None, until=None, limit=None):
+    """Pickups per scheduled month, split by status, oldest month first."""
+    import numpy as np
+    pickups = _in_period(pickups, 'scheduled_date', since, until)
+    months = np.datetime_as_string(pickups['scheduled_date'].to_numpy().astype('datetime64[M]'))
+    counts = pickups.assign(month=months).groupby(['month', 'status'], observed=True).size().unstack(fill_value=0)
+    rows = [{"month": month, "pickups": sum(by_status.values()), "by_status": by_status}
+            for month, by_status in zip(counts.index, counts.to_dict('records'))]
+    return rows[-limit:] if limit else rows
+
+
+def top_items(items, donations, since=None, until=None, limit=20):
+    """Most donated item names by quantity, with the donations they came in and their value. Requests are left out."""
+    items = _with_line_value(items).merge(_in_period(_donated(donations), 'donation_date', since, until)[['donation_id']], on='donation_id')
+    per_item = items.groupby('item_name', observed=True).agg(
+        donations=('donation_id', 'nunique'), quantity=('item_quantity', 'sum'), value=('item_value', 'sum'))
+    return _report_rows(per_item.nlargest(limit or 20, 'quantity').round(2))
+
+
+# report -> (function, snapshots it takes, in order)
+ANALYTICS_REPORTS = {
+    'donations-by-city': (donations_by_city, ('donations', 'donation_items', 'donors')),
+    'categories-by-center': (categories_by_center, ('sorting', 'centers')),
+    'ratings-by-npo': (ratings_by_npo, ('feedback', 'npos')),
+    'pickups-by-month': (pickups_by_month, ('pickups',)),
+    'top-items': (top_items, ('donation_items', 'donations')),
+}
+
+
+@bp.route('/api/analytics/<report>', methods=['GET'])
+def analytics_report(report):
+    """
+    A report computed from the analytics snapshots; it never queries the database.
+    Query: since?, until? (ISO dates, on the report's date column), limit? (rows; top-items defaults to 20)
+    Returns { report, refreshed_at (of the oldest snapshot used), rows }.
+    """
+    if report not in ANALYTICS_REPORTS:
+        return json_error(f"Unknown report. Allowed: {', '.join(ANALYTICS_REPORTS)}", 404)
+    since, until = request.args.get('since'), request.args.get('until')
+    try:
+        since, until = since and parse_iso_datetime(since), until and parse_iso_datetime(until)
+    except ValueError:
+        return json_error("since/until must be ISO format (YYYY-MM-DD or full ISO datetime)", 400)
+    limit = request.args.get('limit', type=int)
+    limit = limit and min(max(limit, 1), 1000)
+
+    function, tables = ANALYTICS_REPORTS[report]
+    try:
+        snapshots = [analytics_frame(table) for table in tables]
+    except SnapshotMissing as exc:
+        return json_error(str(exc), 503)
+    rows = function(*(frame for frame, _ in snapshots), since=since or None, until=until or None, limit=limit)
+    response = jsonify({"report": report, "refreshed_at": min(meta['refreshed_at'] for _, meta in snapshots), "rows": rows})
+    response.add_etag()  # unchanged until the next refresh
+    return response.make_conditional(request)
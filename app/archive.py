@@ -0,0 +1,132 @@
+# app/archive.py
+from flask import current_app
+from collections import Counter
+from datetime import datetime, timedelta
+
+import click
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from .extensions import bp, db
+from .history import archive_table, ensure_archive
+from .models import (CollectedItem, DeliveryConfirmation, DeliveryRoute, DistributedItem, DonationItem, DonationRecord,
+                     Pickup, RequestAllocation, RollupWatermark)
+from .rollups import refresh_rollups
+from .search import SEARCH_TYPES
+from .writes import run_write
+
+
+# -----------------------------
+# Archive (cold history)
+# -----------------------------
+# `flask archive` moves finished rows into the yearly files of history.py: per table and
+# year, short batches that copy rows into the archive and then delete them from the hot table.
+def _rolled_up(model):
+    """Rows the rollups have folded in already; archiving a newer one would drop it from the KPIs."""
+    pk = model.__mapper__.primary_key[0]
+    last_id = db.select(RollupWatermark.last_id).where(RollupWatermark.source == model.__tablename__).scalar_subquery()
+    return pk <= db.func.coalesce(last_id, 0)
+
+
+def _archive_plan():
+    """(model, date column, extra criteria, [(child model, its key to the row)]) for every archived table."""
+    return [
+        # requests stay hot: the matching engine works from their open lines
+        (DonationRecord, DonationRecord.donation_date,
+         [DonationRecord.donation_type != 'request', _rolled_up(DonationRecord),
+          ~db.select(DonationItem.item_id).where(DonationItem.donation_id == DonationRecord.donation_id, ~_rolled_up(DonationItem)).exists()],
+         [(DonationItem, DonationItem.donation_id)]),
+        # finished pickups that no collection or planned run points at
+        (Pickup, Pickup.scheduled_date,
+         [Pickup.status.in_(('Completed', 'Cancelled')), _rolled_up(Pickup),
+          ~db.select(CollectedItem.collected_item_id).where(CollectedItem.pickup_id == Pickup.pickup_id).exists(),
+          ~db.select(DeliveryRoute.route_id).where(DeliveryRoute.pickup_id == Pickup.pickup_id).exists()],
+         []),
+        # deliveries go with their routes and confirmations; ones a request allocation names stay hot
+        (DistributedItem, DistributedItem.distribution_date,
+         [_rolled_up(DistributedItem),
+          ~db.select(RequestAllocation.allocation_id).where(RequestAllocation.distribution_id == DistributedItem.distribution_id).exists()],
+         [(DeliveryRoute, DeliveryRoute.distribution_id), (DeliveryConfirmation, DeliveryConfirmation.distribution_id)]),
+    ]
+
+
+def _archive_batch(model, date_col, criteria, children, start, end, schema, limit):
+    """Move up to `limit` rows of model dated in [start, end), with their children, into `schema`. Returns (rows copied, {table: rows deleted})."""
+    pk = model.__mapper__.primary_key[0]
+
+    def copy():
+        # the highest id stays hot, or SQLite (without AUTOINCREMENT) would hand it out again
+        top = db.session.query(db.func.max(pk)).scalar()
+        ids = db.session.scalars(db.select(pk).where(date_col >= start, date_col < end, pk < top, *criteria)
+                                 .order_by(pk).limit(limit)).all()
+        for m, key in [(model, pk)] + children:
+            source = m.__table__
+            db.session.execute(sqlite_insert(archive_table(m, schema)).prefix_with('OR REPLACE')
+                               .from_select([c.name for c in source.columns], db.select(*source.columns).where(key.in_(ids))))
+        return ids
+
+    def delete(ids):
+        # only what the archive now holds; children first, so the parent's ON DELETE CASCADE finds nothing
+        deleted = Counter()
+        for m, key in children + [(model, pk)]:
+            m_pk = m.__mapper__.primary_key[0]
+            archived = archive_table(m, schema).alias('archived')  # same table name as the hot one: keep them apart
+            stmt = db.delete(m.__table__).where(key.in_(ids), db.select(archived.c[m_pk.name]).where(archived.c[m_pk.name] == m_pk).exists())
+            for _, child_key in (children if m is model else []):
+                # a child added since the copy keeps its parent hot until the next run
+                stmt = stmt.where(~db.select(child_key).where(child_key == pk).exists())
+            deleted[m.__tablename__] += db.session.execute(stmt).rowcount
+        return deleted
+
+    ids = run_write(copy)
+    return len(ids), (run_write(lambda: delete(ids)) if ids else Counter())
+
+
+def archive_history(before=None, limit=None):
+    """
+    Move finished rows dated before `before` (default ARCHIVE_AFTER_DAYS ago) into the yearly archives.
+    Each batch is two short write transactions, copy then delete, so a crash in between leaves
+    a row in both places (reads skip the archived copy; the next run finishes the move), never in neither.
+    Returns {table: rows moved}.
+    """
+    before = before or datetime.utcnow() - timedelta(days=current_app.config['ARCHIVE_AFTER_DAYS'])
+    limit = limit or current_app.config['ARCHIVE_BATCH']
+    refresh_rollups()
+    moved = Counter()
+    for model, date_col, criteria, children in _archive_plan():
+        first = db.session.query(date_col).filter(date_col < before, *criteria).order_by(date_col).limit(1).scalar()
+        db.session.rollback()
+        if first is None:
+            continue
+        for year in range(first.year, before.year + 1):
+            start, end = datetime(year, 1, 1), min(datetime(year + 1, 1, 1), before)
+            if not db.session.query(date_col).filter(date_col >= start, date_col < end, *criteria).limit(1).all():
+                continue
+            db.session.rollback()  # the archive is attached when the next transaction checks out a connection
+            ensure_archive(year)
+            while True:
+                copied, deleted = _archive_batch(model, date_col, criteria, children, start, end, f"archive_{year}", limit)
+                moved.update(deleted)
+                if copied < limit or not deleted[model.__tablename__]:
+                    break
+
+    def merge_search_indexes():
+        # each archived row left a delete marker in its FTS index; merge them away so searches stay fast
+        for fts, model, *_ in SEARCH_TYPES.values():
+            if moved[model.__tablename__]:
+                db.session.execute(db.text(f"INSERT INTO {fts} ({fts}) VALUES ('optimize')"))
+    if moved:
+        run_write(merge_search_indexes)
+    return dict(moved)
+
+
+@bp.cli.command('archive')
+@click.option('--days', type=int, default=None, help="Archive rows older than this many days (default ARCHIVE_AFTER_DAYS).")
+@click.option('--batch', type=int, default=None, help="Rows per transaction (default ARCHIVE_BATCH).")
+def archive_command(days, batch):
+    """Move finished history out of the hot tables into the yearly archive files."""
+    before = datetime.utcnow() - timedelta(days=days) if days is not None else None
+    moved = archive_history(before, batch)
+    for table, n in moved.items():
+        click.echo(f"{table}: {n} row(s) archived")
+    if not moved:
+        click.echo("Nothing to archive.")
@@ -0,0 +1,239 @@
+# app/auth.py
+from flask import current_app, g, request, jsonify
+from werkzeug.security import generate_password_hash, check_password_hash
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+import functools
+import os
+import threading
+import time
+
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+from .extensions import bp, db
+from .helpers import json_error
+from .models import DonorProfile, NPOProfile, User
+from .writes import run_write
+
+
+# -----------------------------
+# Auth / User endpoints
+# -----------------------------
+# Password hashing is deliberately slow, so it runs on a small bounded pool: a login burst
+# queues there (or gets a 503) instead of tying up every request worker's CPU. hashlib's
+# pbkdf2/scrypt release the GIL, so the pool threads really run in parallel.
+_password_pool = None
+_password_pool_pid = None
+_password_pending = 0
+_password_lock = threading.Lock()
+_login_attempts = defaultdict(deque)  # normalised email -> monotonic attempt times
+_login_lock = threading.Lock()
+
+
+class PasswordPoolBusy(Exception):
+    pass
+
+
+def _release_password_slot(future=None):
+    global _password_pending
+    with _password_lock:
+        _password_pending -= 1
+
+
+def run_password_job(fn, *args):
+    """
+    Run generate/check_password_hash on the bounded pool. Raises PasswordPoolBusy when saturated.
+    A job holds its slot until it finishes or is cancelled, not just while its caller waits,
+    so callers that time out can't let the queue grow past PASSWORD_QUEUE_LIMIT.
+    """
+    global _password_pool, _password_pool_pid, _password_pending
+    with _password_lock:
+        if _password_pool is None or _password_pool_pid != os.getpid():
+            # created lazily, and again after a fork: executor threads do not survive fork
+            _password_pool = ThreadPoolExecutor(current_app.config['PASSWORD_WORKERS'], thread_name_prefix='password')
+            _password_pool_pid = os.getpid()
+            _password_pending = 0  # the parent's jobs never finish here
+        if _password_pending >= current_app.config['PASSWORD_QUEUE_LIMIT']:
+            raise PasswordPoolBusy()
+        _password_pending += 1
+        pool = _password_pool
+    try:
+        future = pool.submit(fn, *args)
+    except BaseException:
+        _release_password_slot()
+        raise
+    future.add_done_callback(_release_password_slot)
+    try:
+        return future.result(timeout=current_app.config['PASSWORD_TIMEOUT'])
+    except FutureTimeout:
+        future.cancel()  # still queued: never runs; already running: frees its slot when done
+        raise PasswordPoolBusy()
+
+
+def login_retry_after(email):
+    """Record a login attempt; returns seconds to wait if the account is over its attempt budget, else 0."""
+    now = time.monotonic()
+    window = current_app.config['LOGIN_WINDOW_SECONDS']
+    with _login_lock:
+        if len(_login_attempts) > 10000:
+            # drop accounts with no attempts left in the window so junk emails can't grow this forever
+            for key in [k for k, v in _login_attempts.items() if not v or v[-1] <= now - window]:
+                del _login_attempts[key]
+        attempts = _login_attempts[email]
+        while attempts and attempts[0] <= now - window:
+            attempts.popleft()
+        if len(attempts) >= current_app.config['LOGIN_MAX_ATTEMPTS']:
+            return int(attempts[0] + window - now) + 1
+        attempts.append(now)
+    return 0
+
+
+def _token_serializer():
+    return URLSafeTimedSerializer(current_app.config['SECRET_KEY'], salt='auth-token')
+
+
+def issue_token(account):
+    """Signed token for account, a dict with the users row's user_id, role, name and email."""
+    return _token_serializer().dumps({"uid": account['user_id'], "role": account['role'], "name": account['name'], "email": account['email']})
+
+
+def current_identity(allow_query_token=False):
+    """
+    Claims of a valid, unexpired Bearer token on this request, or None. Never touches the database.
+    allow_query_token also accepts ?access_token= (EventSource can't send headers).
+    """
+    if 'identity' not in g:
+        g.identity = None
+        header = request.headers.get('Authorization', '')
+        token = header[len('Bearer '):] if header.startswith('Bearer ') else None
+        if token is None and allow_query_token:
+            token = request.args.get('access_token')
+        if token:
+            try:
+                g.identity = _token_serializer().loads(token, max_age=current_app.config['AUTH_TOKEN_TTL'])
+            except BadSignature:  # includes SignatureExpired
+                pass
+    return g.identity
+
+
+def require_auth(*roles):
+    """Reject the request with 401/403 unless it carries a valid token (with one of roles, if given)."""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(**view_args):
+            identity = current_identity()
+            if identity is None:
+                return json_error("Authentication required", 401)
+            if roles and identity['role'] not in roles:
+                return json_error("Forbidden", 403)
+            return view(**view_args)
+        return wrapper
+    return decorator
+
+
+@bp.route('/api/register', methods=['POST'])
+def register():
+    data = request.get_json() or {}
+    name = data.get('name')
+    email = data.get('email')
+    password = data.get('password')
+    role = data.get('role')
+
+    if not (name and email and password and role):
+        return json_error("Missing required fields (name, email, password, role)", 400)
+    if role not in ('donor', 'npo', 'admin'):
+        return json_error("Invalid role. Allowed: donor, npo, admin", 400)
+    if User.query.filter_by(email=email).first():
+        return json_error("Email already registered", 400)
+
+    try:
+        password_hash = run_password_job(generate_password_hash, password)
+    except PasswordPoolBusy:
+        return json_error("Server busy, please retry", 503)
+
+    def write():
+        user = User(name=name, email=email, password_hash=password_hash, role=role)
+        db.session.add(user)
+        db.session.flush()
+
+        if role == 'donor':
+            dp = DonorProfile(donor_store_id=user.user_id, first_name=name.split()[0], last_name=' '.join(name.split()[1:]) or '', email=email)
+            db.session.add(dp)
+        elif role == 'npo':
+            np = NPOProfile(npo_id=user.user_id, npo_name=name, email=email)
+            db.session.add(np)
+        return user.user_id
+
+    return jsonify({"message": "Registered", "user_id": run_write(write)}), 201
+
+
+@bp.route('/api/login', methods=['POST'])
+def login():
+    data = request.get_json() or {}
+    email = data.get('email')
+    password = data.get('password')
+    if not (email and password):
+        return json_error("Missing credentials", 400)
+    throttle_key = email.strip().lower()
+    retry_after = login_retry_after(throttle_key)
+    if retry_after:
+        resp, status = json_error("Too many login attempts, try again later", 429)
+        resp.headers['Retry-After'] = str(retry_after)
+        return resp, status
+    user = User.query.filter_by(email=email).first()
+    # copy what the response needs, then release the read transaction before waiting on the hash
+    # pool. The rollback expires user: touching it again would open a new transaction (and, with
+    # SQLITE_BEGIN_MODE=IMMEDIATE, hold the write lock) for the whole wait.
+    account = {"user_id": user.user_id, "name": user.name, "email": user.email, "role": user.role} if user else None
+    password_hash = user.password_hash if user else None
+    db.session.rollback()
+    try:
+        if not account or not run_password_job(check_password_hash, password_hash, password):
+            return json_error("Invalid credentials", 401)
+    except PasswordPoolBusy:
+        return json_error("Server busy, please retry", 503)
+    with _login_lock:
+        _login_attempts.pop(throttle_key, None)
+    return jsonify({
+        "message": "OK",
+        "user": account,
+        "token": issue_token(account),
+        "token_type": "Bearer",
+        "expires_in": current_app.config['AUTH_TOKEN_TTL']
+    }), 200
+
+
+@bp.route('/api/me', methods=['GET'])
+@require_auth()
+def me():
+    identity = current_identity()
+    return jsonify({"user_id": identity['uid'], "name": identity['name'], "email": identity['email'], "role": identity['role']})
+
+
+@bp.route('/api/users/<int:uid>', methods=['GET'])
+def get_user(uid):
+    identity = current_identity()
+    if identity and identity['uid'] == uid:
+        # the caller's own token already carries the users row
+        result = {"user_id": uid, "name": identity['name'], "email": identity['email'], "role": identity['role'], "profile": {}}
+    else:
+        user = User.query.get(uid)
+        if not user:
+            return json_error("User not found", 404)
+        result = {
+            "user_id": user.user_id,
+            "name": user.name,
+            "email": user.email,
+            "role": user.role,
+            "profile": {}
+        }
+    profile = None
+    if result["role"] == 'donor':
+        profile = DonorProfile.query.get(uid)
+    elif result["role"] == 'npo':
+        profile = NPOProfile.query.get(uid)
+    if profile:
+        # convert profile columns to dict (simple)
+        for col in profile.__table__.columns:
+            result["profile"][col.name] = getattr(profile, col.name)
+    return jsonify(result)
@@ -0,0 +1,163 @@
+# app/cache.py
+from flask import Response, current_app, request
+from collections import OrderedDict
+from datetime import datetime
+import functools
+import hashlib
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.sql.dml import UpdateBase
+
+from .extensions import RoutingSession, app_service
+
+
+# -----------------------------
+# Response cache
+# -----------------------------
+class MemoryCache:
+    """
+    Default cache backend: a bounded LRU with per-entry TTL, local to the process.
+    Any object with the same get/set/incr methods can be plugged in through
+    RESPONSE_CACHE_BACKEND (e.g. a Redis wrapper, so invalidations reach every worker).
+    """
+
+    def __init__(self, max_entries=1024, ttl=30):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._counters = {}  # never evicted: losing a version would resurrect stale entries
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + (ttl or self.ttl), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def version(self, key):
+        with self._lock:
+            return self._counters.get(key, 0)
+
+
+response_cache = app_service('response_cache')
+
+
+def cached_response(*tables, prepare=None):
+    """
+    Cache a GET view's 200 responses per endpoint + view args + query string.
+    Entries are keyed on the current version of each table the view reads, so any
+    committed write to one of those tables (see invalidate_tables) makes them unreachable.
+    Responses carry ETag/Last-Modified and answer conditional requests with 304.
+    prepare() runs before the lookup, for writes the view's data depends on (e.g. a rollup
+    refresh): committed inside the view, they would move the key the entry is stored under.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(**view_args):
+            if prepare:
+                prepare()
+            if not current_app.config['RESPONSE_CACHE_ENABLED']:
+                return view(**view_args)
+            hit, uncached = _cache_entry(view, tables, request.endpoint, view_args, request.args.items(multi=True))
+            if uncached is not None:
+                return uncached
+            body, mimetype, etag, modified = hit
+            resp = Response(body, mimetype=mimetype)
+            resp.set_etag(etag)
+            resp.last_modified = modified
+            resp.cache_control.no_cache = True  # browsers may keep it but must revalidate (cheap 304)
+            return resp.make_conditional(request)
+        wrapper.cached_tables, wrapper.cache_prepare = tables, prepare
+        return wrapper
+    return decorator
+
+
+def _cache_entry(view, tables, endpoint, view_args, args):
+    """
+    (entry, None) where entry is the cached (body, mimetype, etag, modified) of the view call,
+    made on a miss; (None, response) when the view answers anything but a 200, which isn't cached.
+    """
+    versions = '.'.join(str(response_cache.version(f"ver:{t}")) for t in tables)
+    key = f"resp:{endpoint}:{sorted(view_args.items())}:{sorted(args)}:{versions}"
+    hit = response_cache.get(key)
+    if hit is None:
+        resp = current_app.make_response(view(**view_args))
+        if resp.status_code != 200:
+            return None, resp
+        body = resp.get_data()
+        hit = (body, resp.mimetype, hashlib.sha1(body).hexdigest(), datetime.utcnow().replace(microsecond=0))
+        response_cache.set(key, hit)
+    return hit, None
+
+
+def cached_view_body(endpoint, **view_args):
+    """
+    Body of the GET view at endpoint, called with view_args and no query string. A @cached_response
+    view answers from (and fills) the same cache entry as a request to its URL would.
+    """
+    view = current_app.view_functions[endpoint]
+    tables = getattr(view, 'cached_tables', None)
+    if tables is None or not current_app.config['RESPONSE_CACHE_ENABLED']:
+        return current_app.make_response(view(**view_args)).get_data()
+    if view.cache_prepare:
+        view.cache_prepare()
+    hit, uncached = _cache_entry(view.__wrapped__, tables, endpoint, view_args, ())
+    return hit[0] if hit else uncached.get_data()
+
+
+def invalidate_tables(tables):
+    for table in tables:
+        response_cache.incr(f"ver:{table}")
+
+
+# Collect every table a session writes to (ORM flushes and Core DML alike) and bump
+# their cache versions once the transaction commits.
+@event.listens_for(RoutingSession, 'after_flush')
+def _track_flushed_tables(session, flush_context):
+    written = session.info.setdefault('written_tables', set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        written.add(obj.__table__.name)
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _track_executed_tables(orm_execute_state):
+    stmt = orm_execute_state.statement
+    if isinstance(stmt, UpdateBase):
+        orm_execute_state.session.info.setdefault('written_tables', set()).add(stmt.table.name)
+
+
+# Like the change events, only once the root transaction ends: a released write_queue
+# savepoint is not committed yet, and a rolled-back one leaves the batch's other writes.
+@event.listens_for(RoutingSession, 'after_commit')
+def _invalidate_written_tables(session):
+    if session.in_nested_transaction():
+        return
+    written = session.info.pop('written_tables', None)
+    if written:
+        invalidate_tables(written)
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _forget_written_tables(session):
+    if session.in_nested_transaction():
+        return
+    session.info.pop('written_tables', None)
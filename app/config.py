@@ -0,0 +1,112 @@
+# app/config.py
+import os
+import secrets
+
+
+# -----------------------------
+# Configuration
+# -----------------------------
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # the repository: templates/, static/, the database
+DB_PATH = os.environ.get("DATABASE_PATH", os.path.join(BASE_DIR, "donation_management.db"))
+
+# Pragmas applied to every new SQLite connection, selected by SQLITE_PROFILE.
+SQLITE_PROFILES = {
+    # WAL: readers never block the writer; synchronous=NORMAL only fsyncs at checkpoints
+    'production': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,  # ms to wait for a lock before "database is locked"
+        'cache_size': -65536,  # negative = KiB, i.e. 64 MB page cache per connection
+        'mmap_size': 268435456,  # 256 MB
+        'temp_store': 'MEMORY',
+        'foreign_keys': 'ON',
+    },
+    # rollback journal with full fsync, as the schema script creates the database
+    'compat': {
+        'journal_mode': 'DELETE',
+        'synchronous': 'FULL',
+        'busy_timeout': 5000,
+        'foreign_keys': 'ON',
+    },
+}
+
+# Settings every app starts from; create_app() applies a CONFIGS preset and its own overrides on top.
+DEFAULT_CONFIG = {
+    'DATABASE_PATH': DB_PATH,
+    'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+    'SQLALCHEMY_ENGINE_OPTIONS': {
+        'pool_size': 5,
+        'max_overflow': 10,
+        'pool_timeout': 30,
+        'connect_args': {'check_same_thread': False, 'timeout': 5},
+    },
+    'SQLITE_PROFILE': os.environ.get('SQLITE_PROFILE', 'production'),
+    'SQLITE_PRAGMAS': {},  # per-pragma overrides on top of the profile
+    # IMMEDIATE takes the write lock at BEGIN, so writers queue on busy_timeout instead of
+    # failing when a read transaction tries to upgrade; best combined with the read replica.
+    'SQLITE_BEGIN_MODE': os.environ.get('SQLITE_BEGIN_MODE', 'DEFERRED'),
+    # read-only connections to the same file, used by GET/HEAD requests (see RoutingSession)
+    'SQLITE_READ_REPLICA': os.environ.get('SQLITE_READ_REPLICA') == '1',
+    'ARCHIVE_DIR': os.environ.get('ARCHIVE_DIR'),  # None -> archive/ next to the database, one file per year
+    'ARCHIVE_AFTER_DAYS': 365,  # `flask archive` moves finished history older than this out of the hot tables
+    'ARCHIVE_BATCH': 500,  # rows per archive transaction, so writers only ever wait milliseconds
+    'ROLLUP_REFRESH_SECONDS': 5,  # how stale /api/kpis and /api/impact-reports may get
+    # Signs auth tokens; must be shared by every worker. Without it tokens die with the process.
+    'SECRET_KEY': os.environ.get('SECRET_KEY') or secrets.token_urlsafe(32),
+    'AUTH_TOKEN_TTL': 12 * 3600,  # seconds
+    'PASSWORD_WORKERS': min(4, os.cpu_count() or 1),  # concurrent hash/verify jobs
+    'PASSWORD_QUEUE_LIMIT': 64,  # jobs running + waiting before login/register answer 503
+    'PASSWORD_TIMEOUT': 10,  # seconds a request waits for its job
+    'LOGIN_MAX_ATTEMPTS': 10,  # per account ...
+    'LOGIN_WINDOW_SECONDS': 300,  # ... within this window
+    # Route writes through one writer thread that group-commits them (see WriteQueue)
+    'WRITE_QUEUE_ENABLED': os.environ.get('WRITE_QUEUE') == '1',
+    'WRITE_BATCH_MAX': 64,  # jobs per group commit
+    'WRITE_BATCH_WINDOW_MS': 0,  # extra wait for more jobs after the first; 0 = take whatever is already queued
+    'WRITE_TIMEOUT': 10,  # seconds a request waits for its write to commit
+    'ROUTE_MAX_STOPS': 40,  # stops per pickup run (one vehicle-day)
+    'ROUTE_SPEED_KMH': 30,  # average driving speed for ETAs
+    'ROUTE_STOP_MINUTES': 10,  # time spent at each stop
+    'ROUTE_DAY_START': '08:00',
+    'MATCH_AGE_KM_PER_DAY': 5,  # a day of waiting outweighs this much extra distance
+    'MATCH_UNKNOWN_DISTANCE_KM': 1000,  # assumed when either end can't be located
+    'MATCH_INCOMING_DAYS': 14,  # item donations this recent count as incoming stock
+    'MATCH_INCOMING_PENALTY_KM': 50,  # incoming stock still has to be collected and sorted
+    'MATCH_FULL_REFRESH_SECONDS': 300,  # rebuild the index from scratch this often
+    'EVENT_BROKER': None,  # None -> a MemoryBroker per app; share one (e.g. Redis-backed) across workers
+    'EVENT_BUFFER': 100,  # recent events kept per user for Last-Event-ID resume
+    'SSE_KEEPALIVE_SECONDS': 15,  # comment line on idle streams, so proxies keep them open
+    'SSE_MAX_SECONDS': 300,  # streams end after this; EventSource reconnects and resumes
+    'NOTIFY_WORKERS': int(os.environ.get('NOTIFY_WORKERS', '2')),  # outbox drain threads; 0 = only `flask notify-drain`
+    'NOTIFY_BATCH': 100,  # outbox events claimed per round
+    'NOTIFY_POLL_SECONDS': 5,  # idle workers still look for due retries this often
+    'NOTIFY_MAX_ATTEMPTS': 5,  # then the event is parked as 'failed'
+    'NOTIFY_BACKOFF_SECONDS': 2,  # retry n waits this * 2**(n-1)
+    'NOTIFY_LEASE_SECONDS': 60,  # a claimed event is retried if its worker hasn't finished by then
+    'NOTIFY_SINKS': None,  # None -> from NOTIFY_FILE / NOTIFY_SMTP, else the log
+    'JSON_ROWS_ENCODER': None,  # None -> orjson if installed, else the stdlib; see encode_rows
+    'DASHBOARD_EMBED': True,  # render the panels into dashboard pages opened with ?user_id=
+    'RESPONSE_CACHE_ENABLED': os.environ.get('RESPONSE_CACHE', '1') == '1',
+    'RESPONSE_CACHE_BACKEND': None,  # None -> a MemoryCache per app
+    'RESPONSE_CACHE_MAX_ENTRIES': 1024,
+    'RESPONSE_CACHE_TTL': 30,  # seconds; bounds staleness across workers with the memory backend
+    'ASSET_MAX_AGE': 365 * 24 * 3600,  # seconds; fingerprinted /assets/ URLs never change content
+    'ASSET_IMAGE_WIDTHS': (320, 640, 1280),  # WebP widths `flask build-assets` makes of each image (plus its own)
+    'ASSET_WEBP_QUALITY': 80,
+    'ANALYTICS_DIR': os.environ.get('ANALYTICS_DIR'),  # None -> analytics/ next to the database
+    'ANALYTICS_CHUNK_ROWS': 50000,  # rows per read_sql chunk in `flask analytics-refresh`
+    'METRICS_ENABLED': os.environ.get('METRICS_ENABLED') == '1',  # see /api/_debug/metrics
+    'SLOW_QUERY_MS': float(os.environ.get('SLOW_QUERY_MS', 200)),  # logged to app.slow_queries when metrics are on
+}
+
+# Presets create_app() applies on top of DEFAULT_CONFIG; APP_CONFIG picks one by default.
+CONFIGS = {
+    # several worker processes share the file: writers queue for its lock at BEGIN instead of
+    # failing when another process commits first, and GET requests read on their own connections
+    'production': {'SQLITE_BEGIN_MODE': os.environ.get('SQLITE_BEGIN_MODE', 'IMMEDIATE'),
+                   'SQLITE_READ_REPLICA': os.environ.get('SQLITE_READ_REPLICA', '1') == '1'},
+    # debugger and reloader; templates are re-read when they change
+    'development': {'DEBUG': True, 'TEMPLATES_AUTO_RELOAD': True},
+    # every request reaches the database, and nothing runs behind the caller's back
+    'testing': {'TESTING': True, 'RESPONSE_CACHE_ENABLED': False, 'NOTIFY_WORKERS': 0},
+}
@@ -0,0 +1,72 @@
+# app/dashboards.py
+from flask import current_app, request, jsonify
+from markupsafe import Markup
+
+from .cache import cached_response, cached_view_body
+from .extensions import bp
+from .inventory import npo_deliveries
+from .metrics import donor_metrics_summary, npo_metrics_summary
+from .pickups import pickup_page
+from .rollups import impact_report_rows, maybe_refresh_rollups
+
+
+# -----------------------------
+# Dashboards
+# -----------------------------
+# Each dashboard page loads all of its panels with one request. The panels are read
+# one after another on the request's session, so they share a connection and a snapshot.
+# A sqlite3 connection runs one statement at a time: reading panels concurrently would take
+# a connection (and a snapshot) each, so they stay sequential; each is a few index lookups,
+# and the responses are cached.
+def donor_dashboard_data(donor_id):
+    return {
+        "donor_id": donor_id,
+        "metrics": donor_metrics_summary(donor_id),
+        "pickups": pickup_page(donor_id),
+        "impact_reports": impact_report_rows(),
+    }
+
+
+def npo_dashboard_data(npo_id):
+    return {
+        "npo_id": npo_id,
+        "metrics": npo_metrics_summary(npo_id),
+        "deliveries": npo_deliveries(npo_id),
+    }
+
+
+def dashboard_bootstrap(endpoint, id_arg):
+    """
+    JSON of the dashboard API response to render into a dashboard page opened as ?user_id=N, so
+    its first paint needs no API call ('null' otherwise). It shares that endpoint's cache entry.
+    """
+    user_id = request.args.get('user_id', type=int)
+    if not current_app.config['DASHBOARD_EMBED'] or not user_id:
+        return Markup('null')
+    body = cached_view_body(endpoint, **{id_arg: user_id}).decode().rstrip()
+    # escaped like Jinja's tojson, so the data can't close the <script> it sits in
+    return Markup(body.replace('&', '\\u0026').replace('<', '\\u003c').replace('>', '\\u003e').replace("'", '\\u0027'))
+
+
+@bp.route('/api/donor/<int:donor_id>/dashboard', methods=['GET'])
+# the rollup refresh may commit, so it runs before the cache lookup and the first panel read
+@cached_response('donor_summaries', 'donation_records', 'pickup_scheduling', 'rollup_buckets', 'distributed_items', 'distribution_centers',
+                 prepare=maybe_refresh_rollups)
+def donor_dashboard(donor_id):
+    """
+    Donor dashboard in one round trip.
+    Returns { donor_id, metrics, pickups, impact_reports }, shaped like /api/donor/<id>/metrics,
+    the first page of /api/pickups/<id>?limit= (pickups.next_cursor continues there) and /api/impact-reports.
+    """
+    return jsonify(donor_dashboard_data(donor_id))
+
+
+@bp.route('/api/npo/<int:npo_id>/dashboard', methods=['GET'])
+@cached_response('platform_summary', 'npo_summaries', 'distributed_items', 'delivery_routes', 'delivery_confirmations', 'distribution_centers')
+def npo_dashboard(npo_id):
+    """
+    NPO dashboard in one round trip.
+    Returns { npo_id, metrics, deliveries }, shaped like /api/metrics/npo/<id> and the
+    first page of /api/deliveries/<id> (deliveries.next_cursor continues there).
+    """
+    return jsonify(npo_dashboard_data(npo_id))
@@ -0,0 +1,311 @@
+# app/donations.py
+from flask import request, jsonify
+from collections import defaultdict
+from datetime import datetime
+import json
+
+from .events import notify
+from .extensions import bp, db
+from .helpers import (BULK_MAX_ROWS, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, encode_cursor, json_error,
+                      parse_iso_datetime)
+from .history import history_sources
+from .metrics import PLATFORM_KEY, bump_summary, summarise_donation
+from .models import DonationItem, DonationRecord, DonorSummary, PlatformSummary
+from .outbox import enqueue_notification, enqueue_notifications
+from .writes import run_write
+
+
+# -----------------------------
+# Donations + items
+# -----------------------------
+@bp.route('/api/donations', methods=['POST'])
+def create_donation():
+    """
+    Create a donation record. donor_store_id optional (NPO requests).
+    JSON: { donor_store_id?, npo_id? (requests), donation_amount?, donation_type?, notes?, items: [{item_name, item_quantity, item_value?, item_description?}] }
+    """
+    data = request.get_json() or {}
+    donor_store_id = data.get('donor_store_id')
+    donation_amount = data.get('donation_amount', 0.0)
+    donation_type = data.get('donation_type', 'item')
+    notes = data.get('notes')
+    npo_id = data.get('npo_id')
+    items = data.get('items', [])
+
+    def write():
+        dr = DonationRecord(donor_store_id=donor_store_id, donation_amount=donation_amount, donation_type=donation_type, notes=notes, npo_id=npo_id)
+        db.session.add(dr)
+        db.session.flush()  # get dr.donation_id
+
+        created_items = []
+        for it in items:
+            di = DonationItem(
+                donation_id=dr.donation_id,
+                item_name=it.get('item_name'),
+                item_description=it.get('item_description'),
+                item_quantity=int(it.get('item_quantity', 0)),
+                item_value=float(it.get('item_value', 0.0)) if it.get('item_value') is not None else 0.0
+            )
+            db.session.add(di)
+            created_items.append(di)
+        summarise_donation(donor_store_id, donation_type, created_items)
+        db.session.flush()
+        change = {"donation_id": dr.donation_id, "donation_type": donation_type,
+                  "item_quantity": sum(i.item_quantity or 0 for i in created_items)}
+        notify(donor_store_id, 'donation.created', **change)
+        if donation_type == 'request':
+            notify(npo_id, 'donation.created', **change)
+        elif donation_type == 'item' and created_items:
+            enqueue_notification('donation_ready', dr.donation_id, f"Donation #{dr.donation_id} is ready for collection "
+                                 f"({change['item_quantity']} item(s))", sender_role='store')
+        return dr.donation_id, [ {"item_id": i.item_id, "item_name": i.item_name} for i in created_items ]
+
+    donation_id, items_created = run_write(write)
+    return jsonify({
+        "message": "Donation created",
+        "donation_id": donation_id,
+        "items_created": items_created
+    }), 201
+
+
+DONATION_FIELDS = ("donation_id", "donor_store_id", "donation_date", "donation_amount", "donation_type", "notes", "npo_id")
+
+
+@bp.route('/api/donations', methods=['GET'])
+def list_donations():
+    """
+    Keyset-paginated donation listing, newest first.
+    Query: donor_store_id?, limit?, cursor?, fields=a,b,c?, include=items?, include_archived=1?
+    Returns { donations: [...], next_cursor } where next_cursor is null on the last page.
+    """
+    donor_id = request.args.get('donor_store_id', type=int)
+    limit = min(max(request.args.get('limit', DEFAULT_PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+    include = set(filter(None, request.args.get('include', '').split(',')))
+    fields = [f for f in request.args.get('fields', '').split(',') if f] or list(DONATION_FIELDS)
+    unknown = [f for f in fields if f not in DONATION_FIELDS]
+    if unknown:
+        return json_error(f"Unknown fields: {', '.join(unknown)}", 400)
+    if include - {'items'}:
+        return json_error("include supports only 'items'", 400)
+
+    after = None
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            last_date, last_id = decode_cursor(cursor)
+            after = datetime.fromisoformat(last_date), int(last_id)
+        except (ValueError, TypeError):
+            return json_error("Invalid cursor", 400)
+
+    # one page from the hot table and, if asked, one from each archive, merged
+    archived = request.args.get('include_archived') == '1'
+    rows = []
+    for Record, criteria in history_sources(DonationRecord, archived):
+        # the cursor columns are always selected, even when not projected
+        cols = [Record.donation_date, Record.donation_id]
+        cols += [getattr(Record, f) for f in fields if f not in ('donation_date', 'donation_id')]
+        query = db.session.query(*cols).filter(*criteria)
+        if donor_id:
+            query = query.filter(Record.donor_store_id == donor_id)
+        if after:
+            query = query.filter(db.tuple_(Record.donation_date, Record.donation_id) < after)
+        rows += query.order_by(Record.donation_date.desc(), Record.donation_id.desc()).limit(limit + 1).all()
+    if archived:
+        rows.sort(key=lambda r: (r.donation_date, r.donation_id), reverse=True)
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    out = []
+    for r in rows:
+        rec = {}
+        for f in fields:
+            value = getattr(r, f)
+            rec[f] = value.isoformat() if f == 'donation_date' and value else value
+        out.append(rec)
+
+    if 'items' in include and rows:
+        # one batched query for the whole page instead of one per donation
+        by_donation = {}
+        page_ids = [r.donation_id for r in rows]
+        items = []
+        for Item, criteria in history_sources(DonationItem, archived):
+            items += db.session.query(Item).filter(Item.donation_id.in_(page_ids), *criteria) \
+                .order_by(Item.donation_id, Item.item_id).all()
+        if archived:
+            items.sort(key=lambda i: (i.donation_id, i.item_id))  # each source is sorted, the concatenation isn't
+        for i in items:
+            by_donation.setdefault(i.donation_id, []).append({
+                "item_id": i.item_id,
+                "item_name": i.item_name,
+                "item_quantity": i.item_quantity,
+                "item_value": i.item_value,
+                "item_description": i.item_description
+            })
+        for r, rec in zip(rows, out):
+            rec["items"] = by_donation.get(r.donation_id, [])
+
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = encode_cursor([last.donation_date.isoformat(), last.donation_id])
+    return jsonify({"donations": out, "next_cursor": next_cursor})
+
+
+def _validate_bulk_donation(raw):
+    """Normalise one bulk row into (record, items) column dicts. Raises ValueError with a message."""
+    if not isinstance(raw, dict):
+        raise ValueError("row must be a JSON object")
+    donor_store_id = raw.get('donor_store_id')
+    if donor_store_id is not None and (isinstance(donor_store_id, bool) or not isinstance(donor_store_id, int)):
+        raise ValueError("donor_store_id must be an integer")
+    npo_id = raw.get('npo_id')
+    if npo_id is not None and (isinstance(npo_id, bool) or not isinstance(npo_id, int)):
+        raise ValueError("npo_id must be an integer")
+    try:
+        amount = float(raw.get('donation_amount', 0.0) or 0.0)
+    except (TypeError, ValueError):
+        raise ValueError("donation_amount must be a number")
+    record = {
+        'donor_store_id': donor_store_id,
+        'donation_date': parse_iso_datetime(raw['donation_date']) if raw.get('donation_date') else datetime.utcnow(),
+        'donation_amount': amount,
+        'donation_type': raw.get('donation_type', 'item'),
+        'notes': raw.get('notes'),
+        'npo_id': npo_id,
+    }
+    items = raw.get('items', [])
+    if not isinstance(items, list):
+        raise ValueError("items must be a list")
+    clean_items = []
+    for n, it in enumerate(items):
+        if not isinstance(it, dict) or not it.get('item_name'):
+            raise ValueError(f"items[{n}]: item_name required")
+        try:
+            clean_items.append({
+                'item_name': it['item_name'],
+                'item_description': it.get('item_description'),
+                'item_quantity': int(it.get('item_quantity', 0)),
+                'item_value': float(it['item_value']) if it.get('item_value') is not None else 0.0,
+            })
+        except (TypeError, ValueError):
+            raise ValueError(f"items[{n}]: item_quantity and item_value must be numbers")
+    return record, clean_items
+
+
+@bp.route('/api/donations/bulk', methods=['POST'])
+def bulk_create_donations():
+    """
+    Insert many donations with their items in one transaction.
+    Body: JSON array of create_donation payloads (optionally with donation_date), or NDJSON
+          (Content-Type: application/x-ndjson), one payload per line.
+    Query: mode=atomic (default, reject the batch on any invalid row) | partial (skip invalid rows)
+    Returns { inserted, donation_ids (aligned with the input, null for rejected rows), errors: [{index, error}] }
+    """
+    mode = request.args.get('mode', 'atomic')
+    if mode not in ('atomic', 'partial'):
+        return json_error("mode must be atomic or partial", 400)
+
+    errors = []
+    if request.mimetype == 'application/x-ndjson':
+        rows = []
+        for n, line in enumerate(l for l in request.get_data(as_text=True).splitlines() if l.strip()):
+            try:
+                rows.append(json.loads(line))
+            except json.JSONDecodeError as exc:
+                rows.append(None)
+                errors.append({"index": n, "error": f"invalid JSON: {exc.msg}"})
+    else:
+        rows = request.get_json(silent=True)
+        if not isinstance(rows, list):
+            return json_error("Body must be a JSON array of donations or NDJSON", 400)
+    if len(rows) > BULK_MAX_ROWS:
+        return json_error(f"At most {BULK_MAX_ROWS} donations per batch", 413)
+
+    parsed_errors = {e["index"] for e in errors}
+    valid = []  # (input index, record, items)
+    for n, raw in enumerate(rows):
+        if n in parsed_errors:
+            continue
+        try:
+            valid.append((n, *_validate_bulk_donation(raw)))
+        except ValueError as exc:
+            errors.append({"index": n, "error": str(exc)})
+    errors.sort(key=lambda e: e["index"])
+    if errors and mode == 'atomic':
+        return jsonify({"error": "Batch rejected", "inserted": 0, "errors": errors}), 400
+
+    def write():
+        donation_ids = [None] * len(rows)
+        # executemany inserts: one multi-row INSERT per batch for records, then for items.
+        # Core (not ORM) inserts keep the input order; inside this write transaction SQLite
+        # hands out rowids in insert order, so sorting the RETURNING ids lines them up with
+        # the input without SQLAlchemy's row-at-a-time "ordered" fallback.
+        records = DonationRecord.__table__
+        new_ids = sorted(db.session.execute(
+            db.insert(records).returning(records.c.donation_id),
+            [record for _, record, _ in valid]
+        ).scalars().all())
+        item_rows = []
+        donor_deltas = defaultdict(lambda: {'donation_count': 0, 'item_count': 0, 'item_value': 0.0})
+        donated_items = 0
+        ready = []
+        for (n, record, items), donation_id in zip(valid, new_ids):
+            donation_ids[n] = donation_id
+            item_rows.extend(dict(it, donation_id=donation_id) for it in items)
+            qty = sum(it['item_quantity'] for it in items)
+            # the same change events and outbox rows create_donation emits, one per donation
+            change = {"donation_id": donation_id, "donation_type": record['donation_type'], "item_quantity": qty}
+            notify(record['donor_store_id'], 'donation.created', **change)
+            if record['donation_type'] == 'request':
+                notify(record['npo_id'], 'donation.created', **change)
+            elif record['donation_type'] == 'item' and items:
+                ready.append(('donation_ready', donation_id, f"Donation #{donation_id} is ready for collection ({qty} item(s))"))
+            if record['donor_store_id']:
+                delta = donor_deltas[record['donor_store_id']]
+                delta['donation_count'] += 1
+                delta['item_count'] += qty
+                delta['item_value'] += sum(it['item_value'] * it['item_quantity'] for it in items)
+            if record['donation_type'] is not None and record['donation_type'] != 'request':
+                donated_items += qty
+        if item_rows:
+            db.session.execute(db.insert(DonationItem.__table__), item_rows)
+        for donor_id, delta in donor_deltas.items():
+            bump_summary(DonorSummary, {'donor_store_id': donor_id}, **delta)
+        if donated_items:
+            bump_summary(PlatformSummary, PLATFORM_KEY, donated_items=donated_items)
+        enqueue_notifications(ready, sender_role='store')
+        return donation_ids
+
+    donation_ids = run_write(write) if valid else [None] * len(rows)
+    return jsonify({"inserted": len(valid), "donation_ids": donation_ids, "errors": errors}), 201 if valid else 200
+
+
+# small convenience endpoint to add an item to existing donation
+@bp.route('/api/donations/<int:donation_id>/items', methods=['POST'])
+def add_donation_item(donation_id):
+    data = request.get_json() or {}
+    item_name = data.get('item_name')
+    item_quantity = int(data.get('item_quantity', 0))
+    item_value = float(data.get('item_value', 0.0)) if data.get('item_value') is not None else 0.0
+    item_description = data.get('item_description')
+    if not item_name:
+        return json_error("item_name required", 400)
+
+    def write():
+        donation = DonationRecord.query.get(donation_id)
+        if not donation:
+            return None
+        di = DonationItem(donation_id=donation_id, item_name=item_name, item_quantity=item_quantity, item_value=item_value, item_description=item_description)
+        db.session.add(di)
+        summarise_donation(donation.donor_store_id, donation.donation_type, [di], new_record=False)
+        db.session.flush()
+        notify(donation.donor_store_id, 'donation.item_added', donation_id=donation_id, item_id=di.item_id, item_quantity=item_quantity)
+        if donation.donation_type == 'item':
+            # deduped per donation, so only its first item announces it
+            enqueue_notification('donation_ready', donation_id, f"Donation #{donation_id} is ready for collection", sender_role='store')
+        return di.item_id
+
+    item_id = run_write(write)
+    if item_id is None:
+        return json_error("Donation not found", 404)
+    return jsonify({"message": "Item added", "item_id": item_id}), 201
@@ -0,0 +1,131 @@
+# app/events.py
+from flask import Response, current_app, request
+from collections import deque
+import json
+import threading
+import time
+
+from sqlalchemy import event
+
+from .auth import current_identity
+from .extensions import RoutingSession, app_service, bp, db
+from .helpers import json_error
+
+
+# -----------------------------
+# Change events (Server-Sent Events)
+# -----------------------------
+class MemoryBroker:
+    """
+    In-process pub/sub with a short replay buffer per channel.
+
+    Event ids come from one counter seeded with the start time in ms, so they rise across
+    channels and across restarts. wait() returns None when last_id is older than what the
+    buffer (or this process) still holds: the client missed events and must refetch.
+    A broker shared between workers (EVENT_BROKER) needs the same publish/head/wait methods.
+    """
+
+    def __init__(self, buffer=100):
+        self.buffer = buffer
+        self._lock = threading.Lock()
+        self._channels = {}  # channel -> (condition, deque of (id, event, data), [id of last evicted])
+        self._first_id = self._last_id = int(time.time() * 1000)
+
+    def _channel(self, name):
+        if name not in self._channels:
+            self._channels[name] = (threading.Condition(self._lock), deque(maxlen=self.buffer), [self._first_id])
+        return self._channels[name]
+
+    def publish(self, channel, event, data):
+        with self._lock:
+            cond, events, evicted = self._channel(channel)
+            self._last_id += 1
+            if len(events) == events.maxlen:
+                evicted[0] = events[0][0]
+            events.append((self._last_id, event, data))
+            cond.notify_all()
+            return self._last_id
+
+    def head(self):
+        with self._lock:
+            return self._last_id
+
+    def wait(self, channel, last_id, timeout):
+        """Events on channel after last_id, blocking up to timeout for the first. None if last_id is too old."""
+        with self._lock:
+            cond, events, evicted = self._channel(channel)
+            if last_id < evicted[0]:
+                return None
+            if not events or events[-1][0] <= last_id:
+                cond.wait(timeout)
+            if last_id < evicted[0]:
+                return None
+            return [e for e in events if e[0] > last_id]
+
+
+event_broker = app_service('event_broker')
+
+
+def notify(user_id, event, **data):
+    """Queue a change event for user_id's stream; published only once the current transaction commits."""
+    if user_id:
+        db.session.info.setdefault('pending_events', []).append((f"user:{user_id}", event, data))
+
+
+# after_commit / after_rollback also fire when a SAVEPOINT is released or rolled back
+# (write_queue runs each job in one): act only once the root transaction ends. A job whose
+# savepoint rolls back drops its own events (see WriteQueue._commit).
+@event.listens_for(RoutingSession, 'after_commit')
+def _publish_pending_events(session):
+    if session.in_nested_transaction():
+        return
+    for channel, name, data in session.info.pop('pending_events', ()):
+        event_broker.publish(channel, name, data)
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _drop_pending_events(session):
+    if session.in_nested_transaction():
+        return
+    session.info.pop('pending_events', None)
+
+
+def _sse(event_id, name, data):
+    return f"id: {event_id}\nevent: {name}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+@bp.route('/api/events', methods=['GET'])
+def event_stream():
+    """
+    Server-Sent Events for the signed-in user: compact deltas of their pickups, donations,
+    deliveries and feedback. Auth: Bearer header or ?access_token=. Resumes after the
+    Last-Event-ID header (or ?last_event_id=); 'reset' means events were missed: refetch.
+    """
+    identity = current_identity(allow_query_token=True)
+    if identity is None:
+        return json_error("Authentication required", 401)
+    channel = f"user:{identity['uid']}"
+    resume = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_id = int(resume) if resume else event_broker.head()
+    except ValueError:
+        return json_error("Invalid Last-Event-ID", 400)
+    keepalive = current_app.config['SSE_KEEPALIVE_SECONDS']
+    deadline = time.monotonic() + current_app.config['SSE_MAX_SECONDS']
+
+    def stream():
+        nonlocal last_id
+        yield "retry: 3000\n\n"
+        while time.monotonic() < deadline:
+            events = event_broker.wait(channel, last_id, min(keepalive, max(deadline - time.monotonic(), 0)))
+            if events is None:
+                last_id = event_broker.head()
+                yield _sse(last_id, 'reset', {})
+            elif events:
+                last_id = events[-1][0]
+                yield ''.join(_sse(*e) for e in events)
+            else:
+                yield ": keepalive\n\n"
+
+    # no stream_with_context: the generator needs no request state and must not pin a session
+    return Response(stream(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
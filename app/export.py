@@ -0,0 +1,107 @@
+# app/export.py
+from flask import Response, request, stream_with_context
+from datetime import datetime
+import csv
+import io
+import json
+import zlib
+
+from .extensions import bp, db
+from .helpers import json_error, parse_iso_datetime
+from .history import ARCHIVED_MODELS, history_sources
+from .models import DistributedItem, DonationItem, DonationRecord, FeedbackReview, Pickup
+
+
+# -----------------------------
+# Bulk export (streaming)
+# -----------------------------
+# table -> (model, date column used for since/until filters)
+EXPORT_TABLES = {
+    'donations': (DonationRecord, 'donation_date'),
+    'donation_items': (DonationItem, None),
+    'pickups': (Pickup, 'scheduled_date'),
+    'distributed_items': (DistributedItem, 'distribution_date'),
+    'feedback': (FeedbackReview, 'review_date'),
+}
+EXPORT_BATCH_SIZE = 1000
+
+
+def _export_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _export_batches(stmts):
+    for stmt in stmts:
+        yield from db.session.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE)).partitions()
+
+
+def _export_chunks(stmts, columns, fmt):
+    """Yield encoded text chunks, one per yield_per batch of each statement in turn, so memory stays flat."""
+    batches = _export_batches(stmts)
+    if fmt == 'csv':
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(columns)
+        for batch in batches:
+            writer.writerows([[_export_value(v) for v in row] for row in batch])
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+        if buf.tell():
+            yield buf.getvalue()
+    else:
+        for batch in batches:
+            yield ''.join(json.dumps(dict(zip(columns, map(_export_value, row))), separators=(',', ':')) + '\n' for row in batch)
+
+
+def _gzip_stream(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+@bp.route('/api/export/<table>', methods=['GET'])
+def export_table(table):
+    """
+    Stream a whole table as NDJSON (default) or CSV without materialising it.
+    Query: format=ndjson|csv, since?, until? (ISO dates, on the table's date column),
+           gzip=1 (or Accept-Encoding: gzip) to compress the stream,
+           include_archived=1 to stream the archives too (oldest year first, then the hot rows).
+    """
+    if table not in EXPORT_TABLES:
+        return json_error(f"Unknown export table. Allowed: {', '.join(EXPORT_TABLES)}", 404)
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in ('ndjson', 'csv'):
+        return json_error("format must be ndjson or csv", 400)
+
+    model, date_col = EXPORT_TABLES[table]
+    since, until = request.args.get('since'), request.args.get('until')
+    if (since or until) and date_col is None:
+        return json_error(f"{table} has no date column to filter on", 400)
+    try:
+        since, until = since and parse_iso_datetime(since), until and parse_iso_datetime(until)
+    except ValueError:
+        return json_error("since/until must be ISO format (YYYY-MM-DD or full ISO datetime)", 400)
+
+    archived = request.args.get('include_archived') == '1' and model in ARCHIVED_MODELS
+    stmts = []
+    for entity, criteria in reversed(history_sources(model, archived)):
+        t = db.inspect(entity).selectable
+        stmt = db.select(*t.columns).where(*criteria).order_by(*t.primary_key)
+        if since:
+            stmt = stmt.where(t.c[date_col] >= since)
+        if until:
+            stmt = stmt.where(t.c[date_col] < until)
+        stmts.append(stmt)
+
+    columns = [c.name for c in model.__table__.columns]
+    body = _export_chunks(stmts, columns, fmt)
+    headers = {"Content-Disposition": f'attachment; filename="{table}.{fmt}"', "Vary": "Accept-Encoding"}
+    if request.args.get('gzip') == '1' or 'gzip' in request.headers.get('Accept-Encoding', ''):
+        body = _gzip_stream(body)
+        headers["Content-Encoding"] = "gzip"
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    return Response(stream_with_context(body), mimetype=mimetype, headers=headers)
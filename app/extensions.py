@@ -0,0 +1,31 @@
+# app/extensions.py
+from flask import Blueprint, current_app, request, has_request_context
+from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session as FlaskSession
+from werkzeug.local import LocalProxy
+
+from sqlalchemy.sql.dml import UpdateBase
+
+
+# -----------------------------
+# Database and blueprint
+# -----------------------------
+class RoutingSession(FlaskSession):
+    """Send reads made while serving GET/HEAD requests to the read replica, if configured."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and 'replica' in db.engines and not self._flushing
+                and not isinstance(clause, UpdateBase)
+                and has_request_context() and request.method in ('GET', 'HEAD')):
+            return db.engines['replica']
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+# Routes, error handlers, template globals and CLI commands; create_app() registers them on each app it builds.
+bp = Blueprint('main', __name__, cli_group=None)
+
+
+def app_service(name):
+    """Proxy to the current app's name object (event_broker, write_queue, ...), which create_app() keeps in app.extensions."""
+    return LocalProxy(lambda: current_app.extensions[name])
@@ -0,0 +1,54 @@
+# app/feedback.py
+from flask import request, jsonify
+
+from .events import notify
+from .extensions import bp, db
+from .helpers import json_error
+from .metrics import bump_summary
+from .models import FeedbackReview, NPOSummary
+from .rows import iso_datetime, rows_response, select_rows, table_columns
+from .writes import run_write
+
+
+# -----------------------------
+# Feedback
+# -----------------------------
+@bp.route('/api/feedback', methods=['POST'])
+def create_feedback():
+    data = request.get_json() or {}
+    donor_store_id = data.get('donor_store_id')
+    npo_id = data.get('npo_id')
+    rating = data.get('rating')
+    comments = data.get('comments', '')
+    if npo_id is None or rating is None:
+        return json_error("npo_id and rating required", 400)
+    try:
+        rating_int = int(rating)
+    except Exception:
+        return json_error("rating must be integer 1-5", 400)
+    if rating_int < 1 or rating_int > 5:
+        return json_error("rating must be between 1 and 5", 400)
+
+    def write():
+        fr = FeedbackReview(donor_store_id=donor_store_id, npo_id=npo_id, rating=rating_int, comments=comments)
+        db.session.add(fr)
+        bump_summary(NPOSummary, {'npo_id': npo_id}, rating_sum=rating_int, rating_count=1)
+        db.session.flush()
+        rating_sum, rating_count = db.session.query(NPOSummary.rating_sum, NPOSummary.rating_count).filter_by(npo_id=npo_id).one()
+        notify(npo_id, 'feedback.created', review_id=fr.review_id, rating=rating_int, average_feedback_rating=rating_sum / rating_count)
+        notify(donor_store_id, 'feedback.created', review_id=fr.review_id, rating=rating_int, npo_id=npo_id)
+        return fr.review_id
+
+    return jsonify({"message": "Feedback submitted", "review_id": run_write(write)}), 201
+
+
+@bp.route('/api/feedback', methods=['GET'])
+def get_feedback():
+    donor_id = request.args.get("donor_store_id", type=int)
+    npo_id = request.args.get("npo_id", type=int)
+    stmt = db.select(*table_columns(FeedbackReview, 'review_id', 'donor_store_id', 'npo_id', 'rating', 'comments', 'review_date'))
+    if donor_id:
+        stmt = stmt.where(FeedbackReview.donor_store_id == donor_id)
+    if npo_id:
+        stmt = stmt.where(FeedbackReview.npo_id == npo_id)
+    return rows_response(select_rows(stmt.order_by(FeedbackReview.review_date.desc()), review_date=iso_datetime))
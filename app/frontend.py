@@ -0,0 +1,227 @@
+# app/frontend.py
+from flask import current_app, request, render_template, make_response, send_from_directory, url_for
+from markupsafe import Markup, escape
+import gzip
+import hashlib
+import importlib.util
+import io
+import json
+import mimetypes
+import os
+
+import click
+
+from .dashboards import dashboard_bootstrap
+from .extensions import bp
+from .helpers import json_error
+
+
+# -----------------------------
+# Static assets (fingerprinted, precompressed)
+# -----------------------------
+# `flask build-assets` copies static/ into static/dist/ under content-hashed names, with .br/.gz
+# siblings for text files and WebP copies of images at ASSET_IMAGE_WIDTHS, and lists them in
+# static/dist/manifest.json. Templates link files through asset_url() and picture(): a changed
+# file gets a new URL, so /assets/ responses can be cached for good. Without a build they fall
+# back to the plain /static/ URLs.
+ASSET_TEXT_TYPES = ('.css', '.js', '.svg', '.json', '.txt', '.html')
+ASSET_IMAGE_TYPES = ('.png', '.jpg', '.jpeg')
+ASSET_SUFFIXES = {'br': '.br', 'gzip': '.gz'}  # most compact first: the order /assets/ prefers them in
+_asset_manifest = (None, {}, {})  # (manifest mtime, name -> entry, built file -> encodings)
+
+
+def asset_dist_dir():
+    return os.path.join(current_app.static_folder, 'dist')
+
+
+def asset_manifest():
+    """
+    (name -> entry, built file -> encodings) from the last build; both empty without one.
+    Re-read when a new build replaces the manifest, so running workers pick it up; otherwise one stat().
+    """
+    global _asset_manifest
+    path = os.path.join(asset_dist_dir(), 'manifest.json')
+    try:
+        stamp = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return {}, {}
+    if _asset_manifest[0] != stamp:
+        with open(path, encoding='utf-8') as fh:
+            entries = json.load(fh)
+        files = {}
+        for entry in entries.values():
+            files[entry['file']] = entry['encodings']
+            files.update((name, []) for _, name in entry.get('webp', ()))
+        _asset_manifest = (stamp, entries, files)
+    return _asset_manifest[1], _asset_manifest[2]
+
+
+def build_assets(prune=False):
+    """
+    Build static/dist/ and its manifest from static/; returns the manifest.
+    .br needs brotli and WebP needs Pillow; without them those variants are skipped.
+    prune deletes files of earlier builds, which pages still open in a browser may ask for.
+    """
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+    try:
+        from PIL import Image
+    except ImportError:
+        Image = None
+    dist = asset_dist_dir()
+    manifest, written = {}, {'manifest.json'}
+
+    def write(name, data):
+        path = os.path.join(dist, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + '.tmp', 'wb') as fh:
+            fh.write(data)
+        os.replace(path + '.tmp', path)  # workers serving the old file never see half of the new one
+        written.add(name)
+
+    for root, dirs, files in os.walk(current_app.static_folder):
+        dirs[:] = sorted(d for d in dirs if os.path.join(root, d) != dist and not d.startswith('.'))
+        for filename in sorted(f for f in files if not f.startswith('.')):
+            name = os.path.relpath(os.path.join(root, filename), current_app.static_folder).replace(os.sep, '/')
+            with open(os.path.join(root, filename), 'rb') as fh:
+                data = fh.read()
+            stem, ext = os.path.splitext(name)
+            ext = ext.lower()
+            digest = hashlib.sha256(data).hexdigest()[:12]
+            entry = manifest[name] = {'file': f"{stem}.{digest}{ext}", 'encodings': []}
+            write(entry['file'], data)
+
+            if ext in ASSET_TEXT_TYPES:
+                compressed = {'gzip': gzip.compress(data, 9, mtime=0)}
+                if brotli:
+                    compressed['br'] = brotli.compress(data, quality=11)
+                for encoding, suffix in ASSET_SUFFIXES.items():
+                    if encoding in compressed and len(compressed[encoding]) < len(data):
+                        write(entry['file'] + suffix, compressed[encoding])
+                        entry['encodings'].append(encoding)
+            elif ext in ASSET_IMAGE_TYPES and Image:
+                with Image.open(io.BytesIO(data)) as im:
+                    im = im if im.mode in ('RGB', 'RGBA') else im.convert('RGBA')
+                    entry['webp'] = []
+                    widths = {w for w in current_app.config['ASSET_IMAGE_WIDTHS'] if w < im.width} | {im.width}
+                    for width in sorted(widths):
+                        resized = im if width == im.width else im.resize((width, round(im.height * width / im.width)), Image.LANCZOS)
+                        out = io.BytesIO()
+                        resized.save(out, 'WEBP', quality=current_app.config['ASSET_WEBP_QUALITY'], method=6)
+                        if width == im.width and out.tell() >= len(data):
+                            continue  # full size and no smaller than the original: the <img> fallback is better
+                        webp = f"{stem}.{digest}.{width}w.webp"
+                        write(webp, out.getvalue())
+                        entry['webp'].append([width, webp])
+
+    write('manifest.json', json.dumps(manifest, indent=1, sort_keys=True).encode())
+    if prune:
+        for root, _, files in os.walk(dist):
+            for filename in files:
+                path = os.path.join(root, filename)
+                if os.path.relpath(path, dist).replace(os.sep, '/') not in written:
+                    os.remove(path)
+    return manifest
+
+
+@bp.cli.command('build-assets')
+@click.option('--prune', is_flag=True, help="Also delete files of earlier builds.")
+def build_assets_command(prune):
+    """Fingerprint and precompress static/ into static/dist/ (run on every deploy)."""
+    manifest = build_assets(prune)
+    variants = sum(len(entry.get('webp', ())) for entry in manifest.values())
+    click.echo(f"{len(manifest)} asset(s) built into {asset_dist_dir()}: "
+               f"{sum(len(entry['encodings']) for entry in manifest.values())} precompressed copies, {variants} WebP variant(s).")
+    for module, skipped in (('brotli', '.br copies'), ('PIL', 'WebP variants')):
+        if importlib.util.find_spec(module) is None:
+            click.echo(f"{module} is not installed: {skipped} skipped.")
+
+
+@bp.route('/assets/<path:filename>')
+def serve_asset(filename):
+    """A built file, in the most compact encoding the client accepts; cacheable for ASSET_MAX_AGE."""
+    encodings = asset_manifest()[1].get(filename)
+    if encodings is None:
+        return json_error("Asset not found", 404)
+    encoding = next((e for e in encodings if request.accept_encodings[e]), None)
+    response = send_from_directory(asset_dist_dir(), filename + ASSET_SUFFIXES.get(encoding, ''),
+                                   mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream',
+                                   max_age=current_app.config['ASSET_MAX_AGE'])
+    if encoding:
+        response.content_encoding = encoding
+    if encodings:
+        response.vary.add('Accept-Encoding')
+    response.cache_control.immutable = True
+    return response
+
+
+@bp.app_template_global()
+def asset_url(name):
+    """URL of static/<name>: its fingerprinted build if there is one, else the plain /static/ file."""
+    entry = asset_manifest()[0].get(name)
+    if entry is None:
+        return url_for('static', filename=name)
+    return url_for('main.serve_asset', filename=entry['file'])
+
+
+@bp.app_template_global()
+def picture(name, alt='', sizes='100vw', class_=None):
+    """
+    <img> for static/<name>, wrapped in a <picture> offering the build's WebP widths when there are any.
+    sizes is the width the image is laid out at, from which the browser picks a WebP file.
+    """
+    img = f'<img src="{escape(asset_url(name))}" alt="{escape(alt)}"'
+    if class_:
+        img += f' class="{escape(class_)}"'
+    img += ' />'
+    webp = asset_manifest()[0].get(name, {}).get('webp')
+    if not webp:
+        return Markup(img)
+    srcset = ', '.join(f"{url_for('main.serve_asset', filename=file)} {width}w" for width, file in webp)
+    return Markup(f'<picture><source type="image/webp" srcset="{escape(srcset)}" sizes="{escape(sizes)}" />{img}</picture>')
+
+
+def render_page(template, **context):
+    """
+    A rendered page that browsers revalidate on each visit: while it is unchanged the answer
+    is a 304 with no body. asset_url() links change with every build, and so does the ETag.
+    """
+    response = make_response(render_template(template, **context))
+    response.cache_control.no_cache = True
+    response.add_etag()
+    return response.make_conditional(request)
+
+
+# -----------------------------
+# Simple pages serving (frontend)
+# -----------------------------
+@bp.route("/")
+def home():
+    return render_page("index.html")
+
+
+@bp.route("/login")
+def login_page():
+    return render_page("login.html")
+
+
+@bp.route("/register")
+def register_page():
+    return render_page("register.html")
+
+
+@bp.route("/donor-dashboard")
+def donor_dashboard_page():
+    return render_page("donor-dashboard.html", bootstrap=dashboard_bootstrap("main.donor_dashboard", "donor_id"))
+
+
+@bp.route("/npo-dashboard")
+def npo_dashboard_page():
+    return render_page("npo-dashboard.html", bootstrap=dashboard_bootstrap("main.npo_dashboard", "npo_id"))
+
+
+@bp.route("/schedule-pickup")
+def schedule_pickup_page():
+    return render_page("schedule-pickup.html")
@@ -0,0 +1,56 @@
+# app/helpers.py
+from flask import jsonify
+from datetime import datetime
+import base64
+import binascii
+import json
+
+from sqlalchemy.exc import IntegrityError
+
+from .extensions import bp, db
+
+
+# -----------------------------
+# Helpers
+# -----------------------------
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+BULK_MAX_ROWS = 10000  # rows per bulk call (donation batches, stock moves)
+
+
+def json_error(message, status=400):
+    return jsonify({"error": message}), status
+
+
+@bp.app_errorhandler(IntegrityError)
+def handle_integrity_error(exc):
+    # foreign keys are enforced on every connection, so bad references land here
+    db.session.rollback()
+    return json_error(f"Constraint violation: {exc.orig}", 409)
+
+
+def parse_iso_datetime(value):
+    """Parse a full ISO datetime, falling back to the date part of it. Raises ValueError."""
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        try:
+            return datetime.strptime(value.split("T")[0], "%Y-%m-%d")
+        except (AttributeError, ValueError):
+            raise ValueError(f"not an ISO date: {value!r}")
+
+
+def encode_cursor(values):
+    # opaque pagination cursor: urlsafe base64 of the JSON sort key
+    return base64.urlsafe_b64encode(json.dumps(values, separators=(',', ':')).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    padded = cursor + '=' * (-len(cursor) % 4)
+    try:
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as exc:
+        raise ValueError("malformed cursor") from exc
+    if not isinstance(values, list):
+        raise ValueError("malformed cursor")
+    return values
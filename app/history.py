@@ -0,0 +1,121 @@
+# app/history.py
+from flask import current_app
+import os
+import re
+import sqlite3
+import threading
+
+from sqlalchemy import Column, Index, MetaData, Table
+
+from .extensions import db
+from .models import DeliveryConfirmation, DeliveryRoute, DistributedItem, DonationItem, DonationRecord, Pickup
+
+
+# -----------------------------
+# History (hot tables and archives)
+# -----------------------------
+# Finished history older than ARCHIVE_AFTER_DAYS moves out of the hot tables into one
+# SQLite file per year (<database name>-<year>.db in ARCHIVE_DIR). Every pooled connection
+# ATTACHes those files as archive_<year>, and reads asked for include_archived=1 query each
+# of them after the hot table. Archive tables keep the hot columns and indexes but no
+# foreign keys: their parents (users, centers, ...) stay in the hot database.
+archive_metadata = MetaData()
+_archive_tables_lock = threading.Lock()
+ARCHIVED_MODELS = (DonationRecord, DonationItem, Pickup, DistributedItem, DeliveryRoute, DeliveryConfirmation)
+
+
+def archive_dir():
+    return current_app.config['ARCHIVE_DIR'] or os.path.join(os.path.dirname(os.path.abspath(current_app.config['DATABASE_PATH'])), 'archive')
+
+
+def _archive_stem():
+    return os.path.splitext(os.path.basename(current_app.config['DATABASE_PATH']))[0]
+
+
+def archive_path(year):
+    return os.path.join(archive_dir(), f"{_archive_stem()}-{year}.db")
+
+
+def archive_years():
+    pattern = re.compile(re.escape(_archive_stem()) + r'-(\d{4})\.db$')
+    try:
+        names = os.listdir(archive_dir())
+    except FileNotFoundError:
+        return []
+    return sorted(int(m.group(1)) for m in map(pattern.match, names) if m)
+
+
+def attach_archives(dbapi_conn, info):
+    """
+    ATTACH archive files this connection has not seen yet. Runs on pool checkout, outside any
+    transaction (SQLite refuses ATTACH inside one); while the directory is unchanged it costs one stat().
+    """
+    try:
+        stamp = os.stat(archive_dir()).st_mtime_ns
+    except FileNotFoundError:
+        return
+    if info.get('archive_stamp') == stamp:
+        return
+    attached = {row[1] for row in dbapi_conn.execute("PRAGMA database_list")}
+    for year in reversed(archive_years()):
+        if f"archive_{year}" in attached:
+            continue
+        try:
+            dbapi_conn.execute(f"ATTACH DATABASE ? AS archive_{year}", (archive_path(year),))
+        except sqlite3.OperationalError as exc:  # e.g. past SQLite's limit of 10 attached databases
+            current_app.logger.warning("archive %s not attached: %s", year, exc)
+            break
+    info['archive_stamp'] = stamp
+
+
+def archive_table(model, schema=None):
+    """model's table as it is kept in an archive: same columns and indexes, no foreign keys."""
+    source = model.__table__
+    key = f"{schema}.{source.name}" if schema else source.name
+    with _archive_tables_lock:
+        if key not in archive_metadata.tables:
+            table = Table(source.name, archive_metadata,
+                          *(Column(c.name, c.type, primary_key=c.primary_key) for c in source.columns), schema=schema)
+            for index in source.indexes:
+                Index(index.name, *(table.c[c.name] for c in index.columns), unique=index.unique)
+        return archive_metadata.tables[key]
+
+
+def attached_archives():
+    """archive_<year> schemas attached to the session's connection, newest first."""
+    rows = db.session.connection().exec_driver_sql("PRAGMA database_list").all()
+    return sorted((row[1] for row in rows if row[1].startswith('archive_')), reverse=True)
+
+
+def history_sources(model, include_archived=True):
+    """
+    (entity, criteria) pairs covering model's rows: the hot table, then each attached archive.
+    The criteria skip archived rows that are still hot (between the copy and the delete of a batch).
+    """
+    sources = [(model, [])]
+    if include_archived:
+        pk = model.__mapper__.primary_key[0]
+        for schema in attached_archives():
+            entity = db.aliased(model, archive_table(model, schema).alias(f"{schema}_{model.__tablename__}"), adapt_on_names=True)
+            still_hot = db.select(pk).where(pk == getattr(entity, pk.name)).exists()
+            sources.append((entity, [~still_hot]))
+    return sources
+
+
+def ensure_archive(year):
+    """Create the archive file for a year, or add tables and columns the hot schema has gained since."""
+    os.makedirs(archive_dir(), exist_ok=True)
+    engine = db.create_engine(f"sqlite:///{archive_path(year)}")
+    try:
+        with engine.connect() as conn:
+            conn.exec_driver_sql("PRAGMA journal_mode = WAL")
+        with engine.begin() as conn:
+            tables = [archive_table(model) for model in ARCHIVED_MODELS]
+            archive_metadata.create_all(conn, tables=tables)
+            for table in tables:
+                have = {row[1] for row in conn.exec_driver_sql(f"PRAGMA table_info({table.name})")}
+                for column in table.columns:
+                    if column.name not in have:
+                        conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(conn.dialect)}")
+    finally:
+        engine.dispose()
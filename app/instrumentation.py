@@ -0,0 +1,185 @@
+# app/instrumentation.py
+from flask import Response, current_app, g, request, jsonify, has_request_context
+from collections import defaultdict
+import logging
+import threading
+import time
+
+from sqlalchemy import event
+
+from .extensions import bp
+from .helpers import json_error
+from .outbox import notification_worker
+from .writes import write_queue
+
+
+# -----------------------------
+# Instrumentation (optional, METRICS_ENABLED)
+# -----------------------------
+# Nothing below is hooked up unless METRICS_ENABLED is set, so a disabled app pays nothing.
+LATENCY_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 200, 500)
+
+
+class Histogram:
+    """Fixed-bucket histogram, Prometheus style (cumulative on export)."""
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                break
+        else:
+            i = len(self.bounds)
+        self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Estimate a quantile by linear interpolation inside its bucket."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if seen + n >= rank and n:
+                lower = self.bounds[i - 1] if i else 0.0
+                upper = self.bounds[i] if i < len(self.bounds) else self.bounds[-1]
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+        return self.bounds[-1]
+
+    def cumulative(self):
+        total = 0
+        for bound, n in zip(list(self.bounds) + ['+Inf'], self.counts):
+            total += n
+            yield bound, total
+
+
+class EndpointStats:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.rows_affected = 0
+        self.wall_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.sql_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.queries = Histogram(QUERY_COUNT_BUCKETS)
+
+
+_endpoint_stats = defaultdict(EndpointStats)
+_stats_lock = threading.Lock()
+slow_query_log = logging.getLogger('app.slow_queries')
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed_ms = (time.perf_counter() - conn.info['query_started'].pop()) * 1000
+    if elapsed_ms >= current_app.config['SLOW_QUERY_MS']:
+        slow_query_log.warning("slow query %.1f ms: %s | params=%r", elapsed_ms, ' '.join(statement.split()), parameters)
+    if has_request_context():
+        stats = g.setdefault('sql_stats', [0, 0.0, 0])  # queries, ms, rows affected
+        stats[0] += 1
+        stats[1] += elapsed_ms
+        if cursor.rowcount > 0:
+            stats[2] += cursor.rowcount
+
+
+def _handle_cursor_error(context):
+    # a failed statement never reaches after_cursor_execute: drop its start time here
+    started = context.connection.info.get('query_started') if context.connection is not None else None
+    if started:
+        started.pop()
+
+
+def _start_request_timer():
+    g.request_started = time.perf_counter()
+
+
+def _record_request(response):
+    started = g.get('request_started')
+    if started is None or request.endpoint in (None, 'main.debug_metrics', 'static'):
+        return response
+    wall_ms = (time.perf_counter() - started) * 1000
+    queries, sql_ms, rows = g.get('sql_stats', (0, 0.0, 0))
+    with _stats_lock:
+        stats = _endpoint_stats[request.endpoint]
+        stats.requests += 1
+        stats.errors += response.status_code >= 500
+        stats.rows_affected += rows
+        stats.wall_ms.observe(wall_ms)
+        stats.sql_ms.observe(sql_ms)
+        stats.queries.observe(queries)
+    response.headers.add('Server-Timing', f'sql;dur={sql_ms:.2f};desc="{queries} queries"')
+    response.headers.add('Server-Timing', f'app;dur={wall_ms:.2f}')
+    return response
+
+
+def enable_instrumentation(app, engines):
+    for engine in engines:
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(engine, 'handle_error', _handle_cursor_error)
+    app.before_request(_start_request_timer)
+    app.after_request(_record_request)
+
+
+def _prometheus_metrics():
+    lines = []
+
+    def histogram(name, help_text, attr, scale):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for endpoint, stats in sorted(_endpoint_stats.items()):
+            h = getattr(stats, attr)
+            for bound, total in h.cumulative():
+                le = bound if bound == '+Inf' else f"{bound * scale:g}"
+                lines.append(f'{name}_bucket{{endpoint="{endpoint}",le="{le}"}} {total}')
+            lines.append(f'{name}_sum{{endpoint="{endpoint}"}} {h.sum * scale:g}')
+            lines.append(f'{name}_count{{endpoint="{endpoint}"}} {h.count}')
+
+    histogram('app_request_duration_seconds', 'Wall time per request.', 'wall_ms', 0.001)
+    histogram('app_request_sql_duration_seconds', 'Total SQL time per request.', 'sql_ms', 0.001)
+    histogram('app_request_sql_queries', 'SQL statements issued per request.', 'queries', 1)
+    for name, attr, help_text in (('app_requests_total', 'requests', 'Requests served.'),
+                                  ('app_request_errors_total', 'errors', 'Requests answered with a 5xx.'),
+                                  ('app_sql_rows_affected_total', 'rows_affected', 'Rows changed by INSERT/UPDATE/DELETE.')):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} counter")
+        for endpoint, stats in sorted(_endpoint_stats.items()):
+            lines.append(f'{name}{{endpoint="{endpoint}"}} {getattr(stats, attr)}')
+    return '\n'.join(lines) + '\n'
+
+
+@bp.route('/api/_debug/metrics', methods=['GET'])
+def debug_metrics():
+    """
+    Per-endpoint request/SQL statistics since process start.
+    JSON by default; ?format=prometheus (or Accept: text/plain) for the Prometheus text format.
+    """
+    if not current_app.config['METRICS_ENABLED']:
+        return json_error("Metrics are disabled (set METRICS_ENABLED=1)", 404)
+    with _stats_lock:
+        if request.args.get('format') == 'prometheus' or request.accept_mimetypes.best == 'text/plain':
+            return Response(_prometheus_metrics(), mimetype='text/plain; version=0.0.4')
+        out = {}
+        for endpoint, stats in sorted(_endpoint_stats.items()):
+            out[endpoint] = {
+                "requests": stats.requests,
+                "errors": stats.errors,
+                "rows_affected": stats.rows_affected,
+                "wall_ms": {"avg": stats.wall_ms.sum / stats.wall_ms.count, "p50": stats.wall_ms.quantile(0.5),
+                            "p95": stats.wall_ms.quantile(0.95), "p99": stats.wall_ms.quantile(0.99)},
+                "sql_ms": {"avg": stats.sql_ms.sum / stats.sql_ms.count, "p95": stats.sql_ms.quantile(0.95)},
+                "queries": {"avg": stats.queries.sum / stats.queries.count, "max_bucket": stats.queries.quantile(1.0)},
+            }
+    return jsonify({"slow_query_ms": current_app.config['SLOW_QUERY_MS'], "endpoints": out,
+                    "write_queue": {"batches": write_queue.batches, "jobs": write_queue.jobs},
+                    "notifications": notification_worker.stats()})
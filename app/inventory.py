@@ -0,0 +1,416 @@
+# app/inventory.py
+from flask import request, jsonify
+from datetime import datetime
+
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from .cache import cached_response
+from .events import notify
+from .extensions import bp, db
+from .helpers import BULK_MAX_ROWS, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, encode_cursor, json_error
+from .history import history_sources
+from .models import (ROUTE_STATUSES, DeliveryConfirmation, DeliveryRoute, DistributedItem, DistributionCenter,
+                     Inventory, InventoryMovement)
+from .outbox import enqueue_notification
+from .rows import iso_datetime, rows_response, select_rows, table_columns
+from .writes import run_write
+
+
+# -----------------------------
+# Inventory / Distribution / Deliveries
+# -----------------------------
+class InsufficientStock(Exception):
+    def __init__(self, shortages):
+        super().__init__("Insufficient stock")
+        self.shortages = shortages
+
+
+@bp.app_errorhandler(InsufficientStock)
+def handle_insufficient_stock(exc):
+    return jsonify({"error": "Insufficient stock", "shortages": exc.shortages}), 409
+
+
+def move_stock(center_id, moves, reason):
+    """
+    Apply stock moves [(item_name, delta, ref_id)] at one center inside the caller's
+    transaction and append them to the movement log.
+    Decrements are single guarded UPDATEs (quantity >= amount), so concurrent requests can't
+    oversell; if any item is short, raises InsufficientStock listing every shortage and the
+    caller's transaction must be rolled back. Increments upsert the (center, item) row.
+    """
+    inv = Inventory.__table__
+    now = datetime.utcnow()
+    moves = [m for m in moves if m[1]]
+    shortages = []
+    for item_name, delta, _ in moves:
+        if delta > 0:
+            continue
+        key = (inv.c.center_id == center_id, inv.c.item_name == item_name)
+        updated = db.session.execute(
+            inv.update().where(*key, inv.c.quantity >= -delta)
+            .values(quantity=inv.c.quantity + delta, last_updated=now).returning(inv.c.inventory_id)
+        ).first()
+        if updated is None:
+            available = db.session.execute(db.select(inv.c.quantity).where(*key)).scalar()
+            shortages.append({"center_id": center_id, "item_name": item_name, "requested": -delta, "available": available or 0})
+    if shortages:
+        raise InsufficientStock(shortages)
+    increments = [{"center_id": center_id, "item_name": item_name, "quantity": delta, "last_updated": now}
+                  for item_name, delta, _ in moves if delta > 0]
+    if increments:
+        stmt = sqlite_insert(inv)
+        restocked = db.session.execute(stmt.on_conflict_do_update(
+            index_elements=['center_id', 'item_name'],
+            set_={'quantity': inv.c.quantity + stmt.excluded.quantity, 'last_updated': stmt.excluded.last_updated}
+        ).returning(inv.c.inventory_id, inv.c.item_name, inv.c.quantity, sort_by_parameter_order=True), increments).all()
+        for (inventory_id, item_name, quantity), inc in zip(restocked, increments):
+            if quantity == inc["quantity"]:  # the row was empty (or new) before this move
+                enqueue_notification('stock_available', inventory_id, f"{item_name} is available at center #{center_id} ({quantity} in stock)",
+                                     dedupe_key=f"stock_available:{inventory_id}:{now:%Y-%m-%d}")
+    if moves:
+        db.session.execute(db.insert(InventoryMovement.__table__), [
+            {"center_id": center_id, "item_name": item_name, "delta": delta, "reason": reason, "ref_id": ref_id, "created_at": now}
+            for item_name, delta, ref_id in moves])
+
+
+def _parse_stock_items(items):
+    """[{item_name, quantity}] -> [(item_name, quantity)]; raises ValueError on bad input."""
+    if not isinstance(items, list) or not items:
+        raise ValueError("items must be a non-empty list")
+    if len(items) > BULK_MAX_ROWS:
+        raise ValueError(f"At most {BULK_MAX_ROWS} items per call")
+    parsed = []
+    for n, it in enumerate(items):
+        if not isinstance(it, dict) or not it.get("item_name"):
+            raise ValueError(f"items[{n}]: item_name required")
+        try:
+            quantity = int(it.get("quantity"))
+        except (TypeError, ValueError):
+            raise ValueError(f"items[{n}]: quantity must be an integer")
+        if quantity <= 0:
+            raise ValueError(f"items[{n}]: quantity must be positive")
+        parsed.append((it["item_name"], quantity))
+    return parsed
+
+
+@bp.route('/api/inventory', methods=['GET'])
+@cached_response('inventory')
+def get_inventory():
+    """Ledger rows. Query: center_id?, item_name? (either makes it an index lookup)."""
+    center_id = request.args.get('center_id', type=int)
+    item_name = request.args.get('item_name')
+    stmt = db.select(*table_columns(Inventory, 'inventory_id', 'center_id', 'item_name', 'quantity', 'last_updated'))
+    if center_id:
+        stmt = stmt.where(Inventory.center_id == center_id)
+    if item_name:
+        stmt = stmt.where(Inventory.item_name == item_name)
+    return rows_response(select_rows(stmt, last_updated=iso_datetime))
+
+
+@bp.route('/api/inventory', methods=['POST'])
+def create_inventory():
+    """Receive stock (or, with a negative quantity, write it off) for one item at a center."""
+    data = request.get_json() or {}
+    center_id = data.get("center_id")
+    item_name = data.get("item_name")
+    quantity = data.get("quantity", 0)
+    if not (center_id and item_name):
+        return json_error("center_id and item_name required", 400)
+    quantity = int(quantity)
+
+    def write():
+        move_stock(center_id, [(item_name, quantity, None)], 'receive' if quantity >= 0 else 'adjust')
+        row = db.session.execute(db.select(Inventory.inventory_id, Inventory.quantity)
+                                 .where(Inventory.center_id == center_id, Inventory.item_name == item_name)).first()
+        # receiving 0 of an unknown item creates nothing
+        return (row.inventory_id, row.quantity) if row else (None, 0)
+
+    inventory_id, stock = run_write(write)
+    return jsonify({"message": "Inventory updated", "inventory_id": inventory_id, "quantity": stock}), 201
+
+
+@bp.route('/api/inventory/distribute', methods=['POST'])
+def distribute_inventory():
+    """
+    Distribute many items from one center in one transaction: all or nothing.
+    JSON: { center_id, npo_id?, items: [{item_name, quantity}] }
+    Returns { distribution_ids } aligned with items, or 409 { shortages } without changing anything.
+    """
+    data = request.get_json() or {}
+    center_id = data.get("center_id")
+    npo_id = data.get("npo_id")
+    if not center_id:
+        return json_error("center_id required", 400)
+    try:
+        items = _parse_stock_items(data.get("items"))
+    except ValueError as exc:
+        return json_error(str(exc), 400)
+
+    def write():
+        dist = DistributedItem.__table__
+        ids = sorted(db.session.execute(
+            db.insert(dist).returning(dist.c.distribution_id),
+            [{"center_id": center_id, "npo_id": npo_id, "item_name": name, "item_quantity": qty, "distribution_date": datetime.utcnow()}
+             for name, qty in items]
+        ).scalars().all())  # rowids follow insert order inside the transaction, see bulk_create_donations
+        move_stock(center_id, [(name, -qty, did) for (name, qty), did in zip(items, ids)], 'distribute')
+        return ids
+
+    return jsonify({"message": "Items distributed", "distribution_ids": run_write(write)}), 201
+
+
+@bp.route('/api/inventory/transfer', methods=['POST'])
+def transfer_inventory():
+    """
+    Move many items between centers in one transaction: all or nothing.
+    JSON: { from_center_id, to_center_id, items: [{item_name, quantity}] }
+    """
+    data = request.get_json() or {}
+    from_id = data.get("from_center_id")
+    to_id = data.get("to_center_id")
+    if not (from_id and to_id) or from_id == to_id:
+        return json_error("from_center_id and a different to_center_id required", 400)
+    try:
+        items = _parse_stock_items(data.get("items"))
+    except ValueError as exc:
+        return json_error(str(exc), 400)
+
+    def write():
+        move_stock(from_id, [(name, -qty, to_id) for name, qty in items], 'transfer_out')
+        move_stock(to_id, [(name, qty, from_id) for name, qty in items], 'transfer_in')
+        return len(items)
+
+    return jsonify({"message": "Items transferred", "items_moved": run_write(write)}), 201
+
+
+@bp.route('/api/inventory/movements', methods=['GET'])
+def list_inventory_movements():
+    """
+    A center's movement log, newest first, keyset-paginated.
+    Query: center_id (required), item_name?, limit?, cursor?
+    Returns { movements: [...], next_cursor }.
+    """
+    center_id = request.args.get('center_id', type=int)
+    if not center_id:
+        return json_error("center_id required", 400)
+    item_name = request.args.get('item_name')
+    limit = min(max(request.args.get('limit', DEFAULT_PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+    query = InventoryMovement.query.filter(InventoryMovement.center_id == center_id)
+    if item_name:
+        query = query.filter(InventoryMovement.item_name == item_name)
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            (last_id,) = decode_cursor(cursor)
+            last_id = int(last_id)
+        except (ValueError, TypeError):
+            return json_error("Invalid cursor", 400)
+        query = query.filter(InventoryMovement.movement_id < last_id)
+    rows = query.order_by(InventoryMovement.movement_id.desc()).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return jsonify({
+        "movements": [{"movement_id": r.movement_id, "center_id": r.center_id, "item_name": r.item_name, "delta": r.delta, "reason": r.reason, "ref_id": r.ref_id, "created_at": r.created_at.isoformat()} for r in rows],
+        "next_cursor": encode_cursor([rows[-1].movement_id]) if has_more else None
+    })
+
+
+@bp.route('/api/distributed_items', methods=['POST'])
+def create_distributed_item():
+    """Distribute one item; takes it out of the center's stock (409 if there isn't enough)."""
+    data = request.get_json() or {}
+    center_id = data.get("center_id")
+    item_name = data.get("item_name")
+    npo_id = data.get("npo_id")
+    item_quantity = int(data.get("item_quantity", 0))
+    if not (center_id and item_name):
+        return json_error("center_id and item_name required", 400)
+    if item_quantity < 0:
+        return json_error("item_quantity must not be negative", 400)
+
+    def write():
+        di = DistributedItem(center_id=center_id, npo_id=npo_id, item_name=item_name, item_quantity=item_quantity)
+        db.session.add(di)
+        db.session.flush()
+        move_stock(center_id, [(item_name, -item_quantity, di.distribution_id)], 'distribute')
+        # same shape as a /api/deliveries row, so the dashboard can prepend it
+        notify(npo_id, 'delivery.created', delivery_id=di.distribution_id, item_name=item_name, quantity=item_quantity,
+               status='pending', delivery_date=None)
+        return di.distribution_id
+
+    return jsonify({"message": "Distributed item created", "distribution_id": run_write(write)}), 201
+
+
+@bp.route('/api/distributed_items', methods=['GET'])
+@cached_response('distributed_items')
+def list_distributed_items():
+    archived = request.args.get('include_archived') == '1'
+    rows = []
+    for entity, criteria in history_sources(DistributedItem, archived):
+        stmt = db.select(*table_columns(entity, 'distribution_id', 'center_id', 'npo_id', 'item_name', 'item_quantity', 'distribution_date')) \
+            .where(*criteria).order_by(entity.distribution_date.desc())
+        rows += select_rows(stmt, distribution_date=iso_datetime)
+    if archived:
+        rows.sort(key=lambda r: (r['distribution_date'] or '', r['distribution_id']), reverse=True)
+    return rows_response(rows)
+
+
+@bp.route('/api/deliveries/<int:npo_id>', methods=['GET'])
+@cached_response('distributed_items', 'delivery_routes', 'delivery_confirmations', 'distribution_centers')
+def get_deliveries(npo_id):
+    """
+    Deliveries to one NPO, newest first, keyset-paginated like /api/donations.
+    Each delivery carries its center, latest route and latest confirmation, all resolved
+    in the same query (index lookups per row, so a page costs the same at any volume).
+    Query: limit?, cursor?
+    Returns { deliveries: [...], next_cursor } where next_cursor is null on the last page.
+    """
+    limit = min(max(request.args.get('limit', DEFAULT_PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+    after = None
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            last_date, last_id = decode_cursor(cursor)
+            after = datetime.fromisoformat(last_date), int(last_id)
+        except (ValueError, TypeError):
+            return json_error("Invalid cursor", 400)
+    return jsonify(npo_deliveries(npo_id, limit, after))
+
+
+def npo_deliveries(npo_id, limit=DEFAULT_PAGE_SIZE, after=None):
+    """One page of deliveries for get_deliveries; after is the (distribution_date, distribution_id) of the previous page's last row."""
+    latest_route = db.select(db.func.max(DeliveryRoute.route_id)) \
+        .where(DeliveryRoute.distribution_id == DistributedItem.distribution_id).correlate(DistributedItem).scalar_subquery()
+    latest_confirmation = db.select(db.func.max(DeliveryConfirmation.confirmation_id)) \
+        .where(DeliveryConfirmation.distribution_id == DistributedItem.distribution_id).correlate(DistributedItem).scalar_subquery()
+    query = db.session.query(
+        DistributedItem.distribution_id, DistributedItem.distribution_date, DistributedItem.item_name,
+        DistributedItem.item_quantity, DistributedItem.center_id, DistributionCenter.center_name,
+        DeliveryRoute.route_id, DeliveryRoute.route_status, DeliveryRoute.origin_address,
+        DeliveryRoute.destination_address, DeliveryRoute.estimated_delivery_time,
+        DeliveryConfirmation.confirmation_id, DeliveryConfirmation.received_by,
+        DeliveryConfirmation.received_date, DeliveryConfirmation.notes,
+    ).outerjoin(DistributionCenter, DistributionCenter.center_id == DistributedItem.center_id) \
+        .outerjoin(DeliveryRoute, DeliveryRoute.route_id == latest_route) \
+        .outerjoin(DeliveryConfirmation, DeliveryConfirmation.confirmation_id == latest_confirmation) \
+        .filter(DistributedItem.npo_id == npo_id)
+    if after:
+        query = query.filter(db.tuple_(DistributedItem.distribution_date, DistributedItem.distribution_id) < after)
+    rows = query.order_by(DistributedItem.distribution_date.desc(), DistributedItem.distribution_id.desc()).limit(limit + 1).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    out = []
+    for r in rows:
+        out.append({
+            "delivery_id": r.distribution_id,
+            "item_name": r.item_name,
+            "quantity": r.item_quantity,
+            "center_id": r.center_id,
+            "center_name": r.center_name,
+            "distribution_date": r.distribution_date.isoformat() if r.distribution_date else None,
+            "status": "delivered" if r.confirmation_id else (r.route_status or "pending"),
+            "delivery_date": r.received_date.isoformat() if r.received_date else None,
+            "route": {
+                "route_id": r.route_id,
+                "route_status": r.route_status,
+                "origin_address": r.origin_address,
+                "destination_address": r.destination_address,
+                "estimated_delivery_time": r.estimated_delivery_time,
+            } if r.route_id else None,
+            "confirmation": {
+                "confirmation_id": r.confirmation_id,
+                "received_by": r.received_by,
+                "received_date": r.received_date.isoformat() if r.received_date else None,
+                "notes": r.notes,
+            } if r.confirmation_id else None,
+        })
+
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = encode_cursor([last.distribution_date.isoformat(), last.distribution_id])
+    return {"deliveries": out, "next_cursor": next_cursor}
+
+
+@bp.route('/api/delivery_routes', methods=['POST'])
+def create_delivery_route():
+    data = request.get_json() or {}
+    distribution_id = data.get("distribution_id")
+    route_status = data.get("route_status", "planned")
+    if not distribution_id:
+        return json_error("distribution_id required", 400)
+    if route_status not in ROUTE_STATUSES:
+        return json_error(f"route_status must be one of: {', '.join(ROUTE_STATUSES)}", 400)
+
+    def write():
+        route = DeliveryRoute(distribution_id=distribution_id, origin_address=data.get("origin_address"), destination_address=data.get("destination_address"), estimated_delivery_time=data.get("estimated_delivery_time"), route_status=route_status)
+        db.session.add(route)
+        db.session.flush()
+        return route.route_id
+
+    return jsonify({"message": "Route created", "route_id": run_write(write)}), 201
+
+
+@bp.route('/api/delivery_routes/<int:route_id>/status', methods=['PUT'])
+def update_route_status(route_id):
+    data = request.get_json() or {}
+    route_status = data.get("route_status")
+    if route_status not in ROUTE_STATUSES:
+        return json_error(f"route_status must be one of: {', '.join(ROUTE_STATUSES)}", 400)
+
+    def write():
+        route = DeliveryRoute.query.get(route_id)
+        if not route:
+            return False
+        route.route_status = route_status
+        return True
+
+    if not run_write(write):
+        return json_error("Route not found", 404)
+    return jsonify({"message": "Updated", "route_id": route_id, "route_status": route_status})
+
+
+@bp.route('/api/deliveries/<int:distribution_id>/confirm', methods=['POST'])
+def confirm_delivery(distribution_id):
+    data = request.get_json() or {}
+
+    def write():
+        if not DistributedItem.query.get(distribution_id):
+            return None
+        confirmation = DeliveryConfirmation(distribution_id=distribution_id, received_by=data.get("received_by"), notes=data.get("notes"))
+        db.session.add(confirmation)
+        db.session.flush()
+        return confirmation.confirmation_id
+
+    confirmation_id = run_write(write)
+    if confirmation_id is None:
+        return json_error("Distribution not found", 404)
+    return jsonify({"message": "Delivery confirmed", "confirmation_id": confirmation_id}), 201
+
+
+# -----------------------------
+# Distribution centers
+# -----------------------------
+@bp.route('/api/centers', methods=['POST'])
+def create_center():
+    data = request.get_json() or {}
+    name = data.get("center_name")
+    if not name:
+        return json_error("center_name required", 400)
+
+    def write():
+        c = DistributionCenter(center_name=name, address=data.get("address"), city=data.get("city"), state=data.get("state"), zip_code=data.get("zip_code"), country=data.get("country"), contact_person=data.get("contact_person"), contact_phone=data.get("contact_phone"))
+        db.session.add(c)
+        db.session.flush()
+        return c.center_id
+
+    return jsonify({"message": "Center created", "center_id": run_write(write)}), 201
+
+
+@bp.route('/api/centers', methods=['GET'])
+@cached_response('distribution_centers')
+def get_centers():
+    stmt = db.select(*table_columns(DistributionCenter, 'center_id', 'center_name', 'address', 'city', 'state', 'zip_code', 'country')) \
+        .order_by(DistributionCenter.created_at.desc())
+    return rows_response(select_rows(stmt))
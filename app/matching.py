@@ -0,0 +1,349 @@
+# app/matching.py
+from flask import current_app, request, jsonify
+from collections import defaultdict
+from datetime import datetime, timedelta
+import re
+import threading
+import time
+
+from .events import notify
+from .extensions import app_service, bp, db
+from .helpers import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, json_error
+from .inventory import move_stock
+from .models import (DistributedItem, DistributionCenter, DonationItem, DonationRecord, DonorProfile, Inventory,
+                     NPOProfile, RequestAllocation)
+from .routing import EARTH_RADIUS_KM, geocode_addresses
+from .writes import run_write
+
+
+# -----------------------------
+# Request matching
+# -----------------------------
+# Item names are free text on both sides, so matching works on a normalised key:
+# lower-case words, simple plurals folded, a few synonyms mapped.
+ITEM_ALIASES = {
+    "football": "soccer ball",
+    "soccer": "soccer ball",
+    "rugby": "rugby ball",
+    "trainer": "running shoe",
+    "sneaker": "running shoe",
+    "racquet": "tennis racket",
+    "tennis racquet": "tennis racket",
+    "jersey": "team jersey",
+    "goggle": "swimming goggle",
+}
+ITEM_CATEGORIES = {
+    "ball": "balls", "bat": "bats & sticks", "stick": "bats & sticks", "racket": "bats & sticks",
+    "shoe": "footwear", "boot": "footwear", "guard": "protective gear", "glove": "protective gear",
+    "goggle": "protective gear", "jersey": "apparel", "bag": "accessories", "bottle": "accessories",
+    "cone": "training", "rope": "training",
+}
+
+
+def normalise_item(name):
+    words = re.sub(r"[^a-z0-9 ]+", " ", (name or "").lower()).split()
+    words = [w[:-1] if len(w) > 3 and w.endswith('s') and not w.endswith(('ss', 'is', 'us')) else w for w in words]
+    key = ' '.join(words)
+    return ITEM_ALIASES.get(key, key)
+
+
+def item_category(key):
+    return next((ITEM_CATEGORIES[w] for w in reversed(key.split()) if w in ITEM_CATEGORIES), "other")
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    import numpy as np
+    p1, p2 = np.radians(lat1), np.radians(lat2)
+    a = np.sin((p2 - p1) / 2) ** 2 + np.cos(p1) * np.cos(p2) * np.sin(np.radians(lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+class MatchingEngine:
+    """
+    In-memory index of open request lines and available stock, keyed by normalised item.
+
+    refresh() compares three watermarks (max item_id, max inventory.last_updated, max
+    allocation_id). It folds in only the rows past them and re-matches only the item keys
+    those rows touch. Every MATCH_FULL_REFRESH_SECONDS it rebuilds from scratch, which also
+    re-ages requests and drops expired incoming donations. Each key is matched greedily
+    over a NumPy score matrix of request x stock: distance (km) minus waiting time.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._locations = {}  # ('npo' | 'center' | 'donor', id) -> (lat, lon) or None
+        self._reset()
+
+    def _reset(self):
+        self.requests = {}  # request item_id -> line
+        self.supply = {}  # ('inventory', inventory_id) | ('donation', item_id) -> stock
+        self.by_key = defaultdict(lambda: (set(), set()))  # item key -> (request ids, supply ids)
+        self.matches = {}  # item key -> [match, ...]
+        self.watermarks = (0, None, 0)
+        self.built_at = None
+
+    def _current_watermarks(self):
+        return db.session.query(
+            db.select(db.func.max(DonationItem.item_id)).scalar_subquery(),
+            db.select(db.func.max(Inventory.last_updated)).scalar_subquery(),
+            db.select(db.func.max(RequestAllocation.allocation_id)).scalar_subquery(),
+        ).one()
+
+    def _locate(self, refs):
+        """Resolve ('npo'|'center'|'donor', id) refs to coordinates via geocode_addresses, caching them."""
+        missing = {ref for ref in refs if ref[1] is not None and ref not in self._locations}
+        sources = {'npo': (NPOProfile, NPOProfile.npo_id), 'center': (DistributionCenter, DistributionCenter.center_id),
+                   'donor': (DonorProfile, DonorProfile.donor_store_id)}
+        for kind, (model, pk) in sources.items():
+            ids = sorted(i for k, i in missing if k == kind)
+            for start in range(0, len(ids), 500):
+                rows = db.session.query(pk, model.address, model.city).filter(pk.in_(ids[start:start + 500])).all()
+                for (rid, _, _), geo in zip(rows, geocode_addresses([(r.address, r.city) for r in rows])):
+                    self._locations[(kind, rid)] = geo[:2] if geo else None
+        for ref in missing:
+            self._locations.setdefault(ref, None)
+
+    def _add_items(self, rows, cutoff):
+        """Index request lines and incoming donation items; returns the keys touched."""
+        touched = set()
+        for r in rows:
+            key = normalise_item(r.item_name)
+            if r.donation_type == 'request':
+                if r.item_quantity and r.item_quantity > 0:
+                    self.requests[r.item_id] = {"key": key, "item_name": r.item_name, "request_id": r.donation_id,
+                                                "npo_id": r.npo_id, "requested_at": r.donation_date, "open": r.item_quantity}
+                    self.by_key[key][0].add(r.item_id)
+                    touched.add(key)
+            elif r.donation_type == 'item' and r.donation_date and r.donation_date >= cutoff and (r.item_quantity or 0) > 0:
+                ref = ('donation', r.item_id)
+                self.supply[ref] = {"key": key, "item_name": r.item_name, "source": "donation", "donation_id": r.donation_id,
+                                    "donor_store_id": r.donor_store_id, "qty": r.item_quantity}
+                self.by_key[key][1].add(ref)
+                touched.add(key)
+        return touched
+
+    def _set_stock(self, rows):
+        touched = set()
+        for r in rows:
+            key = normalise_item(r.item_name)
+            ref = ('inventory', r.inventory_id)
+            if ref in self.supply and self.supply[ref]["qty"] == (r.quantity or 0):
+                continue  # touched at the watermark but unchanged
+            self.supply[ref] = {"key": key, "item_name": r.item_name, "source": "inventory", "center_id": r.center_id, "qty": r.quantity or 0}
+            self.by_key[key][1].add(ref)
+            touched.add(key)
+        return touched
+
+    def _allocate(self, rows):
+        touched = set()
+        for item_id, quantity in rows:
+            line = self.requests.get(item_id)
+            if line:
+                line["open"] -= quantity
+                touched.add(line["key"])
+        return touched
+
+    def _item_rows(self):
+        return db.session.query(DonationItem.item_id, DonationItem.item_name, DonationItem.item_quantity, DonationRecord.donation_id,
+                                DonationRecord.donation_type, DonationRecord.donation_date, DonationRecord.npo_id,
+                                DonationRecord.donor_store_id) \
+            .join(DonationRecord, DonationRecord.donation_id == DonationItem.donation_id)
+
+    def refresh(self):
+        """Bring the index and matches up to date. Returns the number of item keys re-matched."""
+        with self._lock:
+            item_mark, stock_mark, alloc_mark = self._current_watermarks()
+            item_mark, alloc_mark = item_mark or 0, alloc_mark or 0
+            marks = (item_mark, stock_mark, alloc_mark)
+            cutoff = datetime.utcnow() - timedelta(days=current_app.config['MATCH_INCOMING_DAYS'])
+            full = self.built_at is None or time.monotonic() - self.built_at > current_app.config['MATCH_FULL_REFRESH_SECONDS']
+            if full:
+                self._reset()
+                self.built_at = time.monotonic()
+                base = self._item_rows().filter(DonationItem.item_id <= item_mark)
+                dirty = self._add_items(base.filter(DonationRecord.donation_type == 'request'), cutoff)
+                dirty |= self._add_items(base.filter(DonationRecord.donation_type == 'item', DonationRecord.donation_date >= cutoff), cutoff)
+                dirty |= self._set_stock(Inventory.query.filter(Inventory.quantity > 0))
+                dirty |= self._allocate(db.session.query(RequestAllocation.item_id, db.func.sum(RequestAllocation.quantity))
+                                        .filter(RequestAllocation.allocation_id <= alloc_mark).group_by(RequestAllocation.item_id))
+            elif marks != self.watermarks:
+                old_item, old_stock, old_alloc = self.watermarks
+                dirty = self._add_items(self._item_rows().filter(DonationItem.item_id > old_item, DonationItem.item_id <= item_mark), cutoff)
+                if stock_mark is not None:
+                    changed = Inventory.query if old_stock is None else Inventory.query.filter(Inventory.last_updated >= old_stock)
+                    dirty |= self._set_stock(changed)
+                dirty |= self._allocate(db.session.query(RequestAllocation.item_id, RequestAllocation.quantity)
+                                        .filter(RequestAllocation.allocation_id > old_alloc, RequestAllocation.allocation_id <= alloc_mark))
+            else:
+                dirty = set()
+            self.watermarks = marks
+            if dirty:
+                refs = {('npo', self.requests[i]["npo_id"]) for key in dirty for i in self.by_key[key][0]}
+                for key in dirty:
+                    for ref in self.by_key[key][1]:
+                        stock = self.supply[ref]
+                        refs.add(('center', stock["center_id"]) if stock["source"] == "inventory" else ('donor', stock["donor_store_id"]))
+                self._locate(refs)
+                now = datetime.utcnow()
+                for key in dirty:
+                    self._match_key(key, now)
+            return len(dirty)
+
+    def _match_key(self, key, now):
+        import numpy as np
+        request_ids, supply_ids = self.by_key[key]
+        for i in [i for i in request_ids if self.requests[i]["open"] <= 0]:
+            request_ids.discard(i)
+            del self.requests[i]
+        requests = [{**self.requests[i], "item_id": i} for i in sorted(request_ids)]
+        stock = [self.supply[ref] for ref in sorted(supply_ids) if self.supply[ref]["qty"] > 0]
+        if not requests or not stock:
+            self.matches.pop(key, None)
+            return
+
+        def coords(refs):
+            locs = [self._locations.get(ref) or (np.nan, np.nan) for ref in refs]
+            return np.array([p[0] for p in locs], dtype=float), np.array([p[1] for p in locs], dtype=float)
+
+        r_lat, r_lon = coords([('npo', r["npo_id"]) for r in requests])
+        s_lat, s_lon = coords([('center', s["center_id"]) if s["source"] == "inventory" else ('donor', s["donor_store_id"]) for s in stock])
+        dist = haversine_km(r_lat[:, None], r_lon[:, None], s_lat[None, :], s_lon[None, :])
+        known = ~np.isnan(dist)
+        dist = np.where(known, dist, current_app.config['MATCH_UNKNOWN_DISTANCE_KM'])
+        age_days = np.array([(now - r["requested_at"]).total_seconds() / 86400 if r["requested_at"] else 0.0 for r in requests])
+        penalty = np.array([current_app.config['MATCH_INCOMING_PENALTY_KM'] if s["source"] == "donation" else 0.0 for s in stock])
+        score = dist + penalty[None, :] - age_days[:, None] * current_app.config['MATCH_AGE_KM_PER_DAY']
+
+        # greedy: requests in order of their best score, each filled from its best stock first
+        columns = np.argsort(score, axis=1, kind='stable').tolist()
+        best = score[np.arange(len(requests)), [c[0] for c in columns]]
+        have = [s["qty"] for s in stock]
+        have_left = sum(have)
+        out = []
+        for i in np.argsort(best, kind='stable').tolist():
+            need = requests[i]["open"]
+            for j in columns[i]:
+                if not (need and have_left):
+                    break
+                if not have[j]:
+                    continue
+                q = min(need, have[j])
+                need -= q
+                have[j] -= q
+                have_left -= q
+                r, s = requests[i], stock[j]
+                out.append({
+                    "request_item_id": r["item_id"], "request_id": r["request_id"], "npo_id": r["npo_id"],
+                    "item_name": r["item_name"], "item_key": key, "category": item_category(key), "quantity": q,
+                    "source": s["source"], "center_id": s.get("center_id"), "donation_id": s.get("donation_id"),
+                    "stock_item_name": s["item_name"],
+                    "distance_km": round(float(dist[i, j]), 1) if known[i, j] else None,
+                    "request_age_days": round(float(age_days[i]), 1), "score": round(float(score[i, j]), 2),
+                })
+            if not have_left:
+                break
+        self.matches[key] = out
+
+    def snapshot(self):
+        """(all current matches best first, open request lines, open quantity)."""
+        with self._lock:
+            matches = sorted((m for ms in self.matches.values() for m in ms), key=lambda m: m["score"])
+            return matches, len(self.requests), sum(r["open"] for r in self.requests.values())
+
+    def stock_names(self, center_id, key):
+        """Spellings of item key in center_id's inventory, as of the last refresh()."""
+        with self._lock:
+            refs = self.by_key[key][1] if key in self.by_key else ()
+            return sorted({self.supply[ref]["item_name"] for ref in refs
+                           if ref[0] == 'inventory' and self.supply[ref]["center_id"] == center_id})
+
+
+matching_engine = app_service('matching_engine')
+
+
+@bp.route('/api/matches', methods=['GET'])
+def get_matches():
+    """
+    Proposed allocations of available stock to open NPO requests, best first.
+    Query: npo_id?, center_id?, item?, category?, source=inventory|donation?, limit?
+    Matching catches up incrementally with new requests, stock moves and allocations on each call.
+    """
+    started = time.perf_counter()
+    rematched = matching_engine.refresh()
+    matches, open_lines, open_quantity = matching_engine.snapshot()
+    npo_id = request.args.get('npo_id', type=int)
+    center_id = request.args.get('center_id', type=int)
+    item = request.args.get('item')
+    category = request.args.get('category')
+    source = request.args.get('source')
+    limit = min(max(request.args.get('limit', DEFAULT_PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+    if npo_id:
+        matches = [m for m in matches if m["npo_id"] == npo_id]
+    if center_id:
+        matches = [m for m in matches if m["center_id"] == center_id]
+    if item:
+        matches = [m for m in matches if m["item_key"] == normalise_item(item)]
+    if category:
+        matches = [m for m in matches if m["category"] == category]
+    if source:
+        matches = [m for m in matches if m["source"] == source]
+    return jsonify({
+        "matches": matches[:limit],
+        "total": len(matches),
+        "open_request_lines": open_lines,
+        "open_quantity": open_quantity,
+        "rematched_items": rematched,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+    })
+
+
+@bp.route('/api/matches/accept', methods=['POST'])
+def accept_match():
+    """
+    Fill a request line from a center's stock: distributes the items to the requesting NPO.
+    JSON: { request_item_id, center_id, quantity? (default: everything still open) }
+    The quantity is capped at what is still open and at the center's stock of the item.
+    """
+    data = request.get_json() or {}
+    item_id = data.get('request_item_id')
+    center_id = data.get('center_id')
+    quantity = data.get('quantity')
+    if not (item_id and center_id):
+        return json_error("request_item_id and center_id required", 400)
+    if isinstance(center_id, bool) or not isinstance(center_id, int):
+        return json_error("center_id must be an integer", 400)
+    if quantity is not None and (not isinstance(quantity, int) or quantity < 1):
+        return json_error("quantity must be a positive integer", 400)
+
+    matching_engine.refresh()  # outside the write: it knows each center's spellings of the item
+
+    def write():
+        line = db.session.query(DonationItem, DonationRecord).join(DonationRecord, DonationRecord.donation_id == DonationItem.donation_id) \
+            .filter(DonationItem.item_id == item_id, DonationRecord.donation_type == 'request').first()
+        if not line:
+            return "Request line not found", 404
+        item, record = line
+        allocated = db.session.query(db.func.coalesce(db.func.sum(RequestAllocation.quantity), 0)).filter(RequestAllocation.item_id == item_id).scalar()
+        still_open = (item.item_quantity or 0) - allocated
+        if still_open <= 0:
+            return "Request line already filled", 409
+        # several spellings can share a key ("Rugby ball", "rugby balls"): take the one with the most stock
+        names = matching_engine.stock_names(center_id, normalise_item(item.item_name))
+        stock = Inventory.query.filter(Inventory.center_id == center_id, Inventory.item_name.in_(names)) \
+            .order_by(Inventory.quantity.desc()).first() if names else None
+        if stock is None or not stock.quantity:
+            return "Center has no stock of this item", 409
+        q = min(quantity or still_open, still_open, stock.quantity)
+        di = DistributedItem(center_id=center_id, npo_id=record.npo_id, item_name=stock.item_name, item_quantity=q)
+        db.session.add(di)
+        db.session.flush()
+        move_stock(center_id, [(stock.item_name, -q, di.distribution_id)], 'distribute')
+        db.session.add(RequestAllocation(item_id=item_id, distribution_id=di.distribution_id, quantity=q))
+        notify(record.npo_id, 'delivery.created', delivery_id=di.distribution_id, item_name=stock.item_name, quantity=q,
+               status='pending', delivery_date=None)
+        return {"distribution_id": di.distribution_id, "quantity": q, "still_open": still_open - q}, 201
+
+    result, status = run_write(write)
+    if status != 201:
+        return json_error(result, status)
+    return jsonify({"message": "Match accepted", **result}), 201
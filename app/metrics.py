@@ -0,0 +1,141 @@
+# app/metrics.py
+from flask import jsonify
+from datetime import datetime
+
+import click
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from .cache import cached_response
+from .extensions import bp, db
+from .history import history_sources
+from .models import DonationItem, DonationRecord, DonorSummary, FeedbackReview, NPOSummary, Pickup, PlatformSummary
+
+
+# -----------------------------
+# Metric summaries
+# -----------------------------
+PLATFORM_KEY = {'summary_id': 1}
+
+
+def bump_summary(model, key, **deltas):
+    """Add deltas to a summary row (creating it if needed) inside the caller's transaction."""
+    t = model.__table__
+    stmt = sqlite_insert(t).values(**key, **deltas, updated_at=datetime.utcnow())
+    updates = {col: t.c[col] + stmt.excluded[col] for col in deltas}
+    updates['updated_at'] = stmt.excluded.updated_at
+    db.session.execute(stmt.on_conflict_do_update(index_elements=list(key), set_=updates))
+
+
+def summarise_donation(donor_store_id, donation_type, items, new_record=True):
+    """Fold a new donation, or items added to an existing one, into the summaries."""
+    qty = sum(i.item_quantity or 0 for i in items)
+    value = sum((i.item_value or 0.0) * (i.item_quantity or 0) for i in items)
+    if donor_store_id:
+        bump_summary(DonorSummary, {'donor_store_id': donor_store_id}, donation_count=int(new_record), item_count=qty, item_value=value)
+    # mirrors SQL `donation_type != 'request'`, which also excludes NULL types
+    if qty and donation_type is not None and donation_type != 'request':
+        bump_summary(PlatformSummary, PLATFORM_KEY, donated_items=qty)
+
+
+def summarise_pickup(donor_store_id, delta=1):
+    bump_summary(PlatformSummary, PLATFORM_KEY, pickup_count=delta)
+    if donor_store_id:
+        bump_summary(DonorSummary, {'donor_store_id': donor_store_id}, pickup_count=delta)
+
+
+def rebuild_summaries():
+    """Recompute every summary row from the raw tables, archived history included."""
+    for model in (DonorSummary, NPOSummary, PlatformSummary):
+        db.session.query(model).delete()
+
+    donors = {}
+
+    def donor_row(donor_id):
+        return donors.setdefault(donor_id, {'donor_store_id': donor_id, 'donation_count': 0, 'item_count': 0, 'item_value': 0.0, 'pickup_count': 0})
+
+    # hot tables and archives alike; an archive holds a donation's items next to the donation
+    donated_items = pickup_count = 0
+    for (Record, record_criteria), (Item, item_criteria), (PickupRow, pickup_criteria) in zip(
+            history_sources(DonationRecord), history_sources(DonationItem), history_sources(Pickup)):
+        for donor_id, count in db.session.query(Record.donor_store_id, db.func.count()) \
+                .filter(Record.donor_store_id.isnot(None), *record_criteria).group_by(Record.donor_store_id):
+            donor_row(donor_id)['donation_count'] += count
+        for donor_id, qty, value in db.session.query(
+                Record.donor_store_id,
+                db.func.coalesce(db.func.sum(Item.item_quantity), 0),
+                db.func.coalesce(db.func.sum(Item.item_value * Item.item_quantity), 0.0)) \
+                .join(Item, Record.donation_id == Item.donation_id) \
+                .filter(Record.donor_store_id.isnot(None), *record_criteria, *item_criteria).group_by(Record.donor_store_id):
+            row = donor_row(donor_id)
+            row['item_count'] += int(qty)
+            row['item_value'] += float(value)
+        for donor_id, count in db.session.query(PickupRow.donor_store_id, db.func.count()) \
+                .filter(PickupRow.donor_store_id.isnot(None), *pickup_criteria).group_by(PickupRow.donor_store_id):
+            donor_row(donor_id)['pickup_count'] += count
+        donated_items += db.session.query(db.func.coalesce(db.func.sum(Item.item_quantity), 0)) \
+            .join(Record, Record.donation_id == Item.donation_id) \
+            .filter(Record.donation_type != 'request', *record_criteria, *item_criteria).scalar()
+        pickup_count += db.session.query(db.func.count()).select_from(PickupRow).filter(*pickup_criteria).scalar()
+    if donors:
+        db.session.execute(db.insert(DonorSummary), list(donors.values()))
+
+    npos = [{'npo_id': npo_id, 'rating_sum': int(total), 'rating_count': count}
+            for npo_id, total, count in db.session.query(FeedbackReview.npo_id, db.func.sum(FeedbackReview.rating), db.func.count(FeedbackReview.rating))
+            .filter(FeedbackReview.npo_id.isnot(None), FeedbackReview.rating.isnot(None)).group_by(FeedbackReview.npo_id)]
+    if npos:
+        db.session.execute(db.insert(NPOSummary), npos)
+
+    db.session.add(PlatformSummary(**PLATFORM_KEY, donated_items=int(donated_items), pickup_count=pickup_count))
+    db.session.commit()
+
+
+@bp.cli.command('rebuild-summaries')
+def rebuild_summaries_command():
+    """Recompute the donor/NPO/platform metric summaries from scratch."""
+    rebuild_summaries()
+    click.echo("Metric summaries rebuilt.")
+
+
+# -----------------------------
+# Metrics endpoints
+# -----------------------------
+@bp.route('/api/metrics/npo/<int:npo_id>', methods=['GET'])
+@cached_response('platform_summary', 'npo_summaries')
+def npo_metrics(npo_id):
+    return jsonify(npo_metrics_summary(npo_id))
+
+
+def npo_metrics_summary(npo_id):
+    # platform-wide totals plus this NPO's ratings, read from the summary tables
+    platform = PlatformSummary.query.get(PLATFORM_KEY['summary_id'])
+    summary = NPOSummary.query.get(npo_id)
+    avg_rating = None
+    if summary and summary.rating_count:
+        avg_rating = summary.rating_sum / summary.rating_count
+
+    return {
+        "npo_id": npo_id,
+        "total_donations": platform.donated_items if platform else 0,
+        "total_pickups": platform.pickup_count if platform else 0,
+        "average_feedback_rating": avg_rating
+    }
+
+
+@bp.route('/api/donor/<int:donor_id>/metrics', methods=['GET'])
+@cached_response('donor_summaries', 'donation_records')
+def get_donor_metrics(donor_id):
+    return jsonify(donor_metrics_summary(donor_id))
+
+
+def donor_metrics_summary(donor_id):
+    summary = DonorSummary.query.get(donor_id)
+
+    recent_donations = DonationRecord.query.filter_by(donor_store_id=donor_id).order_by(DonationRecord.donation_date.desc()).limit(5).all()
+    recent_list = [{"donation_id": d.donation_id, "amount": d.donation_amount, "type": d.donation_type, "date": d.donation_date.isoformat()} for d in recent_donations]
+
+    return {
+        "total_donations": summary.donation_count if summary else 0,
+        "total_items": summary.item_count if summary else 0,
+        "total_value": float(summary.item_value) if summary else 0.0,
+        "recent_donations": recent_list
+    }
@@ -0,0 +1,206 @@
+# app/migrations.py
+import re
+
+import click
+
+from .extensions import bp, db
+from .models import SchemaMigration
+
+
+# -----------------------------
+# Migrations
+# -----------------------------
+# create_all() only creates missing tables, so changes to existing tables (indexes, columns)
+# ship here as well. Applied in order and recorded in schema_migrations; never edit a
+# shipped entry, append a new one.
+def add_column(table, column, ddl):
+    """Migration step: ALTER TABLE ... ADD COLUMN, unless create_all already made the column."""
+    def step():
+        existing = {row[1] for row in db.session.execute(db.text(f"PRAGMA table_info({table})"))}
+        if column not in existing:
+            db.session.execute(db.text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+    return step
+
+
+def fts_index(fts, table, key, columns):
+    """Migration steps: an external-content FTS5 index over table(columns), synced by triggers and filled once."""
+    cols = ', '.join(columns)
+    new = ', '.join(f"new.{c}" for c in columns)
+    old = ', '.join(f"old.{c}" for c in columns)
+    delete = f"INSERT INTO {fts} ({fts}, rowid, {cols}) VALUES ('delete', old.{key}, {old});"
+    insert = f"INSERT INTO {fts} (rowid, {cols}) VALUES (new.{key}, {new});"
+    return [
+        # porter folds plurals ("rugby balls" finds "rugby ball"); prefix indexes keep short prefixes cheap
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols}, content='{table}', content_rowid='{key}',"
+        f" tokenize='porter unicode61', prefix='2 3')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN {delete} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN {delete} {insert} END",
+        f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')",
+    ]
+
+
+def autoincrement_table(table, key):
+    """
+    Migration step: rebuild table with key as INTEGER PRIMARY KEY AUTOINCREMENT, keeping its rows,
+    indexes and triggers. Without AUTOINCREMENT SQLite hands a deleted top id out again, below
+    watermarks that have already passed it. Runs on its own connection: foreign keys can only be
+    switched off outside a transaction, and dropping the old table must not cascade to its children.
+    """
+    def step():
+        db.session.commit()
+        conn = db.engine.raw_connection()
+        try:
+            cur = conn.cursor()
+            sql = cur.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()
+            if sql is None or 'AUTOINCREMENT' in sql[0].upper():
+                return
+            # create_all writes "key INTEGER NOT NULL, ..., PRIMARY KEY (key)"; the schema script "key INTEGER PRIMARY KEY"
+            ddl = re.sub(rf'^CREATE TABLE\s+"?{table}"?\s*\(', f"CREATE TABLE {table}_new (", sql[0], count=1)
+            ddl = re.sub(rf',\s*PRIMARY KEY\s*\(\s*"?{key}"?\s*\)', '', ddl)
+            ddl, found = re.subn(rf'\b("?{key}"?\s+INTEGER(?:\s+NOT NULL)?)(?:\s+PRIMARY KEY)?', r'\1 PRIMARY KEY AUTOINCREMENT', ddl, count=1)
+            if not found or not ddl.startswith(f"CREATE TABLE {table}_new"):
+                raise RuntimeError(f"can't add AUTOINCREMENT to {table}: {sql[0]}")
+            extras = [row[0] for row in cur.execute(
+                "SELECT sql FROM sqlite_master WHERE tbl_name = ? AND type IN ('index', 'trigger') AND sql IS NOT NULL", (table,))]
+            columns = ', '.join(row[1] for row in cur.execute(f"PRAGMA table_info({table})"))
+            watermark = 0
+            if cur.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'rollup_watermarks'").fetchone():
+                watermark = (cur.execute("SELECT last_id FROM rollup_watermarks WHERE source = ?", (table,)).fetchone() or (0,))[0]
+
+            cur.execute("PRAGMA foreign_keys = OFF")
+            try:
+                cur.execute("BEGIN IMMEDIATE")
+                cur.execute(ddl)
+                cur.execute(f"INSERT INTO {table}_new ({columns}) SELECT {columns} FROM {table}")
+                cur.execute(f"DROP TABLE {table}")
+                cur.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+                for extra in extras:
+                    cur.execute(extra)
+                # a top id deleted before this rebuild may already be behind the watermark
+                cur.execute("INSERT INTO sqlite_sequence (name, seq) SELECT ?, 0 WHERE NOT EXISTS"
+                            " (SELECT 1 FROM sqlite_sequence WHERE name = ?)", (table, table))
+                cur.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = ?", (watermark, table))
+                cur.execute("COMMIT")
+            except BaseException:
+                cur.execute("ROLLBACK")
+                raise
+            finally:
+                cur.execute("PRAGMA foreign_keys = ON")
+        finally:
+            conn.close()
+    return step
+
+
+# Each step is a SQL string or a callable (for steps that need to look before they leap).
+MIGRATIONS = [
+    ('0001_route_indexes', [
+        # list_donations / donor metrics: filter by donor, newest first (rowid breaks ties)
+        "CREATE INDEX IF NOT EXISTS ix_donation_records_donor_date ON donation_records (donor_store_id, donation_date)",
+        "CREATE INDEX IF NOT EXISTS ix_donation_records_date ON donation_records (donation_date)",
+        # include=items batch and the item -> donation joins
+        "CREATE INDEX IF NOT EXISTS ix_donation_item_details_donation ON donation_item_details (donation_id)",
+        "CREATE INDEX IF NOT EXISTS ix_pickup_scheduling_donor_date ON pickup_scheduling (donor_store_id, scheduled_date)",
+        "CREATE INDEX IF NOT EXISTS ix_pickup_scheduling_date ON pickup_scheduling (scheduled_date)",
+        "CREATE INDEX IF NOT EXISTS ix_inventory_center_item ON inventory (center_id, item_name)",
+        "CREATE INDEX IF NOT EXISTS ix_distributed_items_date ON distributed_items (distribution_date)",
+        "CREATE INDEX IF NOT EXISTS ix_distributed_items_center ON distributed_items (center_id)",
+        "CREATE INDEX IF NOT EXISTS ix_feedback_reviews_npo_date ON feedback_reviews (npo_id, review_date)",
+        "CREATE INDEX IF NOT EXISTS ix_feedback_reviews_donor_date ON feedback_reviews (donor_store_id, review_date)",
+        "CREATE INDEX IF NOT EXISTS ix_feedback_reviews_date ON feedback_reviews (review_date)",
+        "CREATE INDEX IF NOT EXISTS ix_distribution_centers_created ON distribution_centers (created_at)",
+    ]),
+    ('0002_delivery_tracking', [
+        # recipient NPO of a distribution; /api/deliveries/<npo_id> pages through it newest first
+        add_column('distributed_items', 'npo_id', "INTEGER REFERENCES npo_profiles(npo_id)"),
+        "CREATE INDEX IF NOT EXISTS ix_distributed_items_npo_date ON distributed_items (npo_id, distribution_date)",
+        "CREATE INDEX IF NOT EXISTS ix_delivery_routes_distribution ON delivery_routes (distribution_id)",
+        "CREATE INDEX IF NOT EXISTS ix_delivery_confirmations_distribution ON delivery_confirmations (distribution_id)",
+        "CREATE INDEX IF NOT EXISTS ix_collected_items_pickup ON collected_items (pickup_id)",
+        "CREATE INDEX IF NOT EXISTS ix_sorting_records_collected_item ON sorting_records (collected_item_id)",
+    ]),
+    ('0003_inventory_ledger', [
+        # fold duplicate (center, item) rows into the oldest one, then make the pair unique
+        "UPDATE inventory SET quantity = (SELECT SUM(COALESCE(i2.quantity, 0)) FROM inventory i2"
+        " WHERE i2.center_id IS inventory.center_id AND i2.item_name IS inventory.item_name)"
+        " WHERE inventory_id IN (SELECT MIN(inventory_id) FROM inventory GROUP BY center_id, item_name HAVING COUNT(*) > 1)",
+        "DELETE FROM inventory WHERE inventory_id NOT IN (SELECT MIN(inventory_id) FROM inventory GROUP BY center_id, item_name)",
+        "UPDATE inventory SET quantity = 0 WHERE quantity IS NULL OR quantity < 0",
+        "DROP INDEX IF EXISTS ix_inventory_center_item",
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_inventory_center_item ON inventory (center_id, item_name)",
+        # SQLite can't ALTER in a CHECK constraint; these triggers are the equivalent
+        "CREATE TRIGGER IF NOT EXISTS trg_inventory_quantity_insert BEFORE INSERT ON inventory"
+        " WHEN NEW.quantity < 0 BEGIN SELECT RAISE(ABORT, 'inventory quantity cannot be negative'); END",
+        "CREATE TRIGGER IF NOT EXISTS trg_inventory_quantity_update BEFORE UPDATE OF quantity ON inventory"
+        " WHEN NEW.quantity < 0 BEGIN SELECT RAISE(ABORT, 'inventory quantity cannot be negative'); END",
+        # opening balances, so the movement log sums to the ledger from here on
+        "INSERT INTO inventory_movements (center_id, item_name, delta, reason, created_at)"
+        " SELECT center_id, item_name, quantity, 'opening', CURRENT_TIMESTAMP FROM inventory"
+        " WHERE quantity > 0 AND center_id IS NOT NULL AND item_name IS NOT NULL",
+    ]),
+    ('0004_pickup_routes', [
+        add_column('delivery_routes', 'pickup_id', "INTEGER REFERENCES pickup_scheduling(pickup_id) ON DELETE CASCADE"),
+        add_column('delivery_routes', 'route_key', "TEXT"),
+        add_column('delivery_routes', 'stop_sequence', "INTEGER"),
+        "CREATE INDEX IF NOT EXISTS ix_delivery_routes_pickup ON delivery_routes (pickup_id)",
+        "CREATE INDEX IF NOT EXISTS ix_delivery_routes_key ON delivery_routes (route_key, stop_sequence)",
+    ]),
+    ('0005_request_matching', [
+        add_column('donation_records', 'npo_id', "INTEGER REFERENCES npo_profiles(npo_id)"),
+        # the NPO dashboard used to put the requester only in the notes
+        "UPDATE donation_records SET npo_id = CAST(substr(notes, 18) AS INTEGER)"
+        " WHERE donation_type = 'request' AND npo_id IS NULL AND notes LIKE 'Requested by NPO %'"
+        " AND CAST(substr(notes, 18) AS INTEGER) IN (SELECT npo_id FROM npo_profiles)",
+        "CREATE INDEX IF NOT EXISTS ix_donation_records_type ON donation_records (donation_type, donation_id)",
+        "CREATE INDEX IF NOT EXISTS ix_inventory_updated ON inventory (last_updated)",
+        "CREATE INDEX IF NOT EXISTS ix_request_allocations_item ON request_allocations (item_id)",
+    ]),
+    ('0006_search', [
+        *fts_index('items_fts', 'donation_item_details', 'item_id', ('item_name', 'item_description')),
+        *fts_index('donations_fts', 'donation_records', 'donation_id', ('notes',)),
+        *fts_index('inventory_fts', 'inventory', 'inventory_id', ('item_name',)),
+        *fts_index('npos_fts', 'npo_profiles', 'npo_id', ('npo_name', 'city')),
+    ]),
+    ('0007_notifications', [
+        add_column('notifications', 'recipient_id', "INTEGER REFERENCES users(user_id) ON DELETE CASCADE"),
+        add_column('notifications', 'dedupe_key', "TEXT"),
+        add_column('notifications', 'delivered_at', "DATETIME"),
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_notifications_dedupe ON notifications (dedupe_key, recipient_id)",
+        "CREATE INDEX IF NOT EXISTS ix_notifications_recipient ON notifications (recipient_id, notification_id)",
+        "CREATE INDEX IF NOT EXISTS ix_notification_outbox_due ON notification_outbox (status, available_at)",
+    ]),
+    ('0008_rollup_autoincrement', [
+        # the rollups fold rows above a max-id watermark; a reused id would never be folded in
+        autoincrement_table('donation_records', 'donation_id'),
+        autoincrement_table('donation_item_details', 'item_id'),
+        autoincrement_table('pickup_scheduling', 'pickup_id'),
+        autoincrement_table('distributed_items', 'distribution_id'),
+    ]),
+]
+
+
+def migrate():
+    """Apply pending MIGRATIONS. Returns the ids applied."""
+    SchemaMigration.__table__.create(db.engine, checkfirst=True)
+    applied = {mid for (mid,) in db.session.query(SchemaMigration.migration_id)}
+    done = []
+    for migration_id, statements in MIGRATIONS:
+        if migration_id in applied:
+            continue
+        for step in statements:
+            if callable(step):
+                step()
+            else:
+                db.session.execute(db.text(step))
+        db.session.add(SchemaMigration(migration_id=migration_id))
+        db.session.commit()
+        done.append(migration_id)
+    return done
+
+
+@bp.cli.command('migrate')
+def migrate_command():
+    """Create missing tables and apply pending schema migrations."""
+    db.create_all()
+    done = migrate()
+    click.echo(f"Applied {len(done)} migration(s): {', '.join(done)}" if done else "Schema is up to date.")
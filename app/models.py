@@ -0,0 +1,398 @@
+# app/models.py
+from datetime import datetime
+
+from .extensions import db
+
+
+# -----------------------------
+# Models
+# -----------------------------
+class User(db.Model):
+    __tablename__ = 'users'
+    user_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    name = db.Column(db.Text, nullable=False)
+    email = db.Column(db.String(200), unique=True, nullable=False)
+    password_hash = db.Column(db.Text, nullable=False)
+    role = db.Column(db.String(50), nullable=False)  # donor | npo | admin
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    donor_profile = db.relationship("DonorProfile", back_populates="user", uselist=False)
+    npo_profile = db.relationship("NPOProfile", back_populates="user", uselist=False)
+
+
+class DonorProfile(db.Model):
+    __tablename__ = 'donor_store_profiles'
+    donor_store_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), primary_key=True)
+    first_name = db.Column(db.Text, nullable=False)
+    last_name = db.Column(db.Text, nullable=False)
+    email = db.Column(db.String(200), unique=True, nullable=False)
+    phone_number = db.Column(db.String(20))
+    address = db.Column(db.Text)
+    city = db.Column(db.String(100))
+    state = db.Column(db.String(100))
+    zip_code = db.Column(db.String(20))
+    country = db.Column(db.String(100))
+    date_of_birth = db.Column(db.Date)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    user = db.relationship("User", back_populates="donor_profile")
+    donations = db.relationship("DonationRecord", back_populates="donor", cascade="all, delete-orphan")
+    pickups = db.relationship("Pickup", back_populates="donor", cascade="all, delete-orphan")
+
+
+class NPOProfile(db.Model):
+    __tablename__ = 'npo_profiles'
+    npo_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), primary_key=True)
+    npo_name = db.Column(db.String(200), nullable=False)
+    contact_person = db.Column(db.String(200))
+    email = db.Column(db.String(200), unique=True, nullable=False)
+    phone_number = db.Column(db.String(20))
+    address = db.Column(db.Text)
+    city = db.Column(db.String(100))
+    state = db.Column(db.String(100))
+    zip_code = db.Column(db.String(20))
+    country = db.Column(db.String(100))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    user = db.relationship("User", back_populates="npo_profile")
+    feedbacks = db.relationship("FeedbackReview", back_populates="npo", cascade="all, delete-orphan")
+    distributions = db.relationship("DistributedItem", back_populates="npo")
+
+
+class DonationRecord(db.Model):
+    __tablename__ = 'donation_records'
+    __table_args__ = (
+        db.Index('ix_donation_records_donor_date', 'donor_store_id', 'donation_date'),
+        db.Index('ix_donation_records_date', 'donation_date'),
+        db.Index('ix_donation_records_type', 'donation_type', 'donation_id'),
+        {'sqlite_autoincrement': True},  # ids only grow: rollup watermarks rely on it
+    )
+    donation_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    donor_store_id = db.Column(db.Integer, db.ForeignKey('donor_store_profiles.donor_store_id'), nullable=True)
+    donation_date = db.Column(db.DateTime, default=datetime.utcnow)
+    donation_amount = db.Column(db.Float, nullable=False, default=0.0)
+    donation_type = db.Column(db.String(100))  # e.g. "item", "financial", "request"
+    notes = db.Column(db.Text)
+    npo_id = db.Column(db.Integer, db.ForeignKey('npo_profiles.npo_id'), nullable=True)  # requesting NPO (type 'request')
+
+    donor = db.relationship("DonorProfile", back_populates="donations")
+    items = db.relationship("DonationItem", back_populates="donation", cascade="all, delete-orphan")
+
+
+class DonationItem(db.Model):
+    __tablename__ = 'donation_item_details'
+    __table_args__ = (
+        db.Index('ix_donation_item_details_donation', 'donation_id'),
+        {'sqlite_autoincrement': True},
+    )
+    item_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    donation_id = db.Column(db.Integer, db.ForeignKey('donation_records.donation_id'), nullable=False)
+    item_name = db.Column(db.String(200), nullable=False)
+    item_description = db.Column(db.Text)
+    item_quantity = db.Column(db.Integer, nullable=False, default=1)
+    item_value = db.Column(db.Float, default=0.0)
+
+    donation = db.relationship("DonationRecord", back_populates="items")
+
+
+class Pickup(db.Model):
+    __tablename__ = 'pickup_scheduling'
+    __table_args__ = (
+        db.Index('ix_pickup_scheduling_donor_date', 'donor_store_id', 'scheduled_date'),
+        db.Index('ix_pickup_scheduling_date', 'scheduled_date'),
+        {'sqlite_autoincrement': True},
+    )
+    pickup_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    donor_store_id = db.Column(db.Integer, db.ForeignKey('donor_store_profiles.donor_store_id'), nullable=True)
+    scheduled_date = db.Column(db.DateTime, nullable=False)
+    pickup_address = db.Column(db.Text)
+    contact_person = db.Column(db.String(200))
+    contact_phone = db.Column(db.String(50))
+    status = db.Column(db.String(50), default='Scheduled')  # Scheduled | Completed | Cancelled
+
+    donor = db.relationship("DonorProfile", back_populates="pickups")
+    collected_items = db.relationship("CollectedItem", back_populates="pickup", cascade="all, delete-orphan")
+
+
+class Inventory(db.Model):
+    """Stock ledger: one row per (center, item), changed only through move_stock()."""
+    __tablename__ = 'inventory'
+    __table_args__ = (
+        # quantity >= 0 is enforced by triggers (migration 0003), which also cover old databases
+        db.Index('ux_inventory_center_item', 'center_id', 'item_name', unique=True),
+        db.Index('ix_inventory_updated', 'last_updated'),
+    )
+    inventory_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    center_id = db.Column(db.Integer, db.ForeignKey('distribution_centers.center_id'))
+    item_name = db.Column(db.String(200))
+    quantity = db.Column(db.Integer)
+    last_updated = db.Column(db.DateTime, default=datetime.utcnow)
+
+    center = db.relationship("DistributionCenter", back_populates="inventory_items")
+
+
+class InventoryMovement(db.Model):
+    """Append-only log of stock changes; per (center, item) the deltas sum to inventory.quantity."""
+    __tablename__ = 'inventory_movements'
+    __table_args__ = (
+        db.Index('ix_inventory_movements_center', 'center_id', 'movement_id'),
+        db.Index('ix_inventory_movements_center_item', 'center_id', 'item_name', 'movement_id'),
+    )
+    movement_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    center_id = db.Column(db.Integer, db.ForeignKey('distribution_centers.center_id'), nullable=False)
+    item_name = db.Column(db.String(200), nullable=False)
+    delta = db.Column(db.Integer, nullable=False)
+    reason = db.Column(db.String(20), nullable=False)  # opening | receive | adjust | distribute | transfer_in | transfer_out
+    ref_id = db.Column(db.Integer)  # distribution_id for 'distribute', the other center for transfers
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class DistributedItem(db.Model):
+    __tablename__ = 'distributed_items'
+    __table_args__ = (
+        db.Index('ix_distributed_items_date', 'distribution_date'),
+        db.Index('ix_distributed_items_center', 'center_id'),
+        db.Index('ix_distributed_items_npo_date', 'npo_id', 'distribution_date'),
+        {'sqlite_autoincrement': True},
+    )
+    distribution_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    center_id = db.Column(db.Integer, db.ForeignKey('distribution_centers.center_id'), nullable=True)
+    npo_id = db.Column(db.Integer, db.ForeignKey('npo_profiles.npo_id'), nullable=True)  # recipient
+    item_name = db.Column(db.String(200), nullable=False)
+    item_quantity = db.Column(db.Integer, nullable=False, default=0)
+    distribution_date = db.Column(db.DateTime, default=datetime.utcnow)
+
+    center = db.relationship("DistributionCenter", back_populates="distributed_items")
+    npo = db.relationship("NPOProfile", back_populates="distributions")
+    routes = db.relationship("DeliveryRoute", back_populates="distribution", cascade="all, delete-orphan")
+    confirmations = db.relationship("DeliveryConfirmation", back_populates="distribution", cascade="all, delete-orphan")
+
+
+class FeedbackReview(db.Model):
+    __tablename__ = 'feedback_reviews'
+    __table_args__ = (
+        db.Index('ix_feedback_reviews_npo_date', 'npo_id', 'review_date'),
+        db.Index('ix_feedback_reviews_donor_date', 'donor_store_id', 'review_date'),
+        db.Index('ix_feedback_reviews_date', 'review_date'),
+    )
+    review_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    donor_store_id = db.Column(db.Integer, db.ForeignKey('donor_store_profiles.donor_store_id'), nullable=True)
+    npo_id = db.Column(db.Integer, db.ForeignKey('npo_profiles.npo_id'), nullable=True)
+    rating = db.Column(db.Integer)
+    comments = db.Column(db.Text)
+    review_date = db.Column(db.DateTime, default=datetime.utcnow)
+
+    npo = db.relationship("NPOProfile", back_populates="feedbacks")
+
+
+class DistributionCenter(db.Model):
+    __tablename__ = 'distribution_centers'
+    __table_args__ = (
+        db.Index('ix_distribution_centers_created', 'created_at'),
+    )
+    center_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    center_name = db.Column(db.String(200), nullable=False)
+    address = db.Column(db.Text)
+    city = db.Column(db.String(100))
+    state = db.Column(db.String(100))
+    zip_code = db.Column(db.String(20))
+    country = db.Column(db.String(100))
+    contact_person = db.Column(db.String(200))
+    contact_phone = db.Column(db.String(50))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    inventory_items = db.relationship("Inventory", back_populates="center", cascade="all, delete-orphan")
+    distributed_items = db.relationship("DistributedItem", back_populates="center", cascade="all, delete-orphan")
+
+
+# Collection -> sorting -> delivery tracking
+class CollectedItem(db.Model):
+    __tablename__ = 'collected_items'
+    __table_args__ = (
+        db.Index('ix_collected_items_pickup', 'pickup_id'),
+    )
+    collected_item_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    pickup_id = db.Column(db.Integer, db.ForeignKey('pickup_scheduling.pickup_id', ondelete='CASCADE'))
+    item_name = db.Column(db.String(200), nullable=False)
+    item_quantity = db.Column(db.Integer, nullable=False, default=0)
+    item_condition = db.Column(db.String(100))
+
+    pickup = db.relationship("Pickup", back_populates="collected_items")
+    sorting_records = db.relationship("SortingRecord", back_populates="collected_item", cascade="all, delete-orphan")
+
+
+class SortingRecord(db.Model):
+    __tablename__ = 'sorting_records'
+    __table_args__ = (
+        db.Index('ix_sorting_records_collected_item', 'collected_item_id'),
+        {'sqlite_autoincrement': True},
+    )
+    sorting_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    collected_item_id = db.Column(db.Integer, db.ForeignKey('collected_items.collected_item_id', ondelete='CASCADE'))
+    center_id = db.Column(db.Integer, db.ForeignKey('distribution_centers.center_id', ondelete='SET NULL'))
+    sorted_category = db.Column(db.String(100))
+    sorted_quantity = db.Column(db.Integer)
+    sorted_date = db.Column(db.DateTime, default=datetime.utcnow)
+
+    collected_item = db.relationship("CollectedItem", back_populates="sorting_records")
+
+
+ROUTE_STATUSES = ('planned', 'in_transit', 'completed')
+
+
+class DeliveryRoute(db.Model):
+    __tablename__ = 'delivery_routes'
+    __table_args__ = (
+        db.Index('ix_delivery_routes_distribution', 'distribution_id'),
+        db.Index('ix_delivery_routes_pickup', 'pickup_id'),
+        db.Index('ix_delivery_routes_key', 'route_key', 'stop_sequence'),
+        db.CheckConstraint("route_status IN ('planned','in_transit','completed')", name='ck_delivery_routes_status'),
+        {'sqlite_autoincrement': True},
+    )
+    route_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    distribution_id = db.Column(db.Integer, db.ForeignKey('distributed_items.distribution_id', ondelete='CASCADE'))
+    origin_address = db.Column(db.Text)
+    destination_address = db.Column(db.Text)
+    estimated_delivery_time = db.Column(db.String(50))
+    route_status = db.Column(db.String(20), default='planned')  # planned | in_transit | completed
+    # pickup runs (see plan_pickup_routes): one row per stop, grouped by '<day>/<region>/<run>'
+    pickup_id = db.Column(db.Integer, db.ForeignKey('pickup_scheduling.pickup_id', ondelete='CASCADE'))
+    route_key = db.Column(db.String(150))
+    stop_sequence = db.Column(db.Integer)
+
+    distribution = db.relationship("DistributedItem", back_populates="routes")
+
+
+class DeliveryConfirmation(db.Model):
+    __tablename__ = 'delivery_confirmations'
+    __table_args__ = (
+        db.Index('ix_delivery_confirmations_distribution', 'distribution_id'),
+    )
+    confirmation_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    distribution_id = db.Column(db.Integer, db.ForeignKey('distributed_items.distribution_id', ondelete='CASCADE'))
+    received_by = db.Column(db.String(200))
+    received_date = db.Column(db.DateTime, default=datetime.utcnow)
+    notes = db.Column(db.Text)
+
+    distribution = db.relationship("DistributedItem", back_populates="confirmations")
+
+
+class RequestAllocation(db.Model):
+    """Stock handed out against an NPO request line (/api/matches/accept); reduces what is still open."""
+    __tablename__ = 'request_allocations'
+    __table_args__ = (
+        db.Index('ix_request_allocations_item', 'item_id'),
+    )
+    allocation_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    item_id = db.Column(db.Integer, db.ForeignKey('donation_item_details.item_id', ondelete='CASCADE'), nullable=False)
+    distribution_id = db.Column(db.Integer, db.ForeignKey('distributed_items.distribution_id', ondelete='SET NULL'))
+    quantity = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class Geocode(db.Model):
+    """Local geocoding table: normalised address -> coordinates and region (flask load-geocodes)."""
+    __tablename__ = 'geocodes'
+    address_key = db.Column(db.String(300), primary_key=True)
+    latitude = db.Column(db.Float, nullable=False)
+    longitude = db.Column(db.Float, nullable=False)
+    region = db.Column(db.String(100))
+
+
+# Materialised metrics: running totals kept up to date by the write routes
+# (see bump_summary) so the metrics endpoints are primary-key lookups.
+class DonorSummary(db.Model):
+    __tablename__ = 'donor_summaries'
+    donor_store_id = db.Column(db.Integer, primary_key=True)
+    donation_count = db.Column(db.Integer, nullable=False, default=0)
+    item_count = db.Column(db.Integer, nullable=False, default=0)
+    item_value = db.Column(db.Float, nullable=False, default=0.0)  # sum of item_value * item_quantity
+    pickup_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class NPOSummary(db.Model):
+    __tablename__ = 'npo_summaries'
+    npo_id = db.Column(db.Integer, primary_key=True)
+    rating_sum = db.Column(db.Integer, nullable=False, default=0)
+    rating_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class PlatformSummary(db.Model):
+    __tablename__ = 'platform_summary'
+    summary_id = db.Column(db.Integer, primary_key=True)  # single row, PLATFORM_KEY
+    donated_items = db.Column(db.Integer, nullable=False, default=0)  # items on non-request donations
+    pickup_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+# Time-bucketed rollups, folded in incrementally from rows above each source's watermark.
+class RollupBucket(db.Model):
+    __tablename__ = 'rollup_buckets'
+    grain = db.Column(db.String(10), primary_key=True)  # day | week | month | total
+    bucket = db.Column(db.String(10), primary_key=True)  # bucket start date (YYYY-MM-DD), '' for total
+    metric = db.Column(db.String(50), primary_key=True)
+    dim_id = db.Column(db.Integer, primary_key=True, autoincrement=False, default=0)  # e.g. center_id
+    dim_label = db.Column(db.String(200), primary_key=True, default='')  # e.g. pickup status, item name
+    value = db.Column(db.Float, nullable=False, default=0.0)
+
+
+class RollupWatermark(db.Model):
+    __tablename__ = 'rollup_watermarks'
+    source = db.Column(db.String(50), primary_key=True)  # source table name
+    last_id = db.Column(db.Integer, nullable=False, default=0)  # highest primary key folded in
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+NOTIFICATION_TYPES = ('donation_ready', 'stock_available', 'pickup_scheduled')
+
+
+class Notification(db.Model):
+    """One delivered (or due) notification per recipient; dedupe_key + recipient_id is unique."""
+    __tablename__ = 'notifications'
+    __table_args__ = (
+        db.Index('ux_notifications_dedupe', 'dedupe_key', 'recipient_id', unique=True),
+        db.Index('ix_notifications_recipient', 'recipient_id', 'notification_id'),
+        db.CheckConstraint("sender_role IN ('store','system','admin')", name='ck_notifications_sender'),
+        db.CheckConstraint("recipient_role IN ('admin','npo')", name='ck_notifications_recipient'),
+        db.CheckConstraint("notification_type IN ('donation_ready','stock_available','pickup_scheduled')", name='ck_notifications_type'),
+        {'sqlite_autoincrement': True},
+    )
+    notification_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    sender_role = db.Column(db.String(20))
+    recipient_role = db.Column(db.String(20))
+    message = db.Column(db.Text)
+    related_item_id = db.Column(db.Integer)
+    notification_type = db.Column(db.String(50))
+    sent_at = db.Column(db.DateTime, default=datetime.utcnow)
+    recipient_id = db.Column(db.Integer, db.ForeignKey('users.user_id', ondelete='CASCADE'))
+    dedupe_key = db.Column(db.String(200))
+    delivered_at = db.Column(db.DateTime)
+
+
+class NotificationOutbox(db.Model):
+    """Notification events written in the producer's transaction; drained by NotificationWorker."""
+    __tablename__ = 'notification_outbox'
+    __table_args__ = (
+        db.Index('ix_notification_outbox_due', 'status', 'available_at'),
+    )
+    outbox_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    notification_type = db.Column(db.String(50), nullable=False)
+    sender_role = db.Column(db.String(20), nullable=False)
+    related_item_id = db.Column(db.Integer)
+    message = db.Column(db.Text, nullable=False)
+    dedupe_key = db.Column(db.String(200), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending | done | failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    available_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)  # next try, or lease expiry while claimed
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class SchemaMigration(db.Model):
+    __tablename__ = 'schema_migrations'
+    migration_id = db.Column(db.String(100), primary_key=True)
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -0,0 +1,275 @@
+# app/outbox.py
+from flask import current_app
+from collections import Counter, deque
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+import json
+import logging
+import os
+import smtplib
+import threading
+import time
+
+import click
+from sqlalchemy import event
+
+from .extensions import RoutingSession, app_service, bp, db
+from .models import Notification, NotificationOutbox, User
+from .writes import run_write
+
+
+# -----------------------------
+# Notifications (outbox)
+# -----------------------------
+# Producers only add a notification_outbox row inside their own transaction
+# (enqueue_notification), so a request never waits on delivery and nothing is announced for
+# a rolled-back write. NotificationWorker threads claim due events in batches, expand each
+# to its recipients as notifications rows (INSERT OR IGNORE on dedupe_key + recipient, so
+# repeats collapse), hand the undelivered ones to the sinks and mark them delivered. A batch
+# whose sinks fail is retried with exponential backoff; delivery is at-least-once.
+NOTIFICATION_RECIPIENTS = {'donation_ready': 'admin', 'pickup_scheduled': 'admin', 'stock_available': 'npo'}
+notification_log = logging.getLogger('app.notifications')
+
+
+class LogSink:
+    def send(self, notifications):
+        for n in notifications:
+            notification_log.info("%s -> %s: %s", n["notification_type"], n["email"], n["message"])
+
+
+class FileSink:
+    """Appends one JSON line per notification: a local stand-in for a real channel."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def send(self, notifications):
+        lines = ''.join(json.dumps(n, default=str) + '\n' for n in notifications)
+        with self._lock, open(self.path, 'a', encoding='utf-8') as fh:
+            fh.write(lines)
+
+
+class SMTPSink:
+    """One SMTP session per batch; point it at a local debugging server for testing."""
+
+    def __init__(self, host, port=25, sender='notifications@localhost'):
+        self.host, self.port, self.sender = host, int(port), sender
+
+    def send(self, notifications):
+        with smtplib.SMTP(self.host, self.port, timeout=10) as smtp:
+            for n in notifications:
+                msg = EmailMessage()
+                msg['From'] = self.sender
+                msg['To'] = n["email"]
+                msg['Subject'] = n["notification_type"].replace('_', ' ').capitalize()
+                msg.set_content(n["message"])
+                smtp.send_message(msg)
+
+
+def default_sinks():
+    sinks = []
+    if os.environ.get('NOTIFY_FILE'):
+        sinks.append(FileSink(os.environ['NOTIFY_FILE']))
+    if os.environ.get('NOTIFY_SMTP'):
+        sinks.append(SMTPSink(*os.environ['NOTIFY_SMTP'].split(':', 1)))
+    return sinks or [LogSink()]
+
+
+notification_sinks = app_service('notification_sinks')
+
+
+def _outbox_row(notification_type, related_item_id, message, dedupe_key=None, sender_role='system'):
+    if notification_type not in NOTIFICATION_RECIPIENTS:
+        raise ValueError(f"unknown notification type {notification_type!r}")
+    return {"notification_type": notification_type, "sender_role": sender_role, "related_item_id": related_item_id,
+            "message": message, "dedupe_key": dedupe_key or f"{notification_type}:{related_item_id}"}
+
+
+def enqueue_notification(notification_type, related_item_id, message, dedupe_key=None, sender_role='system'):
+    """Add a notification event to the outbox inside the caller's transaction. Unknown types raise ValueError."""
+    db.session.add(NotificationOutbox(**_outbox_row(notification_type, related_item_id, message, dedupe_key, sender_role)))
+    db.session.info['outbox_written'] = True
+
+
+def enqueue_notifications(events, sender_role='system'):
+    """enqueue_notification for many (notification_type, related_item_id, message) events: one executemany INSERT."""
+    rows = [_outbox_row(*e, sender_role=sender_role) for e in events]
+    if rows:
+        db.session.execute(db.insert(NotificationOutbox.__table__), rows)
+        db.session.info['outbox_written'] = True
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _wake_notification_worker(session):
+    if session.in_nested_transaction():
+        return
+    if session.info.pop('outbox_written', False):
+        notification_worker.wake()
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _forget_outbox_written(session):
+    if session.in_nested_transaction():
+        return
+    session.info.pop('outbox_written', None)
+
+
+class NotificationWorker:
+    """
+    NOTIFY_WORKERS daemon threads draining the outbox (started lazily, and again after a fork).
+    Claiming moves available_at forward by a lease, so several workers (or processes) never
+    take the same event twice, and an event whose worker died is picked up again.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._wakeup = threading.Event()
+        self._threads = []
+        self._pid = None
+        self._lock = threading.Lock()
+        self.counts = Counter()  # batches, events, delivered, retries, failed
+        self._recent = deque()  # (monotonic time, delivered) over the last minute
+
+    def wake(self):
+        with self._lock:
+            if current_app.config['NOTIFY_WORKERS'] and (not self._threads or self._pid != os.getpid()):
+                self._pid = os.getpid()
+                self._threads = [threading.Thread(target=self._run, name=f'notify-{n}', daemon=True)
+                                 for n in range(current_app.config['NOTIFY_WORKERS'])]
+                for t in self._threads:
+                    t.start()
+        self._wakeup.set()
+
+    def _run(self):
+        with self.app.app_context():
+            while True:
+                self._wakeup.wait(current_app.config['NOTIFY_POLL_SECONDS'])
+                self._wakeup.clear()
+                try:
+                    self.drain()
+                except Exception:
+                    notification_log.exception("notification worker round failed")
+                    db.session.rollback()
+                finally:
+                    db.session.close()
+
+    def drain(self):
+        """Process due outbox events until none are left. Returns the number of events handled."""
+        handled = 0
+        while True:
+            # writes go through run_write, so with WRITE_QUEUE they share the request writer
+            batch, parked = run_write(self._claim)
+            if parked:
+                with self._lock:
+                    self.counts.update(failed=parked)
+            if not batch and not parked:
+                return handled
+            if batch:
+                self._deliver(batch)
+            handled += len(batch) + parked
+
+    @staticmethod
+    def _claim():
+        """
+        Take due events (moving available_at out by a lease) and expand them to notifications rows.
+        Returns (claimed events, how many were parked as failed because no recipient role maps to their type).
+        """
+        box = NotificationOutbox.__table__
+        now = datetime.utcnow()
+        due = db.select(box.c.outbox_id).where(box.c.status == 'pending', box.c.available_at <= now) \
+            .order_by(box.c.available_at).limit(current_app.config['NOTIFY_BATCH'])
+        batch = db.session.execute(
+            box.update().where(box.c.outbox_id.in_(due))
+            .values(attempts=box.c.attempts + 1, available_at=now + timedelta(seconds=current_app.config['NOTIFY_LEASE_SECONDS']))
+            .returning(box.c.outbox_id, box.c.notification_type, box.c.sender_role, box.c.related_item_id,
+                       box.c.message, box.c.dedupe_key, box.c.attempts)
+        ).all()
+        # a row that predates the check in enqueue_notification must not fail every batch it lands in
+        unknown = [e.outbox_id for e in batch if e.notification_type not in NOTIFICATION_RECIPIENTS]
+        if unknown:
+            db.session.execute(box.update().where(box.c.outbox_id.in_(unknown))
+                               .values(status='failed', last_error="unknown notification type"))
+            batch = [e for e in batch if e.notification_type in NOTIFICATION_RECIPIENTS]
+        for e in batch:
+            # one INSERT ... SELECT per event, however many recipients it fans out to
+            db.session.execute(db.text(
+                "INSERT OR IGNORE INTO notifications (sender_role, recipient_role, message, related_item_id,"
+                " notification_type, sent_at, recipient_id, dedupe_key)"
+                " SELECT :sender_role, :recipient_role, :message, :related_item_id, :notification_type, :now, user_id, :dedupe_key"
+                " FROM users WHERE role = :recipient_role"),
+                {"sender_role": e.sender_role, "recipient_role": NOTIFICATION_RECIPIENTS[e.notification_type], "message": e.message,
+                 "related_item_id": e.related_item_id, "notification_type": e.notification_type, "now": now, "dedupe_key": e.dedupe_key})
+        return [tuple(e) for e in batch], len(unknown)
+
+    def _deliver(self, batch):
+        notes = Notification.__table__
+        keys = {e[5] for e in batch}
+        try:
+            pending = [dict(r) for r in db.session.execute(
+                db.select(notes.c.notification_id, notes.c.notification_type, notes.c.message, notes.c.related_item_id,
+                          notes.c.recipient_id, User.email)
+                .join(User.__table__, User.user_id == notes.c.recipient_id)
+                .where(notes.c.dedupe_key.in_(keys), notes.c.delivered_at.is_(None))
+            ).mappings()]
+            db.session.rollback()  # end the read before the (slow) sinks run
+            for sink in notification_sinks:
+                if pending:
+                    sink.send(pending)
+        except Exception as exc:
+            db.session.rollback()
+            notification_log.warning("notification batch of %d failed: %s", len(batch), exc)
+            failed = run_write(lambda: self._reschedule(batch, repr(exc)[:500]))
+            with self._lock:
+                self.counts.update(batches=1, retries=len(batch) - failed, failed=failed)
+            return
+        run_write(lambda: self._mark_delivered(batch, [n["notification_id"] for n in pending]))
+        with self._lock:
+            self.counts.update(batches=1, events=len(batch), delivered=len(pending))
+            self._recent.append((time.monotonic(), len(pending)))
+
+    @staticmethod
+    def _mark_delivered(batch, notification_ids):
+        box, notes = NotificationOutbox.__table__, Notification.__table__
+        now = datetime.utcnow()
+        for start in range(0, len(notification_ids), 500):
+            db.session.execute(notes.update().where(notes.c.notification_id.in_(notification_ids[start:start + 500])).values(delivered_at=now))
+        db.session.execute(box.update().where(box.c.outbox_id.in_([e[0] for e in batch])).values(status='done', last_error=None))
+
+    @staticmethod
+    def _reschedule(batch, error):
+        """Back off each event of a failed batch, or park it once out of attempts. Returns how many were parked."""
+        box = NotificationOutbox.__table__
+        now = datetime.utcnow()
+        failed = 0
+        for outbox_id, *_, attempts in batch:
+            values = {"last_error": error}
+            if attempts >= current_app.config['NOTIFY_MAX_ATTEMPTS']:
+                values["status"] = 'failed'
+                failed += 1
+            else:
+                values["available_at"] = now + timedelta(seconds=current_app.config['NOTIFY_BACKOFF_SECONDS'] * 2 ** (attempts - 1))
+            db.session.execute(box.update().where(box.c.outbox_id == outbox_id).values(**values))
+        return failed
+
+    def stats(self):
+        with self._lock:
+            cutoff = time.monotonic() - 60
+            while self._recent and self._recent[0][0] < cutoff:
+                self._recent.popleft()
+            return {**self.counts, "delivered_per_second_1m": round(sum(n for _, n in self._recent) / 60, 2),
+                    "workers": sum(t.is_alive() for t in self._threads)}
+
+
+notification_worker = app_service('notification_worker')
+
+
+@bp.cli.command('notify-drain')
+def notify_drain_command():
+    """Deliver every due notification now (for cron, or with NOTIFY_WORKERS=0)."""
+    started = time.perf_counter()
+    handled = notification_worker.drain()
+    elapsed = time.perf_counter() - started
+    stats = notification_worker.stats()
+    click.echo(f"{handled} event(s), {stats.get('delivered', 0)} notification(s) delivered in {elapsed:.2f}s; "
+               f"{stats.get('retries', 0)} retried, {stats.get('failed', 0)} failed.")
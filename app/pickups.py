@@ -0,0 +1,142 @@
+# app/pickups.py
+from flask import request, jsonify
+from datetime import datetime
+
+from .events import notify
+from .extensions import bp, db
+from .helpers import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, encode_cursor, json_error, parse_iso_datetime
+from .history import history_sources
+from .metrics import summarise_pickup
+from .models import Pickup
+from .outbox import enqueue_notification
+from .rollups import adjust_pickup_rollup
+from .rows import iso_datetime, rows_response, select_rows, table_columns
+from .writes import run_write
+
+
+# -----------------------------
+# Pickups
+# -----------------------------
+@bp.route('/api/pickups', methods=['POST'])
+def schedule_pickup():
+    data = request.get_json() or {}
+    donor_store_id = data.get('donor_store_id') or data.get('donor_id')
+    scheduled_date = data.get('scheduled_date')
+    pickup_address = data.get('pickup_address')
+    contact_person = data.get('contact_person')
+    contact_phone = data.get('contact_phone')
+
+    if not scheduled_date:
+        return json_error("scheduled_date required", 400)
+
+    try:
+        scheduled_dt = parse_iso_datetime(scheduled_date)
+    except ValueError:
+        return json_error("scheduled_date must be ISO format (YYYY-MM-DD or full ISO datetime)", 400)
+
+    def write():
+        p = Pickup(donor_store_id=donor_store_id, scheduled_date=scheduled_dt, pickup_address=pickup_address, contact_person=contact_person, contact_phone=contact_phone, status='Scheduled')
+        db.session.add(p)
+        summarise_pickup(donor_store_id)
+        db.session.flush()
+        enqueue_notification('pickup_scheduled', p.pickup_id, f"Pickup #{p.pickup_id} scheduled for {scheduled_dt:%Y-%m-%d}"
+                             f"{' at ' + pickup_address if pickup_address else ''}", sender_role='store')
+        return p.pickup_id
+
+    return jsonify({"message": "Pickup scheduled", "pickup_id": run_write(write)}), 201
+
+
+PICKUP_FIELDS = ('pickup_id', 'donor_store_id', 'scheduled_date', 'pickup_address', 'contact_person', 'contact_phone', 'status')
+
+
+def pickup_rows(donor_id=None, limit=None, include_archived=False, after=None):
+    """
+    Pickups, latest scheduled first, optionally for one donor. after is the
+    (scheduled_date, pickup_id) of the previous page's last row.
+    """
+    rows = []
+    for entity, criteria in history_sources(Pickup, include_archived):
+        stmt = db.select(*table_columns(entity, *PICKUP_FIELDS)).where(*criteria)
+        if donor_id:
+            stmt = stmt.where(entity.donor_store_id == donor_id)
+        if after:
+            stmt = stmt.where(db.tuple_(entity.scheduled_date, entity.pickup_id) < after)
+        stmt = stmt.order_by(entity.scheduled_date.desc(), entity.pickup_id.desc()).limit(limit)
+        rows += select_rows(stmt, scheduled_date=iso_datetime)
+    if include_archived:
+        rows.sort(key=lambda r: (r['scheduled_date'], r['pickup_id']), reverse=True)
+    return rows[:limit]
+
+
+def pickup_page(donor_id, limit=DEFAULT_PAGE_SIZE, after=None, include_archived=False):
+    """One page of a donor's pickups, as { pickups, next_cursor }; next_cursor is null on the last page."""
+    rows = pickup_rows(donor_id, limit + 1, include_archived, after)
+    last = rows[limit - 1] if len(rows) > limit else None
+    return {"pickups": rows[:limit], "next_cursor": encode_cursor([last['scheduled_date'], last['pickup_id']]) if last else None}
+
+
+# GET all pickups (optionally filter by query param donor_store_id; include_archived=1 adds archived ones)
+@bp.route('/api/pickups', methods=['GET'])
+def get_pickups():
+    return rows_response(pickup_rows(request.args.get('donor_store_id', type=int), include_archived=request.args.get('include_archived') == '1'))
+
+
+# Get pickups by donor id (convenience route frontend expects)
+@bp.route('/api/pickups/<int:donor_id>', methods=['GET'])
+def get_pickups_by_donor(donor_id):
+    """
+    All of a donor's pickups, latest scheduled first.
+    Query: include_archived=1?, limit?, cursor? (with either, one page as { pickups, next_cursor }
+    where next_cursor is null on the last page, keyset-paginated like /api/donations)
+    """
+    archived = request.args.get('include_archived') == '1'
+    if 'limit' not in request.args and 'cursor' not in request.args:
+        return rows_response(pickup_rows(donor_id, include_archived=archived))
+    limit = min(max(request.args.get('limit', DEFAULT_PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+    after = None
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            last_date, last_id = decode_cursor(cursor)
+            after = datetime.fromisoformat(last_date), int(last_id)
+        except (ValueError, TypeError):
+            return json_error("Invalid cursor", 400)
+    return jsonify(pickup_page(donor_id, limit, after, archived))
+
+
+@bp.route('/api/pickups/<int:pid>/status', methods=['PUT'])
+def update_pickup_status(pid):
+    data = request.get_json() or {}
+    if "status" not in data:
+        return json_error("status required", 400)
+
+    def write():
+        p = Pickup.query.get(pid)
+        if not p:
+            return None
+        adjust_pickup_rollup(p, p.status, -1)
+        p.status = data["status"]
+        adjust_pickup_rollup(p, p.status, 1)
+        notify(p.donor_store_id, 'pickup.status', pickup_id=pid, status=p.status)
+        return p.status
+
+    status = run_write(write)
+    if status is None:
+        return json_error("Pickup not found", 404)
+    return jsonify({"message": "Updated", "pickup_id": pid, "status": status})
+
+
+@bp.route('/api/pickups/<int:pid>', methods=['DELETE'])
+def delete_pickup(pid):
+    def write():
+        p = Pickup.query.get(pid)
+        if not p:
+            return False
+        db.session.delete(p)
+        summarise_pickup(p.donor_store_id, delta=-1)
+        adjust_pickup_rollup(p, p.status, -1)
+        return True
+
+    if not run_write(write):
+        return json_error("Pickup not found", 404)
+    return jsonify({"message": "Pickup deleted", "pickup_id": pid})
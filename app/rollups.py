@@ -0,0 +1,273 @@
+# app/rollups.py
+from flask import current_app, request, jsonify
+from collections import defaultdict
+from datetime import datetime, timedelta
+import functools
+import time
+
+import click
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from .extensions import bp, db
+from .helpers import json_error
+from .history import history_sources
+from .models import (DistributedItem, DistributionCenter, DonationItem, DonationRecord, Pickup, RollupBucket,
+                     RollupWatermark)
+from .writes import run_write
+
+
+# -----------------------------
+# Rollups (KPIs / impact reports)
+# -----------------------------
+ROLLUP_BATCH_SIZE = 5000
+_rollups_refreshed_at = {}  # DATABASE_PATH -> monotonic time of its last refresh
+
+
+def rollup_buckets_for(dt):
+    """(grain, bucket) pairs a timestamp contributes to; undated rows only count towards the total."""
+    if dt is None:
+        return [('total', '')]
+    d = dt.date()
+    return [
+        ('day', d.isoformat()),
+        ('week', (d - timedelta(days=d.weekday())).isoformat()),
+        ('month', d.replace(day=1).isoformat()),
+        ('total', ''),
+    ]
+
+
+# Each source turns one new row into facts: (timestamp, metric, dim_id, dim_label, value).
+def _donation_facts(r):
+    if r.donation_type == 'request':
+        return [(r.donation_date, 'requests', 0, '', 1)]
+    return [(r.donation_date, 'donations', 0, '', 1), (r.donation_date, 'donation_amount', 0, '', r.donation_amount or 0.0)]
+
+
+def _item_facts(r):
+    if r.donation_type == 'request':
+        return []
+    qty = r.item_quantity or 0
+    return [(r.donation_date, 'items', 0, '', qty), (r.donation_date, 'item_value', 0, '', (r.item_value or 0.0) * qty)]
+
+
+def _pickup_facts(r):
+    return [(r.scheduled_date, 'pickups', 0, r.status or '', 1)]
+
+
+def _distribution_facts(r):
+    return [(r.distribution_date, 'distributed', r.center_id or 0, r.item_name, r.item_quantity or 0)]
+
+
+def _rollup_sources(Record=DonationRecord, Item=DonationItem, PickupRow=Pickup, Distribution=DistributedItem):
+    # (watermark name, primary key column, select of new rows, fact function); pass aliased models to read an archive
+    return [
+        ('donation_records', Record.donation_id,
+         db.select(Record.donation_id, Record.donation_date, Record.donation_type, Record.donation_amount),
+         _donation_facts),
+        ('donation_item_details', Item.item_id,
+         db.select(Item.item_id, Item.item_quantity, Item.item_value, Record.donation_date, Record.donation_type)
+         .join(Record, Record.donation_id == Item.donation_id),
+         _item_facts),
+        ('pickup_scheduling', PickupRow.pickup_id,
+         db.select(PickupRow.pickup_id, PickupRow.scheduled_date, PickupRow.status),
+         _pickup_facts),
+        ('distributed_items', Distribution.distribution_id,
+         db.select(Distribution.distribution_id, Distribution.distribution_date, Distribution.center_id, Distribution.item_name, Distribution.item_quantity),
+         _distribution_facts),
+    ]
+
+
+def _add_to_buckets(totals):
+    """Add {(grain, bucket, metric, dim_id, dim_label): value} onto the rollup table in one executemany."""
+    if not totals:
+        return
+    t = RollupBucket.__table__
+    stmt = sqlite_insert(t)
+    stmt = stmt.on_conflict_do_update(index_elements=[c.name for c in t.primary_key.columns], set_={'value': t.c.value + stmt.excluded.value})
+    db.session.execute(stmt, [
+        {'grain': g, 'bucket': b, 'metric': m, 'dim_id': dim_id, 'dim_label': label, 'value': v}
+        for (g, b, m, dim_id, label), v in totals.items()
+    ])
+
+
+def _fold_into_buckets(rows, facts):
+    totals = defaultdict(float)
+    for row in rows:
+        for dt, metric, dim_id, dim_label, value in facts(row):
+            for grain, bucket in rollup_buckets_for(dt):
+                totals[(grain, bucket, metric, dim_id, dim_label)] += value
+    _add_to_buckets(totals)
+
+
+def refresh_rollups():
+    """
+    Fold rows added since the last watermark into the rollups. Returns the number of source rows processed.
+    Each batch is a run_write job, since it reads before it writes, and the GET routes that call this
+    would otherwise race the write routes for SQLite's lock.
+    """
+    sources = _rollup_sources()
+    if db.session.query(RollupWatermark).count() < len(sources):
+        run_write(lambda: db.session.execute(sqlite_insert(RollupWatermark.__table__)
+                                             .values([{'source': name, 'last_id': 0} for name, *_ in sources]).on_conflict_do_nothing()))
+
+    processed = 0
+    for name, pk, stmt, facts in sources:
+        last_id = db.session.execute(db.select(RollupWatermark.last_id).where(RollupWatermark.source == name)).scalar()
+        if db.session.execute(db.select(pk).where(pk > last_id).limit(1)).first() is None:
+            continue  # nothing new: no write lock taken
+        while True:
+            folded = run_write(functools.partial(_fold_rollup_batch, name, pk, stmt, facts))
+            processed += folded
+            if folded < ROLLUP_BATCH_SIZE:
+                break
+    _rollups_refreshed_at[current_app.config['DATABASE_PATH']] = time.monotonic()
+    return processed
+
+
+def _fold_rollup_batch(name, pk, stmt, facts):
+    last_id = db.session.execute(db.select(RollupWatermark.last_id).where(RollupWatermark.source == name)).scalar()
+    rows = db.session.execute(stmt.where(pk > last_id).order_by(pk).limit(ROLLUP_BATCH_SIZE)).all()
+    if not rows:
+        return 0
+    # compare-and-set so two processes refreshing at once cannot fold the same rows twice
+    moved = db.session.execute(
+        db.update(RollupWatermark).where(RollupWatermark.source == name, RollupWatermark.last_id == last_id)
+        .values(last_id=rows[-1][0], updated_at=datetime.utcnow())
+    ).rowcount
+    if not moved:
+        return 0
+    _fold_into_buckets(rows, facts)
+    return len(rows)
+
+
+def fold_archived_rollups():
+    """
+    Add every archived row to the rollups. refresh_rollups only reads the hot tables, so a
+    rebuild from scratch needs this to keep the history that has moved to the archives.
+    """
+    processed = 0
+    models = (DonationRecord, DonationItem, Pickup, DistributedItem)
+    for archive in zip(*(history_sources(model)[1:] for model in models)):
+        entities = [entity for entity, _ in archive]
+        for (name, pk, stmt, facts), (_, criteria) in zip(_rollup_sources(*entities), archive):
+            last_id = 0
+            while True:
+                rows = db.session.execute(stmt.where(pk > last_id, *criteria).order_by(pk).limit(ROLLUP_BATCH_SIZE)).all()
+                if not rows:
+                    break
+                _fold_into_buckets(rows, facts)
+                db.session.commit()
+                last_id = rows[-1][0]
+                processed += len(rows)
+    return processed
+
+
+def maybe_refresh_rollups():
+    last = _rollups_refreshed_at.get(current_app.config['DATABASE_PATH'], 0.0)
+    if time.monotonic() - last >= current_app.config['ROLLUP_REFRESH_SECONDS']:
+        refresh_rollups()
+
+
+def adjust_pickup_rollup(pickup, status, delta):
+    """Pickups can change status after being folded in; move them between status buckets."""
+    wm = RollupWatermark.query.get('pickup_scheduling')
+    if not wm or pickup.pickup_id > wm.last_id:
+        return  # the next refresh will pick it up with its current status
+    _add_to_buckets({(grain, bucket, 'pickups', 0, status or ''): delta for grain, bucket in rollup_buckets_for(pickup.scheduled_date)})
+
+
+@bp.cli.command('refresh-rollups')
+@click.option('--rebuild', is_flag=True, help="Drop all buckets and recompute from the raw tables.")
+def refresh_rollups_command(rebuild):
+    """Fold new rows into the KPI / impact-report rollups."""
+    if rebuild:
+        RollupBucket.query.delete()
+        RollupWatermark.query.delete()
+        db.session.commit()
+        click.echo(f"Rolled up {fold_archived_rollups()} archived rows.")
+    click.echo(f"Rolled up {refresh_rollups()} new rows.")
+
+
+@bp.route('/api/kpis', methods=['GET'])
+def kpis():
+    """
+    Platform-wide KPIs for the landing page, read from the 'total' rollup grain.
+    Query: grain=day|week|month&periods=N? adds a per-bucket series of the headline metrics.
+    """
+    maybe_refresh_rollups()
+    totals = defaultdict(float)
+    pickups_by_status = {}
+    for metric, label, value in db.session.query(RollupBucket.metric, RollupBucket.dim_label, db.func.sum(RollupBucket.value)) \
+            .filter(RollupBucket.grain == 'total', RollupBucket.bucket == '').group_by(RollupBucket.metric, RollupBucket.dim_label):
+        totals[metric] += value
+        if metric == 'pickups':
+            pickups_by_status[label] = int(value)
+    out = {
+        "total_donations": int(totals['donations']),
+        "total_monetary": float(totals['donation_amount']),
+        "total_items_in_kind": int(totals['items']),
+        "total_item_value": float(totals['item_value']),
+        "total_requests": int(totals['requests']),
+        "pickups_scheduled": pickups_by_status.get('Scheduled', 0),
+        "pickups_by_status": pickups_by_status,
+        "total_distributed": int(totals['distributed']),
+    }
+
+    grain = request.args.get('grain')
+    if grain:
+        if grain not in ('day', 'week', 'month'):
+            return json_error("grain must be day, week or month", 400)
+        periods = min(max(request.args.get('periods', 12, type=int), 1), 366)
+        buckets = [b for (b,) in db.session.query(RollupBucket.bucket).filter(RollupBucket.grain == grain)
+                   .distinct().order_by(RollupBucket.bucket.desc()).limit(periods)]
+        series = {b: defaultdict(float) for b in buckets}
+        if buckets:
+            for bucket, metric, value in db.session.query(RollupBucket.bucket, RollupBucket.metric, db.func.sum(RollupBucket.value)) \
+                    .filter(RollupBucket.grain == grain, RollupBucket.bucket.in_(buckets)).group_by(RollupBucket.bucket, RollupBucket.metric):
+                series[bucket][metric] = value
+        out["series"] = [{
+            "bucket": b,
+            "donations": int(series[b]['donations']),
+            "donation_amount": float(series[b]['donation_amount']),
+            "items": int(series[b]['items']),
+            "item_value": float(series[b]['item_value']),
+            "pickups": int(series[b]['pickups']),
+            "distributed": int(series[b]['distributed']),
+        } for b in sorted(buckets)]
+    return jsonify(out)
+
+
+@bp.route('/api/impact-reports', methods=['GET'])
+def impact_reports():
+    """
+    Items distributed per center and item for the most recent buckets.
+    Query: grain=day|week|month (default month), periods? (default 1), limit? (default 20)
+    """
+    maybe_refresh_rollups()
+    grain = request.args.get('grain', 'month')
+    if grain not in ('day', 'week', 'month'):
+        return json_error("grain must be day, week or month", 400)
+    periods = min(max(request.args.get('periods', 1, type=int), 1), 366)
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 500)
+    return jsonify(impact_report_rows(grain, periods, limit))
+
+
+def impact_report_rows(grain='month', periods=1, limit=20):
+    """Rows for impact_reports; the caller refreshes the rollups first."""
+    buckets = [b for (b,) in db.session.query(RollupBucket.bucket)
+               .filter(RollupBucket.grain == grain, RollupBucket.metric == 'distributed')
+               .distinct().order_by(RollupBucket.bucket.desc()).limit(periods)]
+    if not buckets:
+        return []
+    rows = db.session.query(RollupBucket.bucket, RollupBucket.dim_id, RollupBucket.dim_label, RollupBucket.value, DistributionCenter.center_name) \
+        .outerjoin(DistributionCenter, DistributionCenter.center_id == RollupBucket.dim_id) \
+        .filter(RollupBucket.grain == grain, RollupBucket.metric == 'distributed', RollupBucket.bucket.in_(buckets)) \
+        .order_by(RollupBucket.bucket.desc(), RollupBucket.value.desc()).limit(limit).all()
+    return [{
+        "grain": grain,
+        "bucket": r.bucket,
+        "center_id": r.dim_id or None,
+        "center_name": r.center_name,
+        "item_name": r.dim_label,
+        "item_quantity": int(r.value)
+    } for r in rows]
@@ -0,0 +1,274 @@
+# app/routing.py
+from flask import current_app, request, jsonify
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timedelta
+import csv
+import time
+
+import click
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from .cache import cached_response
+from .extensions import bp, db
+from .helpers import json_error
+from .models import DeliveryRoute, DonorProfile, Geocode, Pickup
+from .writes import run_write
+
+
+# -----------------------------
+# Pickup route planning
+# -----------------------------
+# Geocoding is local only: an exact hit in the geocodes table, else the centroid of a known
+# city named in the address or in the donor's profile. Each (day, region) group is cut into
+# runs of at most ROUTE_MAX_STOPS by a sweep around the region's depot, and each run is
+# ordered by nearest neighbour + 2-opt on a NumPy distance matrix. numpy is imported lazily,
+# so only the planner needs it.
+EARTH_RADIUS_KM = 6371.0
+CITY_CENTROIDS = {
+    "Johannesburg": (-26.2041, 28.0473),
+    "Cape Town": (-33.9249, 18.4241),
+    "Durban": (-29.8587, 31.0218),
+    "Pretoria": (-25.7479, 28.2293),
+    "Port Elizabeth": (-33.9608, 25.6022),
+    "Bloemfontein": (-29.0852, 26.1596),
+    "East London": (-33.0153, 27.9116),
+    "Polokwane": (-23.9045, 29.4689),
+    "Nelspruit": (-25.4658, 30.9853),
+    "Kimberley": (-28.7282, 24.7499),
+    "Rustenburg": (-25.6676, 27.2421),
+    "Pietermaritzburg": (-29.6006, 30.3794),
+}
+
+
+def address_key(address):
+    return ' '.join((address or '').lower().replace(',', ' ').split())
+
+
+def geocode_addresses(stops):
+    """[(address, fallback_city)] -> [(lat, lon, region, precision) or None], one lookup query per 500."""
+    keys = [address_key(address) for address, _ in stops]
+    known = {}
+    unique = sorted(set(k for k in keys if k))
+    for start in range(0, len(unique), 500):
+        for g in Geocode.query.filter(Geocode.address_key.in_(unique[start:start + 500])):
+            known[g.address_key] = g
+    cities = {name.lower(): name for name in CITY_CENTROIDS}
+    out = []
+    for key, (_, fallback_city) in zip(keys, stops):
+        hit = known.get(key)
+        if hit:
+            out.append((hit.latitude, hit.longitude, hit.region, 'address'))
+            continue
+        city = next((name for lower, name in cities.items() if lower in key), None) or cities.get((fallback_city or '').lower())
+        out.append((*CITY_CENTROIDS[city], city, 'city') if city else None)
+    return out
+
+
+def project_km(lat, lon):
+    """Equirectangular projection to km; accurate to well under 1% within one region."""
+    import numpy as np
+    lat0 = np.radians(np.mean(lat))
+    return np.column_stack((np.radians(lon) * np.cos(lat0), np.radians(lat))) * EARTH_RADIUS_KM
+
+
+def distance_matrix(xy):
+    import numpy as np
+    diff = xy[:, None, :] - xy[None, :, :]
+    return np.hypot(diff[..., 0], diff[..., 1])
+
+
+def nearest_neighbour_tour(dist):
+    """Greedy closed tour from node 0: always drive to the closest unvisited stop."""
+    import numpy as np
+    n = len(dist)
+    tour = np.zeros(n, dtype=np.intp)
+    visited = np.zeros(n, dtype=bool)
+    visited[0] = True
+    for k in range(1, n):
+        nxt = int(np.argmin(np.where(visited, np.inf, dist[tour[k - 1]])))
+        tour[k] = nxt
+        visited[nxt] = True
+    return tour
+
+
+def two_opt(tour, dist, max_rounds=10000):
+    """
+    Best-improvement 2-opt on a closed tour that keeps tour[0] (the depot) in place.
+    Each round scores every pair of edges at once and applies the best reversal.
+    """
+    import numpy as np
+    n = len(tour)
+    if n < 4:
+        return tour
+    tour = tour.copy()
+    idx = np.arange(n)
+    allowed = idx[None, :] >= idx[:, None] + 2  # non-adjacent edge pairs i < j
+    allowed[0, n - 1] = False  # the first and last edges meet at the depot
+    for _ in range(max_rounds):
+        a, b = tour, np.roll(tour, -1)  # edge k runs a[k] -> b[k]
+        edge = dist[a, b]
+        gain = edge[:, None] + edge[None, :] - dist[a[:, None], a[None, :]] - dist[b[:, None], b[None, :]]
+        gain = np.where(allowed, gain, 0.0)
+        i, j = np.unravel_index(int(np.argmax(gain)), gain.shape)
+        if gain[i, j] <= 1e-9:
+            break
+        tour[i + 1:j + 1] = tour[i + 1:j + 1][::-1]
+    return tour
+
+
+def plan_runs(lat, lon, depot, max_stops, improve=True):
+    """
+    Cut one region's stops into runs and order each run from the depot (lat, lon).
+    Returns [(stop indices in visit order, km from the depot to each stop, closed-tour km)].
+    """
+    import numpy as np
+    lat = np.asarray(lat, dtype=float)
+    lon = np.asarray(lon, dtype=float)
+    xy = project_km(np.append(lat, depot[0]), np.append(lon, depot[1]))
+    stops_xy, depot_xy = xy[:-1], xy[-1]
+    # sweep: consecutive polar angles around the depot form compact wedges
+    angles = np.arctan2(stops_xy[:, 1] - depot_xy[1], stops_xy[:, 0] - depot_xy[0])
+    order = np.argsort(angles, kind='stable')
+    runs = []
+    for members in np.array_split(order, -(-len(order) // max_stops)):
+        dist = distance_matrix(np.vstack((depot_xy, stops_xy[members])))
+        tour = nearest_neighbour_tour(dist)
+        if improve:
+            tour = two_opt(tour, dist)
+        legs = dist[tour, np.roll(tour, -1)]
+        runs.append((members[tour[1:] - 1], np.cumsum(legs[:-1]), float(legs.sum())))
+    return runs
+
+
+def _eta(km, stop_number):
+    h, m = map(int, current_app.config['ROUTE_DAY_START'].split(':'))
+    minutes = int(h * 60 + m + km / current_app.config['ROUTE_SPEED_KMH'] * 60 + stop_number * current_app.config['ROUTE_STOP_MINUTES'])
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def _key_range(prefix):
+    """Bounds of every route_key starting with prefix (which ends in '/'), as an index range."""
+    return prefix, prefix[:-1] + chr(ord('/') + 1)
+
+
+def plan_pickup_routes(day, region=None, max_stops=None):
+    """
+    Plan the day's scheduled pickups into runs and store them as 'planned' delivery_routes
+    rows (one per stop, route_key '<day>/<region>/<run>'), replacing that day's earlier plan.
+    Pickups already on an in_transit/completed run are left alone.
+    Returns { routes: [...], unlocated: [pickup_id, ...] }.
+    """
+    max_stops = max_stops or current_app.config['ROUTE_MAX_STOPS']
+    start = datetime(day.year, day.month, day.day)
+    dispatched = db.select(DeliveryRoute.pickup_id).where(DeliveryRoute.pickup_id.isnot(None), DeliveryRoute.route_status != 'planned')
+    rows = db.session.query(Pickup.pickup_id, Pickup.pickup_address, DonorProfile.city) \
+        .outerjoin(DonorProfile, DonorProfile.donor_store_id == Pickup.donor_store_id) \
+        .filter(Pickup.scheduled_date >= start, Pickup.scheduled_date < start + timedelta(days=1),
+                Pickup.status == 'Scheduled', Pickup.pickup_id.notin_(dispatched)) \
+        .order_by(Pickup.pickup_id).all()
+
+    by_region = defaultdict(list)
+    unlocated = []
+    for r, geo in zip(rows, geocode_addresses([(r.pickup_address, r.city) for r in rows])):
+        if geo is None:
+            unlocated.append(r.pickup_id)
+        elif region is None or geo[2] == region:
+            by_region[geo[2]].append((r, geo))
+
+    new_rows, routes = [], []
+    for name, stops in sorted(by_region.items(), key=lambda kv: kv[0] or ''):
+        lat = [geo[0] for _, geo in stops]
+        lon = [geo[1] for _, geo in stops]
+        depot = CITY_CENTROIDS.get(name) or (sum(lat) / len(lat), sum(lon) / len(lon))
+        for n, (order, km_to_stop, total_km) in enumerate(plan_runs(lat, lon, depot, max_stops), start=1):
+            key = f"{day.isoformat()}/{name}/{n:03d}"
+            previous = "Depot"
+            route_stops = []
+            for seq, (i, km) in enumerate(zip(order, km_to_stop), start=1):
+                r, geo = stops[i]
+                eta = _eta(km, seq - 1)
+                new_rows.append({"pickup_id": r.pickup_id, "route_key": key, "stop_sequence": seq, "route_status": "planned",
+                                 "origin_address": previous, "destination_address": r.pickup_address, "estimated_delivery_time": eta})
+                route_stops.append({"pickup_id": r.pickup_id, "stop_sequence": seq, "address": r.pickup_address,
+                                    "latitude": geo[0], "longitude": geo[1], "geocode": geo[3], "eta": eta})
+                previous = r.pickup_address
+            routes.append({"route_key": key, "region": name, "distance_km": round(total_km, 2), "stops": route_stops})
+
+    def write():
+        low, high = _key_range(f"{day.isoformat()}/{region}/" if region else f"{day.isoformat()}/")
+        rt = DeliveryRoute.__table__
+        db.session.execute(rt.delete().where(rt.c.route_key >= low, rt.c.route_key < high, rt.c.route_status == 'planned'))
+        if new_rows:
+            db.session.execute(db.insert(rt), new_rows)
+
+    run_write(write)
+    return {"routes": routes, "unlocated": unlocated}
+
+
+@bp.route('/api/pickups/routes/plan', methods=['POST'])
+def plan_pickup_routes_endpoint():
+    """
+    Plan (or re-plan) one day's pickup runs.
+    JSON: { date: YYYY-MM-DD, region?, max_stops? }
+    """
+    data = request.get_json() or {}
+    try:
+        day = datetime.strptime(data.get('date') or '', '%Y-%m-%d').date()
+    except ValueError:
+        return json_error("date required as YYYY-MM-DD", 400)
+    max_stops = data.get('max_stops')
+    if max_stops is not None and (not isinstance(max_stops, int) or max_stops < 1):
+        return json_error("max_stops must be a positive integer", 400)
+    return jsonify(plan_pickup_routes(day, data.get('region'), max_stops)), 201
+
+
+@bp.route('/api/pickups/routes', methods=['GET'])
+@cached_response('delivery_routes')
+def get_pickup_routes():
+    """A day's planned pickup runs in visit order. Query: date=YYYY-MM-DD, region?"""
+    try:
+        day = datetime.strptime(request.args.get('date', ''), '%Y-%m-%d').date()
+    except ValueError:
+        return json_error("date required as YYYY-MM-DD", 400)
+    region = request.args.get('region')
+    low, high = _key_range(f"{day.isoformat()}/{region}/" if region else f"{day.isoformat()}/")
+    rows = DeliveryRoute.query.filter(DeliveryRoute.route_key >= low, DeliveryRoute.route_key < high) \
+        .order_by(DeliveryRoute.route_key, DeliveryRoute.stop_sequence).all()
+    routes = OrderedDict()
+    for r in rows:
+        routes.setdefault(r.route_key, []).append({
+            "route_id": r.route_id, "pickup_id": r.pickup_id, "stop_sequence": r.stop_sequence, "address": r.destination_address,
+            "eta": r.estimated_delivery_time, "route_status": r.route_status
+        })
+    return jsonify([{"route_key": key, "region": key.split('/')[1], "stops": stops} for key, stops in routes.items()])
+
+
+@bp.cli.command('plan-routes')
+@click.option('--date', 'day', required=True, type=click.DateTime(formats=['%Y-%m-%d']), help="Day to plan.")
+@click.option('--region', default=None, help="Only plan this region.")
+@click.option('--max-stops', type=int, default=None, help="Stops per run (default ROUTE_MAX_STOPS).")
+def plan_routes_command(day, region, max_stops):
+    """Plan a day's pickup runs into delivery_routes."""
+    started = time.perf_counter()
+    plan = plan_pickup_routes(day.date(), region, max_stops)
+    stops = sum(len(r['stops']) for r in plan['routes'])
+    km = sum(r['distance_km'] for r in plan['routes'])
+    click.echo(f"{len(plan['routes'])} run(s), {stops} stop(s), {km:.1f} km, {len(plan['unlocated'])} unlocated "
+               f"in {time.perf_counter() - started:.2f}s")
+
+
+@bp.cli.command('load-geocodes')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+def load_geocodes_command(path):
+    """Load address,latitude,longitude,region rows from a CSV into the geocodes table."""
+    with open(path, newline='', encoding='utf-8') as fh:
+        rows = [{"address_key": address_key(r['address']), "latitude": float(r['latitude']),
+                 "longitude": float(r['longitude']), "region": r.get('region') or None}
+                for r in csv.DictReader(fh)]
+    stmt = sqlite_insert(Geocode.__table__)
+    stmt = stmt.on_conflict_do_update(index_elements=['address_key'], set_={
+        'latitude': stmt.excluded.latitude, 'longitude': stmt.excluded.longitude, 'region': stmt.excluded.region})
+    for start in range(0, len(rows), 5000):
+        db.session.execute(stmt, rows[start:start + 5000])
+    db.session.commit()
+    click.echo(f"Loaded {len(rows)} geocode(s).")
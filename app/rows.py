@@ -0,0 +1,100 @@
+# app/rows.py
+from flask import Response, current_app, jsonify
+import codecs
+import json
+
+from sqlalchemy.dialects import sqlite as sqlite_dialect
+
+from .extensions import app_service, db
+
+
+# -----------------------------
+# Row reads (list endpoints)
+# -----------------------------
+# List routes skip the ORM: a Core select() returns plain tuples, each column is
+# converted in one pass, and the whole list is encoded in one call. The bytes match
+# jsonify's (sorted keys, compact separators, ASCII only, trailing newline).
+def _json_ascii_escape(exc):
+    """Codec error handler: non-ASCII as \\uXXXX (surrogate pairs above the BMP), like json.dumps(ensure_ascii=True)."""
+    out = []
+    for ch in exc.object[exc.start:exc.end]:
+        code = ord(ch)
+        if code > 0xFFFF:
+            code -= 0x10000
+            out.append('\\u%04x\\u%04x' % (0xD800 | code >> 10, 0xDC00 | code & 0x3FF))
+        else:
+            out.append('\\u%04x' % code)
+    return ''.join(out), exc.end
+
+
+codecs.register_error('json_ascii_escape', _json_ascii_escape)
+
+
+def stdlib_encode_rows(rows):
+    return (json.dumps(rows, ensure_ascii=True, sort_keys=True, separators=(',', ':')) + '\n').encode()
+
+
+def orjson_encode_rows(rows):
+    import orjson
+    try:
+        out = orjson.dumps(rows, option=orjson.OPT_SORT_KEYS | orjson.OPT_APPEND_NEWLINE)
+    except orjson.JSONEncodeError:  # e.g. integers beyond 64 bits
+        return stdlib_encode_rows(rows)
+    if b'\x7f' in out:  # the stdlib escapes DEL too
+        out = out.replace(b'\x7f', b'\\u007f')
+    if not out.isascii():
+        out = out.decode().encode('ascii', 'json_ascii_escape')
+    return out
+
+
+def default_rows_encoder():
+    try:
+        import orjson  # noqa: F401
+    except ImportError:
+        return stdlib_encode_rows
+    return orjson_encode_rows
+
+
+rows_encoder = app_service('rows_encoder')
+
+
+_parse_sqlite_datetime = sqlite_dialect.DATETIME().result_processor(sqlite_dialect.dialect(), None)
+
+
+def iso_datetime(text):
+    """isoformat() of a DateTime column read as its stored text (see table_columns), without building a datetime."""
+    if text is None:
+        return None
+    if len(text) == 26 and text[10] == ' ':  # SQLAlchemy's storage format, YYYY-MM-DD HH:MM:SS.ffffff
+        return text[:10] + 'T' + (text[11:19] if text.endswith('.000000') else text[11:])
+    return _parse_sqlite_datetime(text).isoformat()
+
+
+def table_columns(entity, *names):
+    """Columns of a model (or an aliased one) for select_rows. DateTime columns are read as text: convert them with iso_datetime."""
+    columns = [db.inspect(entity).selectable.c[name] for name in names]
+    return [db.type_coerce(c, db.String).label(c.name) if isinstance(c.type, db.DateTime) else c for c in columns]
+
+
+def select_rows(stmt, **converters):
+    """
+    Run a Core select and return one dict per row, keyed by column name.
+    converters maps a column name to a function applied to every value of that column.
+    """
+    result = db.session.connection().execute(stmt)  # Core execution: no ORM result processing
+    keys = list(result.keys())
+    columns = list(zip(*result.all())) or [()] * len(keys)
+    columns = [list(map(converters[key], col)) if key in converters else col for key, col in zip(keys, columns)]
+    return [dict(zip(keys, row)) for row in zip(*columns)]
+
+
+def rows_response(rows, has_floats=False):
+    """
+    jsonify(rows) for a list of flat dicts of JSON scalars, through rows_encoder.
+    orjson writes float exponents differently (1e16 vs 1e+16), so pass has_floats=True
+    to keep such rows on the stdlib encoder.
+    """
+    if current_app.json.compact is False or (current_app.json.compact is None and current_app.debug):
+        return jsonify(rows)  # pretty-printed for debugging, not worth a fast path
+    encode = stdlib_encode_rows if has_floats else rows_encoder
+    return Response(encode(rows), mimetype=current_app.json.mimetype)
@@ -0,0 +1,124 @@
+# app/search.py
+from flask import request, jsonify
+from datetime import datetime
+import re
+
+import click
+
+from .extensions import bp, db
+from .helpers import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, encode_cursor, json_error
+from .models import DonationItem, DonationRecord, Inventory, NPOProfile
+
+
+# -----------------------------
+# Search
+# -----------------------------
+# FTS5 indexes created by migration 0006 and kept in sync by triggers, so every writer
+# (ORM, Core bulk inserts, the ledger upserts) updates them. Per type: the FTS table, the
+# model it indexes and its key, the column used as the result title, and extra result columns.
+SEARCH_TYPES = {
+    'items': ('items_fts', DonationItem, 'item_id', 'item_name', ('donation_id', 'item_quantity', 'item_description')),
+    'donations': ('donations_fts', DonationRecord, 'donation_id', 'notes', ('donor_store_id', 'donation_type', 'donation_date')),
+    'inventory': ('inventory_fts', Inventory, 'inventory_id', 'item_name', ('center_id', 'quantity')),
+    'npos': ('npos_fts', NPOProfile, 'npo_id', 'npo_name', ('city',)),
+}
+
+
+def fts_query(text):
+    """
+    User input -> FTS5 MATCH expression: every word must match, the last one (or any
+    written with a trailing *) as a prefix. Quoting each term keeps FTS syntax inert.
+    Returns None when there is nothing to search for.
+    """
+    terms = re.findall(r"\w+\*?", text or "")
+    if not terms:
+        return None
+    out = []
+    for n, term in enumerate(terms):
+        prefix = term.endswith('*') or n == len(terms) - 1
+        out.append('"%s"%s' % (term.rstrip('*'), '*' if prefix else ''))
+    return ' '.join(out)
+
+
+@bp.route('/api/search', methods=['GET'])
+def search():
+    """
+    Ranked full-text search (best first).
+    Query: q, type=items,donations,inventory,npos? (default all), limit?, cursor?
+    Every match of each type is ranked (bm25, lower is better), so paging walks them all in order.
+    Returns { results: [{type, id, title, snippet, score, ...}], next_cursor }.
+    """
+    match = fts_query(request.args.get('q'))
+    if not match:
+        return json_error("q required", 400)
+    types = [t for t in request.args.get('type', '').split(',') if t] or list(SEARCH_TYPES)
+    unknown = [t for t in types if t not in SEARCH_TYPES]
+    if unknown:
+        return json_error(f"Unknown type: {', '.join(unknown)}", 400)
+    limit = min(max(request.args.get('limit', DEFAULT_PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+    order = list(SEARCH_TYPES)
+    after = None
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            last_score, last_type, last_id = decode_cursor(cursor)
+            after = (float(last_score), order.index(last_type), int(last_id))
+        except (ValueError, TypeError):
+            return json_error("Invalid cursor", 400)
+
+    # Each type ranks its whole match set by bm25 and keeps the page's worth past the cursor;
+    # (score, type, id) orders the merged page. Ranking scores every match (about 2 µs each),
+    # so snippets, which cost far more, are made only for the rows on the page.
+    hits = []
+    for kind in types:
+        fts = SEARCH_TYPES[kind][0]
+        rank = order.index(kind)
+        where, params = f"{fts} MATCH :match", {"match": match, "n": limit + 1}
+        if after:
+            # (score, rank, rowid) > after, with rank fixed for this type
+            score, after_rank, after_id = after
+            if rank > after_rank:
+                where += f" AND bm25({fts}) >= :score"
+            elif rank < after_rank:
+                where += f" AND bm25({fts}) > :score"
+            else:
+                where += f" AND (bm25({fts}), rowid) > (:score, :id)"
+            params.update(score=score, id=after_id)
+        rows = db.session.execute(db.text(
+            f"SELECT bm25({fts}) AS score, rowid FROM {fts} WHERE {where} ORDER BY score, rowid LIMIT :n"), params).all()
+        hits += [(score, rank, rowid) for score, rowid in rows]
+    hits = sorted(hits)[:limit + 1]
+
+    results = []
+    for kind in types:
+        _, model, key, title, extra = SEARCH_TYPES[kind]
+        page = {h[2]: h[0] for h in hits if h[1] == order.index(kind)}
+        if not page:
+            continue
+        fts = SEARCH_TYPES[kind][0]
+        snippets = dict(db.session.execute(db.text(
+            f"SELECT rowid, snippet({fts}, -1, '[', ']', '...', 12) FROM {fts} WHERE {fts} MATCH :match"
+            f" AND rowid IN ({', '.join(str(rowid) for rowid in page)})"), {"match": match}).all())
+        cols = [getattr(model, name) for name in (key, title, *extra)]
+        for row in db.session.query(*cols).filter(cols[0].in_(list(page))):
+            rowid = row[0]
+            hit = {"type": kind, "id": rowid, "title": row[1], "snippet": snippets.get(rowid), "score": page[rowid]}
+            hit.update((col, value.isoformat() if isinstance(value, datetime) else value) for col, value in zip(extra, row[2:]))
+            results.append(hit)
+    results.sort(key=lambda h: (h["score"], order.index(h["type"]), h["id"]))
+
+    next_cursor = None
+    if len(results) > limit:
+        results = results[:limit]
+        last = results[-1]
+        next_cursor = encode_cursor([last["score"], last["type"], last["id"]])
+    return jsonify({"results": results, "next_cursor": next_cursor})
+
+
+@bp.cli.command('rebuild-search')
+def rebuild_search_command():
+    """Rebuild the full-text search indexes from their tables."""
+    for fts, *_ in SEARCH_TYPES.values():
+        db.session.execute(db.text(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')"))
+    db.session.commit()
+    click.echo(f"Rebuilt {len(SEARCH_TYPES)} search index(es).")
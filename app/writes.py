@@ -0,0 +1,121 @@
+# app/writes.py
+from flask import current_app
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+import os
+import queue
+import threading
+import time
+
+from .extensions import app_service, bp, db
+from .helpers import json_error
+
+
+# -----------------------------
+# Write queue (group commit)
+# -----------------------------
+class WriteTimeout(Exception):
+    pass
+
+
+class WriteQueue:
+    """
+    A single writer thread that applies queued mutations in group commits.
+
+    submit(fn) hands fn to the writer, which runs it against its own db.session inside a
+    SAVEPOINT. fn must return plain values (ids, dicts): ORM objects don't survive the
+    hand-off between threads. The writer takes the jobs that queued up while it was busy
+    (up to WRITE_BATCH_MAX, optionally waiting WRITE_BATCH_WINDOW_MS for more) and commits
+    them together, so a burst of writes pays one fsync and one hold of SQLite's write lock
+    instead of one each, while a lone write is not held back.
+    A job that raises only rolls back its own savepoint; its caller gets the exception.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._jobs = queue.Queue()
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.jobs = 0
+
+    def submit(self, fn):
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                # started lazily, and again after a fork: threads do not survive fork
+                self._thread = threading.Thread(target=self._run, name='db-writer', daemon=True)
+                self._pid = os.getpid()
+                self._thread.start()
+        future = Future()
+        self._jobs.put((fn, future))
+        return future
+
+    def _run(self):
+        with self.app.app_context():
+            while True:
+                batch = [self._jobs.get()]
+                deadline = time.monotonic() + current_app.config['WRITE_BATCH_WINDOW_MS'] / 1000
+                while len(batch) < current_app.config['WRITE_BATCH_MAX']:
+                    try:
+                        batch.append(self._jobs.get(timeout=max(deadline - time.monotonic(), 0)))
+                    except queue.Empty:
+                        break
+                self._commit(batch)
+
+    def _commit(self, batch):
+        done = []
+        for fn, future in batch:
+            if not future.set_running_or_notify_cancel():
+                continue
+            events = db.session.info.setdefault('pending_events', [])
+            mark = len(events)
+            try:
+                with db.session.begin_nested():
+                    done.append((future, fn()))
+            except Exception as exc:
+                del events[mark:]  # published only if their job's savepoint survives
+                future.set_exception(exc)
+        try:
+            db.session.commit()
+        except Exception as exc:
+            db.session.rollback()
+            for future, _ in done:
+                future.set_exception(exc)
+        else:
+            for future, result in done:
+                future.set_result(result)
+        finally:
+            db.session.close()  # keep the identity map from growing across batches
+        self.batches += 1
+        self.jobs += len(batch)
+
+
+write_queue = app_service('write_queue')
+_inline_write_lock = threading.Lock()
+
+
+def run_write(fn):
+    """
+    Run fn's mutations and commit them, returning fn's result. fn works on db.session,
+    flushes anything whose generated ids it returns, and must not commit itself.
+    Inline in the request by default; through write_queue when WRITE_QUEUE_ENABLED.
+    """
+    if not current_app.config['WRITE_QUEUE_ENABLED']:
+        # one inline writer per process (request threads, notification workers): a WAL
+        # transaction that reads before it writes fails outright if another commit lands in between
+        with _inline_write_lock:
+            db.session.rollback()  # start fn's snapshot under the lock
+            result = fn()
+            db.session.commit()
+        return result
+    # don't sit on a read snapshot (or, without WAL, a SHARED lock) while the writer commits
+    db.session.rollback()
+    try:
+        return write_queue.submit(fn).result(timeout=current_app.config['WRITE_TIMEOUT'])
+    except FutureTimeout:
+        raise WriteTimeout()
+
+
+@bp.app_errorhandler(WriteTimeout)
+def handle_write_timeout(exc):
+    return json_error("Write not confirmed in time; it may still be applied", 503)
@@ -0,0 +1,212 @@
+# benchmark.py
+"""
+Load benchmark for the /api routes.
+
+Drives every API route against a database built by generate_data.py and reports
+p50/p95/p99 latency, throughput and SQL statements per request.
+
+    python benchmark.py --db bench_100k.db                   # in-process, Flask test client
+    python benchmark.py --db bench_100k.db --json out.json   # also save results for comparison
+    python benchmark.py --url http://127.0.0.1:5000 --concurrency 8   # against a running server
+
+Write routes really write, so point it at a benchmark database, not a real one.
+Query counts are only available in-process (not with --url).
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", help="database file (in-process mode)")
+    parser.add_argument("--url", help="base URL of a running server instead of the test client")
+    parser.add_argument("--iterations", type=int, default=50, help="requests per route")
+    parser.add_argument("--concurrency", type=int, default=1, help="client threads (--url mode)")
+    parser.add_argument("--only", help="only run routes whose name contains this substring")
+    parser.add_argument("--skip-writes", action="store_true", help="only benchmark GET routes")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+    if bool(args.db) == bool(args.url):
+        parser.error("pass exactly one of --db or --url")
+    return args
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def routes(ids):
+    """(name, method, path, json body factory) for every /api route."""
+    big, small, npo, center = ids["big_donor"], ids["small_donor"], ids["npo"], ids["center"]
+    item = {"item_name": "rugby ball", "item_quantity": 2, "item_value": 150.0}
+    reads = [
+        ("GET donations (page)", "GET", "/api/donations", None),
+        ("GET donations big donor +items", "GET", f"/api/donations?donor_store_id={big}&include=items", None),
+        ("GET donations small donor", "GET", f"/api/donations?donor_store_id={small}", None),
+        ("GET pickups", "GET", "/api/pickups", None),
+        ("GET pickups big donor", "GET", f"/api/pickups/{big}", None),
+        ("GET inventory", "GET", "/api/inventory", None),
+        ("GET inventory center", "GET", f"/api/inventory?center_id={center}", None),
+        ("GET distributed_items", "GET", "/api/distributed_items", None),
+        ("GET deliveries", "GET", f"/api/deliveries/{npo}", None),
+        ("GET matches", "GET", "/api/matches", None),
+        ("GET matches npo", "GET", f"/api/matches?npo_id={npo}", None),
+        ("GET search common", "GET", "/api/search?q=rugby%20balls", None),
+        ("GET search prefix", "GET", "/api/search?q=goalkeeper%20gl&type=items", None),
+        ("GET feedback npo", "GET", f"/api/feedback?npo_id={npo}", None),
+        ("GET feedback all", "GET", "/api/feedback", None),
+        ("GET npo metrics", "GET", f"/api/metrics/npo/{npo}", None),
+        ("GET donor metrics big donor", "GET", f"/api/donor/{big}/metrics", None),
+        ("GET donor dashboard big donor", "GET", f"/api/donor/{big}/dashboard", None),
+        ("GET npo dashboard", "GET", f"/api/npo/{npo}/dashboard", None),
+        ("GET user", "GET", f"/api/users/{big}", None),
+        ("GET centers", "GET", "/api/centers", None),
+        ("GET kpis", "GET", "/api/kpis", None),
+        ("GET impact-reports", "GET", "/api/impact-reports", None),
+    ]
+    counter = iter(range(10 ** 9))
+    writes = [
+        ("POST donation", "POST", "/api/donations", lambda: {"donor_store_id": small, "items": [item, item]}),
+        ("POST donations/bulk x100", "POST", "/api/donations/bulk", lambda: [{"donor_store_id": small, "items": [item]}] * 100),
+        ("POST pickup", "POST", "/api/pickups", lambda: {"donor_store_id": small, "scheduled_date": "2026-03-01", "pickup_address": "1 Main Rd"}),
+        ("PUT pickup status", "PUT", f"/api/pickups/{ids['pickup']}/status", lambda: {"status": "Scheduled"}),
+        ("POST feedback", "POST", "/api/feedback", lambda: {"donor_store_id": small, "npo_id": npo, "rating": 4}),
+        ("POST inventory", "POST", "/api/inventory", lambda: {"center_id": center, "item_name": "netball", "quantity": 5}),
+        ("POST distributed_item", "POST", "/api/distributed_items", lambda: {"center_id": center, "item_name": "netball", "item_quantity": 1}),
+        ("POST register", "POST", "/api/register", lambda: {"name": "Bench User", "email": f"bench{time.time_ns()}{next(counter)}@bench.example", "password": "bench123", "role": "donor"}),
+        ("POST login", "POST", "/api/login", lambda: {"email": ids["login_email"], "password": "bench123"}),
+    ]
+    return reads, writes
+
+
+def sample_ids(db_models):
+    db, User, DonationRecord, Pickup, DistributionCenter = db_models
+    by_donor = db.session.query(DonationRecord.donor_store_id, db.func.count()).filter(DonationRecord.donor_store_id.isnot(None)) \
+        .group_by(DonationRecord.donor_store_id).order_by(db.func.count().desc()).all()
+    return {
+        "big_donor": by_donor[0][0],
+        "small_donor": by_donor[-1][0],
+        "npo": db.session.query(User.user_id).filter(User.role == "npo").order_by(User.user_id).first()[0],
+        "center": db.session.query(DistributionCenter.center_id).order_by(DistributionCenter.center_id).first()[0],
+        "pickup": db.session.query(db.func.max(Pickup.pickup_id)).scalar(),
+        "login_email": db.session.query(User.email).filter(User.role == "donor").order_by(User.user_id).first()[0],
+    }
+
+
+def run_in_process(args):
+    from sqlalchemy import event
+    from app import create_app, db
+    from app.models import User, DonationRecord, Pickup, DistributionCenter
+
+    app = create_app(DATABASE_PATH=os.path.abspath(args.db))
+    client = app.test_client()
+    statements = [0]
+
+    def count(*_):
+        statements[0] += 1
+
+    with app.app_context():
+        ids = sample_ids((db, User, DonationRecord, Pickup, DistributionCenter))
+        engines = list(db.engines.values())
+        for engine in engines:
+            event.listen(engine, "before_cursor_execute", count)
+
+    def call(method, path, body):
+        statements[0] = 0
+        t0 = time.perf_counter()
+        resp = client.open(path, method=method, json=body)
+        resp.get_data()
+        return time.perf_counter() - t0, resp.status_code, statements[0], len(resp.data)
+
+    return ids, call, 1
+
+
+def run_http(args):
+    base = args.url.rstrip("/")
+    with urllib.request.urlopen(base + "/api/kpis") as resp:
+        resp.read()
+    # no direct DB access: derive ids from the API itself
+    with urllib.request.urlopen(base + "/api/donations?limit=1") as resp:
+        page = json.loads(resp.read())
+    donor = page["donations"][0]["donor_store_id"] if page["donations"] else 1
+    ids = {"big_donor": donor, "small_donor": donor, "npo": 1, "center": 1, "pickup": 1, "login_email": "donor@example.com"}
+
+    def call(method, path, body):
+        data = json.dumps(body).encode() if body is not None else None
+        req = urllib.request.Request(base + path, data=data, method=method, headers={"Content-Type": "application/json"})
+        t0 = time.perf_counter()
+        try:
+            with urllib.request.urlopen(req) as resp:
+                payload = resp.read()
+                status = resp.status
+        except urllib.error.HTTPError as exc:
+            payload, status = exc.read(), exc.code
+        return time.perf_counter() - t0, status, None, len(payload)
+
+    return ids, call, args.concurrency
+
+
+def bench_route(call, method, path, body_factory, iterations, concurrency):
+    bodies = [body_factory() if body_factory else None for _ in range(iterations)]
+    call(method, path, body_factory() if body_factory else None)  # warm-up
+    t0 = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(concurrency) as pool:
+            results = list(pool.map(lambda b: call(method, path, b), bodies))
+    else:
+        results = [call(method, path, b) for b in bodies]
+    wall = time.perf_counter() - t0
+    latencies = sorted(r[0] * 1000 for r in results)
+    queries = [r[2] for r in results if r[2] is not None]
+    return {
+        "requests": iterations,
+        "errors": sum(1 for r in results if r[1] >= 400),
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "rps": iterations / wall if wall else 0.0,
+        "queries": statistics.mean(queries) if queries else None,
+        "bytes": statistics.mean(r[3] for r in results),
+    }
+
+
+def main():
+    args = parse_args()
+    ids, call, concurrency = run_http(args) if args.url else run_in_process(args)
+    reads, writes = routes(ids)
+    selected = reads + ([] if args.skip_writes else writes)
+    if args.url:
+        # credentials of the target's users are unknown
+        selected = [r for r in selected if r[0] not in ("POST register", "POST login")]
+    if args.only:
+        selected = [r for r in selected if args.only.lower() in r[0].lower()]
+
+    results = {}
+    print(f"{'route':34} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>8} {'queries':>8} {'bytes':>9} {'err':>4}")
+    for name, method, path, body in selected:
+        iterations = min(args.iterations, 10) if name == "POST register" or name == "POST login" else args.iterations
+        r = bench_route(call, method, path, body, iterations, concurrency)
+        results[name] = r
+        queries = f"{r['queries']:.1f}" if r["queries"] is not None else "-"
+        print(f"{name:34} {r['p50_ms']:8.2f} {r['p95_ms']:8.2f} {r['p99_ms']:8.2f} {r['rps']:8.1f} {queries:>8} {r['bytes']:9.0f} {r['errors']:4d}")
+
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump({"target": args.url or os.path.abspath(args.db), "iterations": args.iterations,
+                       "concurrency": concurrency, "routes": results}, fh, indent=2)
+    return 1 if any(r["errors"] for r in results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+# benchmark_read_layer.py
+"""
+Benchmark for the Core read path of the list endpoints.
+
+Seeds a throwaway database with --rows rows in each listed table (the data of
+tests/test_read_layer.py) and times every list URL through the ORM + jsonify
+implementation it replaced and through the read layer with each rows encoder
+(stdlib, orjson). Bodies that differ from the ORM path are reported too.
+
+    python benchmark_read_layer.py                  # 100k rows per table
+    python benchmark_read_layer.py --rows 10000 --repeat 5
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000, help="rows per table")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per URL and path (median is reported)")
+    return parser.parse_args()
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    args = parse_args()
+    from app import create_app, init_db
+    from app.models import User
+    from app.rows import stdlib_encode_rows, orjson_encode_rows
+    from tests.test_read_layer import CASES, seed
+
+    # testing: no response cache, so the views themselves are timed
+    app = create_app('testing', DATABASE_PATH=os.path.join(tempfile.mkdtemp(prefix="readlayer-"), "readlayer.db"))
+    client = app.test_client()
+    with app.app_context():
+        init_db(seed=True)
+        ids = {"donor": User.query.filter_by(email="donor@example.com").first().user_id,
+               "npo": User.query.filter_by(email="npo@example.com").first().user_id}
+        t0 = time.perf_counter()
+        seed(args.rows, ids["donor"], ids["npo"])
+        print(f"seeded {args.rows} rows per table in {time.perf_counter() - t0:.1f}s")
+
+    encoders = {"stdlib": stdlib_encode_rows}
+    try:
+        import orjson  # noqa: F401
+        encoders["orjson"] = orjson_encode_rows
+    except ImportError:
+        print("orjson is not installed: timing the stdlib encoder only")
+
+    mismatches = 0
+    print(f"{'url':42} {'bytes':>10} {'orm+jsonify ms':>15} " + " ".join(f"{name + ' ms':>10}" for name in encoders))
+    for url, legacy in CASES:
+        url = url.format(**ids)
+        with app.test_request_context(url):
+            expected = legacy(ids).get_data()
+            legacy_ms = timed(lambda: legacy(ids).get_data(), args.repeat)
+        timings = []
+        for name, encoder in encoders.items():
+            app.extensions["rows_encoder"] = encoder
+            if client.get(url).get_data() != expected:
+                print(f"MISMATCH {url} [{name}]: run python -m pytest tests/test_read_layer.py")
+                mismatches += 1
+            timings.append(timed(lambda: client.get(url).get_data(), args.repeat))
+        print(f"{url:42} {len(expected):10d} {legacy_ms:15.1f} " + " ".join(f"{ms:10.1f}" for ms in timings))
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
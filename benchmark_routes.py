@@ -0,0 +1,101 @@
+# benchmark_routes.py
+"""
+Benchmark for the pickup route planner.
+
+Engine mode (default) scatters synthetic stops around a few cities. It times
+plan_runs for each day size and compares the tour length of three orderings:
+the input order, nearest neighbour alone, and nearest neighbour + 2-opt.
+
+    python benchmark_routes.py                          # 500 .. 5000 stops per day
+    python benchmark_routes.py --stops 2000 --max-stops 60
+    python benchmark_routes.py --db bench_100k.db       # plan the busiest day end to end (writes delivery_routes)
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date
+
+import numpy as np
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stops", type=int, nargs="+", default=[500, 1000, 2000, 5000], help="stops per day")
+    parser.add_argument("--regions", type=int, default=4, help="cities the stops are spread over")
+    parser.add_argument("--max-stops", type=int, default=40, help="stops per run")
+    parser.add_argument("--seed", type=int, default=17)
+    parser.add_argument("--db", help="plan the busiest day of this database instead")
+    return parser.parse_args()
+
+
+def unordered_km(plan_runs, project_km, distance_matrix, lat, lon, depot, max_stops):
+    """Closed-tour length when each run is driven in input order (same runs as the planner)."""
+    total = 0.0
+    for order, _, _ in plan_runs(lat, lon, depot, max_stops, improve=False):
+        members = np.sort(order)
+        dist = distance_matrix(project_km(np.append(lat[members], depot[0]), np.append(lon[members], depot[1])))
+        depot_i = len(members)
+        path = np.concatenate(([depot_i], np.arange(depot_i), [depot_i]))  # depot -> stops in input order -> depot
+        total += float(dist[path[:-1], path[1:]].sum())
+    return total
+
+
+def run_engine(args):
+    from app.routing import CITY_CENTROIDS, distance_matrix, plan_runs, project_km
+
+    rng = np.random.default_rng(args.seed)
+    cities = list(CITY_CENTROIDS)[:args.regions]
+    print(f"{'stops':>6} {'runs':>5} {'plan s':>8} {'input km':>10} {'nn km':>10} {'nn+2opt km':>11} {'saved':>6}")
+    for n in args.stops:
+        region = rng.integers(0, len(cities), size=n)
+        centres = np.array([CITY_CENTROIDS[c] for c in cities])[region]
+        lat = centres[:, 0] + rng.normal(0, 0.06, size=n)
+        lon = centres[:, 1] + rng.normal(0, 0.06, size=n)
+
+        runs = 0
+        km = {"input": 0.0, "nn": 0.0, "opt": 0.0}
+        elapsed = 0.0
+        for r, city in enumerate(cities):
+            mask = region == r
+            if not mask.any():
+                continue
+            depot = CITY_CENTROIDS[city]
+            t0 = time.perf_counter()
+            planned = plan_runs(lat[mask], lon[mask], depot, args.max_stops)
+            elapsed += time.perf_counter() - t0
+            runs += len(planned)
+            km["opt"] += sum(total for _, _, total in planned)
+            km["nn"] += sum(total for _, _, total in plan_runs(lat[mask], lon[mask], depot, args.max_stops, improve=False))
+            km["input"] += unordered_km(plan_runs, project_km, distance_matrix, lat[mask], lon[mask], depot, args.max_stops)
+        print(f"{n:6d} {runs:5d} {elapsed:8.2f} {km['input']:10.0f} {km['nn']:10.0f} {km['opt']:11.0f} "
+              f"{1 - km['opt'] / km['input']:6.0%}")
+
+
+def run_db(args):
+    from app import create_app, db
+    from app.models import Pickup
+    from app.routing import plan_pickup_routes
+
+    app = create_app(DATABASE_PATH=os.path.abspath(args.db))
+    with app.app_context():
+        day_col = db.func.date(Pickup.scheduled_date)
+        day, count = db.session.query(day_col, db.func.count()).filter(Pickup.status == "Scheduled") \
+            .group_by(day_col).order_by(db.func.count().desc()).first()
+        t0 = time.perf_counter()
+        plan = plan_pickup_routes(date.fromisoformat(day), max_stops=args.max_stops)
+        elapsed = time.perf_counter() - t0
+    stops = sum(len(r["stops"]) for r in plan["routes"])
+    km = sum(r["distance_km"] for r in plan["routes"])
+    print(f"{day}: {count} scheduled pickups -> {len(plan['routes'])} run(s), {stops} stop(s), {km:.0f} km, "
+          f"{len(plan['unlocated'])} unlocated, planned and stored in {elapsed:.2f}s")
+
+
+def main():
+    args = parse_args()
+    run_db(args) if args.db else run_engine(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
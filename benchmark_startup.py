@@ -0,0 +1,139 @@
+# benchmark_startup.py
+"""
+Startup benchmark: how long a new worker takes to serve its first response.
+
+Every run times the phases of one worker:
+  import       import app (Flask, SQLAlchemy and the rest included)
+  create_app   create_app()
+  init_db      init_db(seed=True), only in legacy mode
+  first        the first request, which opens the first connection
+  second       the same request again, for comparison
+  ready        from spawn (or fork) to the first response, interpreter start-up included
+
+Modes:
+  spawn   a new interpreter per worker: gunicorn without --preload, or a recycled worker
+  fork    forked from a parent that imported and configured the app once (gunicorn --preload)
+  legacy  spawn, plus the init_db(seed=True) that `python -m app` runs on every start
+
+    python benchmark_startup.py --db bench_100k.db
+    python benchmark_startup.py --db bench_100k.db --runs 20 --path /api/kpis --modes spawn fork
+
+Legacy mode seeds the default accounts if they are missing, so point it at a benchmark database.
+"""
+import argparse
+import gc
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PHASES = ("import", "create_app", "init_db", "first", "second", "ready")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", required=True, help="database file (built by generate_data.py)")
+    parser.add_argument("--runs", type=int, default=10, help="workers started per mode")
+    parser.add_argument("--path", default="/api/centers", help="GET route each worker serves")
+    parser.add_argument("--modes", nargs="+", choices=("spawn", "fork", "legacy"), default=["spawn", "fork", "legacy"])
+    # internal: the worker side of spawn/legacy runs and the preloaded parent of fork runs
+    parser.add_argument("--worker", choices=("spawn", "fork", "legacy"), help=argparse.SUPPRESS)
+    parser.add_argument("--started", type=float, help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def serve(app, path, timings):
+    client = app.test_client()
+    for phase in ("first", "second"):
+        t0 = time.perf_counter()
+        resp = client.get(path)
+        resp.get_data()
+        timings[phase] = (time.perf_counter() - t0) * 1000
+        if resp.status_code != 200:
+            raise SystemExit(f"{path}: HTTP {resp.status_code}")
+
+
+def spawned_worker(args):
+    timings = {}
+    t0 = time.perf_counter()
+    from app import create_app, init_db
+    timings["import"] = (time.perf_counter() - t0) * 1000
+
+    t0 = time.perf_counter()
+    app = create_app(DATABASE_PATH=os.path.abspath(args.db))
+    timings["create_app"] = (time.perf_counter() - t0) * 1000
+    if args.worker == "legacy":
+        t0 = time.perf_counter()
+        with app.app_context():
+            init_db(seed=True)
+        timings["init_db"] = (time.perf_counter() - t0) * 1000
+    serve(app, args.path, timings)
+    timings["ready"] = (time.time() - args.started) * 1000
+    print(json.dumps(timings))
+
+
+def preloaded_parent(args):
+    from app import create_app
+    app = create_app(DATABASE_PATH=os.path.abspath(args.db))
+    gc.freeze()  # as wsgi.py does
+    results = []
+    for _ in range(args.runs):
+        read, write = os.pipe()
+        forked_at = time.time()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read)
+            timings = {}
+            serve(app, args.path, timings)
+            timings["ready"] = (time.time() - forked_at) * 1000
+            os.write(write, json.dumps(timings).encode())
+            os._exit(0)
+        os.close(write)
+        with os.fdopen(read) as fh:
+            results.append(json.loads(fh.read()))
+        os.waitpid(pid, 0)
+    print(json.dumps(results))
+
+
+def run_mode(args, mode):
+    base = [sys.executable, os.path.abspath(__file__), "--db", args.db, "--path", args.path, "--runs", str(args.runs)]
+    env = {**os.environ, "NOTIFY_WORKERS": "0"}
+    if mode == "fork":
+        out = subprocess.run(base + ["--worker", "fork"], env=env, capture_output=True, text=True, check=True).stdout
+        return json.loads(out.splitlines()[-1])
+    results = []
+    for _ in range(args.runs):
+        cmd = base + ["--worker", mode, "--started", repr(time.time())]
+        out = subprocess.run(cmd, env=env, capture_output=True, text=True, check=True).stdout
+        results.append(json.loads(out.splitlines()[-1]))
+    return results
+
+
+def main():
+    args = parse_args()
+    if args.worker == "fork":
+        if not hasattr(os, "fork"):
+            sys.exit("fork mode needs os.fork()")
+        preloaded_parent(args)
+        return 0
+    if args.worker:
+        spawned_worker(args)
+        return 0
+
+    modes = [m for m in args.modes if m != "fork" or hasattr(os, "fork")]
+    print(f"{args.runs} worker(s) per mode serving GET {args.path}; median (max) ms")
+    print(f"{'mode':8} " + " ".join(f"{phase:>17}" for phase in PHASES))
+    for mode in modes:
+        results = run_mode(args, mode)
+        cells = []
+        for phase in PHASES:
+            values = [r[phase] for r in results if phase in r]
+            cells.append(f"{statistics.median(values):8.1f} ({max(values):6.1f})" if values else f"{'-':>17}")
+        print(f"{mode:8} " + " ".join(cells))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
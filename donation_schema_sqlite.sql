@@ -1,15 +1,29 @@
 PRAGMA foreign_keys = ON;
 
+DROP TABLE IF EXISTS schema_migrations;
+DROP TABLE IF EXISTS rollup_watermarks;
+DROP TABLE IF EXISTS rollup_buckets;
+DROP TABLE IF EXISTS platform_summary;
+DROP TABLE IF EXISTS npo_summaries;
+DROP TABLE IF EXISTS donor_summaries;
+DROP TABLE IF EXISTS items_fts;
+DROP TABLE IF EXISTS donations_fts;
+DROP TABLE IF EXISTS inventory_fts;
+DROP TABLE IF EXISTS npos_fts;
 DROP TABLE IF EXISTS admin_logs;
 DROP TABLE IF EXISTS feedback_reviews;
 DROP TABLE IF EXISTS delivery_confirmations;
+DROP TABLE IF EXISTS request_allocations;
 DROP TABLE IF EXISTS distributed_items;
+DROP TABLE IF EXISTS inventory_movements;
 DROP TABLE IF EXISTS inventory;
+DROP TABLE IF EXISTS geocodes;
 DROP TABLE IF EXISTS delivery_routes;
 DROP TABLE IF EXISTS sorting_records;
 DROP TABLE IF EXISTS distribution_centers;
 DROP TABLE IF EXISTS collected_items;
 DROP TABLE IF EXISTS pickup_scheduling;
+DROP TABLE IF EXISTS notification_outbox;
 DROP TABLE IF EXISTS notifications;
 DROP TABLE IF EXISTS donation_item_details;
 DROP TABLE IF EXISTS donation_records;
@@ -60,17 +74,19 @@ CREATE TABLE npo_profiles (
 );
 
 CREATE TABLE donation_records (
-  donation_id INTEGER PRIMARY KEY,
+  donation_id INTEGER PRIMARY KEY AUTOINCREMENT,
   donor_store_id INTEGER,
   donation_date DATETIME DEFAULT CURRENT_TIMESTAMP,
   donation_amount REAL NOT NULL,
   donation_type TEXT,
   notes TEXT,
-  FOREIGN KEY (donor_store_id) REFERENCES donor_store_profiles(donor_store_id) ON DELETE SET NULL
+  npo_id INTEGER,
+  FOREIGN KEY (donor_store_id) REFERENCES donor_store_profiles(donor_store_id) ON DELETE SET NULL,
+  FOREIGN KEY (npo_id) REFERENCES npo_profiles(npo_id)
 );
 
 CREATE TABLE donation_item_details (
-  item_id INTEGER PRIMARY KEY,
+  item_id INTEGER PRIMARY KEY AUTOINCREMENT,
   donation_id INTEGER,
   item_name TEXT NOT NULL,
   item_description TEXT,
@@ -86,11 +102,29 @@ CREATE TABLE notifications (
   message TEXT,
   related_item_id INTEGER,
   notification_type TEXT CHECK(notification_type IN ('donation_ready','stock_available','pickup_scheduled')),
-  sent_at DATETIME DEFAULT CURRENT_TIMESTAMP
+  sent_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+  recipient_id INTEGER,
+  dedupe_key TEXT,
+  delivered_at DATETIME,
+  FOREIGN KEY (recipient_id) REFERENCES users(user_id) ON DELETE CASCADE
+);
+
+CREATE TABLE notification_outbox (
+  outbox_id INTEGER PRIMARY KEY,
+  notification_type TEXT NOT NULL,
+  sender_role TEXT NOT NULL,
+  related_item_id INTEGER,
+  message TEXT NOT NULL,
+  dedupe_key TEXT NOT NULL,
+  status TEXT NOT NULL DEFAULT 'pending',
+  attempts INTEGER NOT NULL DEFAULT 0,
+  available_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  last_error TEXT,
+  created_at DATETIME DEFAULT CURRENT_TIMESTAMP
 );
 
 CREATE TABLE pickup_scheduling (
-  pickup_id INTEGER PRIMARY KEY,
+  pickup_id INTEGER PRIMARY KEY AUTOINCREMENT,
   donor_store_id INTEGER,
   scheduled_date DATETIME NOT NULL,
   pickup_address TEXT,
@@ -140,7 +174,17 @@ CREATE TABLE delivery_routes (
   destination_address TEXT,
   estimated_delivery_time TEXT,
   route_status TEXT DEFAULT 'planned' CHECK(route_status IN ('planned','in_transit','completed')),
-  FOREIGN KEY (distribution_id) REFERENCES distributed_items(distribution_id) ON DELETE CASCADE
+  pickup_id INTEGER,
+  route_key TEXT,
+  stop_sequence INTEGER,
+  FOREIGN KEY (distribution_id) REFERENCES distributed_items(distribution_id) ON DELETE CASCADE,
+  FOREIGN KEY (pickup_id) REFERENCES pickup_scheduling(pickup_id) ON DELETE CASCADE
+);
+CREATE TABLE geocodes (
+  address_key TEXT PRIMARY KEY,
+  latitude REAL NOT NULL,
+  longitude REAL NOT NULL,
+  region TEXT
 );
 
 CREATE TABLE inventory (
@@ -152,13 +196,35 @@ CREATE TABLE inventory (
   FOREIGN KEY (center_id) REFERENCES distribution_centers(center_id) ON DELETE CASCADE
 );
 
+CREATE TABLE inventory_movements (
+  movement_id INTEGER PRIMARY KEY,
+  center_id INTEGER NOT NULL,
+  item_name TEXT NOT NULL,
+  delta INTEGER NOT NULL,
+  reason TEXT NOT NULL,
+  ref_id INTEGER,
+  created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+  FOREIGN KEY (center_id) REFERENCES distribution_centers(center_id)
+);
 CREATE TABLE distributed_items (
-  distribution_id INTEGER PRIMARY KEY,
+  distribution_id INTEGER PRIMARY KEY AUTOINCREMENT,
   center_id INTEGER,
+  npo_id INTEGER,
   item_name TEXT NOT NULL,
   item_quantity INTEGER NOT NULL,
   distribution_date DATETIME DEFAULT CURRENT_TIMESTAMP,
-  FOREIGN KEY (center_id) REFERENCES distribution_centers(center_id) ON DELETE SET NULL
+  FOREIGN KEY (center_id) REFERENCES distribution_centers(center_id) ON DELETE SET NULL,
+  FOREIGN KEY (npo_id) REFERENCES npo_profiles(npo_id)
+);
+
+CREATE TABLE request_allocations (
+  allocation_id INTEGER PRIMARY KEY,
+  item_id INTEGER NOT NULL,
+  distribution_id INTEGER,
+  quantity INTEGER NOT NULL,
+  created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+  FOREIGN KEY (item_id) REFERENCES donation_item_details(item_id) ON DELETE CASCADE,
+  FOREIGN KEY (distribution_id) REFERENCES distributed_items(distribution_id) ON DELETE SET NULL
 );
 
 CREATE TABLE delivery_confirmations (
@@ -191,3 +257,128 @@ CREATE TABLE admin_logs (
   notes TEXT,
   FOREIGN KEY (admin_id) REFERENCES users(user_id) ON DELETE SET NULL
 );
+
+-- Materialised metrics, kept up to date by the write routes (`flask --app wsgi rebuild-summaries` recomputes them)
+CREATE TABLE donor_summaries (
+  donor_store_id INTEGER PRIMARY KEY,
+  donation_count INTEGER NOT NULL DEFAULT 0,
+  item_count INTEGER NOT NULL DEFAULT 0,
+  item_value REAL NOT NULL DEFAULT 0.0,
+  pickup_count INTEGER NOT NULL DEFAULT 0,
+  updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE npo_summaries (
+  npo_id INTEGER PRIMARY KEY,
+  rating_sum INTEGER NOT NULL DEFAULT 0,
+  rating_count INTEGER NOT NULL DEFAULT 0,
+  updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE platform_summary (
+  summary_id INTEGER PRIMARY KEY,
+  donated_items INTEGER NOT NULL DEFAULT 0,
+  pickup_count INTEGER NOT NULL DEFAULT 0,
+  updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+-- KPI / impact-report rollups, folded in from rows above each source's watermark
+CREATE TABLE rollup_buckets (
+  grain TEXT NOT NULL,
+  bucket TEXT NOT NULL,
+  metric TEXT NOT NULL,
+  dim_id INTEGER NOT NULL DEFAULT 0,
+  dim_label TEXT NOT NULL DEFAULT '',
+  value REAL NOT NULL DEFAULT 0.0,
+  PRIMARY KEY (grain, bucket, metric, dim_id, dim_label)
+);
+
+CREATE TABLE rollup_watermarks (
+  source TEXT PRIMARY KEY,
+  last_id INTEGER NOT NULL DEFAULT 0,
+  updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Migrations applied by `flask --app wsgi migrate`
+CREATE TABLE schema_migrations (
+  migration_id TEXT PRIMARY KEY,
+  applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Secondary indexes matched to the API's filters and sort orders
+-- (also applied to existing databases by migration 0001_route_indexes in app.py)
+CREATE INDEX ix_donation_records_donor_date ON donation_records (donor_store_id, donation_date);
+CREATE INDEX ix_donation_records_date ON donation_records (donation_date);
+CREATE INDEX ix_donation_item_details_donation ON donation_item_details (donation_id);
+CREATE INDEX ix_pickup_scheduling_donor_date ON pickup_scheduling (donor_store_id, scheduled_date);
+CREATE INDEX ix_pickup_scheduling_date ON pickup_scheduling (scheduled_date);
+CREATE INDEX ix_distributed_items_date ON distributed_items (distribution_date);
+CREATE INDEX ix_distributed_items_center ON distributed_items (center_id);
+CREATE INDEX ix_feedback_reviews_npo_date ON feedback_reviews (npo_id, review_date);
+CREATE INDEX ix_feedback_reviews_donor_date ON feedback_reviews (donor_store_id, review_date);
+CREATE INDEX ix_feedback_reviews_date ON feedback_reviews (review_date);
+CREATE INDEX ix_distribution_centers_created ON distribution_centers (created_at);
+
+-- Delivery tracking (migration 0002_delivery_tracking)
+CREATE INDEX ix_distributed_items_npo_date ON distributed_items (npo_id, distribution_date);
+CREATE INDEX ix_delivery_routes_distribution ON delivery_routes (distribution_id);
+CREATE INDEX ix_delivery_confirmations_distribution ON delivery_confirmations (distribution_id);
+CREATE INDEX ix_collected_items_pickup ON collected_items (pickup_id);
+CREATE INDEX ix_sorting_records_collected_item ON sorting_records (collected_item_id);
+
+-- Inventory ledger (migration 0003_inventory_ledger)
+CREATE UNIQUE INDEX ux_inventory_center_item ON inventory (center_id, item_name);
+CREATE INDEX ix_inventory_movements_center ON inventory_movements (center_id, movement_id);
+CREATE INDEX ix_inventory_movements_center_item ON inventory_movements (center_id, item_name, movement_id);
+CREATE TRIGGER trg_inventory_quantity_insert BEFORE INSERT ON inventory
+  WHEN NEW.quantity < 0 BEGIN SELECT RAISE(ABORT, 'inventory quantity cannot be negative'); END;
+CREATE TRIGGER trg_inventory_quantity_update BEFORE UPDATE OF quantity ON inventory
+  WHEN NEW.quantity < 0 BEGIN SELECT RAISE(ABORT, 'inventory quantity cannot be negative'); END;
+
+-- Pickup route planning (migration 0004_pickup_routes)
+CREATE INDEX ix_delivery_routes_pickup ON delivery_routes (pickup_id);
+CREATE INDEX ix_delivery_routes_key ON delivery_routes (route_key, stop_sequence);
+
+-- Request matching (migration 0005_request_matching)
+CREATE INDEX ix_donation_records_type ON donation_records (donation_type, donation_id);
+CREATE INDEX ix_inventory_updated ON inventory (last_updated);
+CREATE INDEX ix_request_allocations_item ON request_allocations (item_id);
+
+-- Full-text search (migration 0006_search; rebuild with `flask --app app rebuild-search`)
+CREATE VIRTUAL TABLE items_fts USING fts5(item_name, item_description, content='donation_item_details', content_rowid='item_id', tokenize='porter unicode61', prefix='2 3');
+CREATE TRIGGER items_fts_ai AFTER INSERT ON donation_item_details
+  BEGIN INSERT INTO items_fts (rowid, item_name, item_description) VALUES (new.item_id, new.item_name, new.item_description); END;
+CREATE TRIGGER items_fts_ad AFTER DELETE ON donation_item_details
+  BEGIN INSERT INTO items_fts (items_fts, rowid, item_name, item_description) VALUES ('delete', old.item_id, old.item_name, old.item_description); END;
+CREATE TRIGGER items_fts_au AFTER UPDATE OF item_name, item_description ON donation_item_details
+  BEGIN INSERT INTO items_fts (items_fts, rowid, item_name, item_description) VALUES ('delete', old.item_id, old.item_name, old.item_description);
+    INSERT INTO items_fts (rowid, item_name, item_description) VALUES (new.item_id, new.item_name, new.item_description); END;
+CREATE VIRTUAL TABLE donations_fts USING fts5(notes, content='donation_records', content_rowid='donation_id', tokenize='porter unicode61', prefix='2 3');
+CREATE TRIGGER donations_fts_ai AFTER INSERT ON donation_records
+  BEGIN INSERT INTO donations_fts (rowid, notes) VALUES (new.donation_id, new.notes); END;
+CREATE TRIGGER donations_fts_ad AFTER DELETE ON donation_records
+  BEGIN INSERT INTO donations_fts (donations_fts, rowid, notes) VALUES ('delete', old.donation_id, old.notes); END;
+CREATE TRIGGER donations_fts_au AFTER UPDATE OF notes ON donation_records
+  BEGIN INSERT INTO donations_fts (donations_fts, rowid, notes) VALUES ('delete', old.donation_id, old.notes);
+    INSERT INTO donations_fts (rowid, notes) VALUES (new.donation_id, new.notes); END;
+CREATE VIRTUAL TABLE inventory_fts USING fts5(item_name, content='inventory', content_rowid='inventory_id', tokenize='porter unicode61', prefix='2 3');
+CREATE TRIGGER inventory_fts_ai AFTER INSERT ON inventory
+  BEGIN INSERT INTO inventory_fts (rowid, item_name) VALUES (new.inventory_id, new.item_name); END;
+CREATE TRIGGER inventory_fts_ad AFTER DELETE ON inventory
+  BEGIN INSERT INTO inventory_fts (inventory_fts, rowid, item_name) VALUES ('delete', old.inventory_id, old.item_name); END;
+CREATE TRIGGER inventory_fts_au AFTER UPDATE OF item_name ON inventory
+  BEGIN INSERT INTO inventory_fts (inventory_fts, rowid, item_name) VALUES ('delete', old.inventory_id, old.item_name);
+    INSERT INTO inventory_fts (rowid, item_name) VALUES (new.inventory_id, new.item_name); END;
+CREATE VIRTUAL TABLE npos_fts USING fts5(npo_name, city, content='npo_profiles', content_rowid='npo_id', tokenize='porter unicode61', prefix='2 3');
+CREATE TRIGGER npos_fts_ai AFTER INSERT ON npo_profiles
+  BEGIN INSERT INTO npos_fts (rowid, npo_name, city) VALUES (new.npo_id, new.npo_name, new.city); END;
+CREATE TRIGGER npos_fts_ad AFTER DELETE ON npo_profiles
+  BEGIN INSERT INTO npos_fts (npos_fts, rowid, npo_name, city) VALUES ('delete', old.npo_id, old.npo_name, old.city); END;
+CREATE TRIGGER npos_fts_au AFTER UPDATE OF npo_name, city ON npo_profiles
+  BEGIN INSERT INTO npos_fts (npos_fts, rowid, npo_name, city) VALUES ('delete', old.npo_id, old.npo_name, old.city);
+    INSERT INTO npos_fts (rowid, npo_name, city) VALUES (new.npo_id, new.npo_name, new.city); END;
+
+-- Notifications (migration 0007_notifications)
+CREATE UNIQUE INDEX ux_notifications_dedupe ON notifications (dedupe_key, recipient_id);
+CREATE INDEX ix_notifications_recipient ON notifications (recipient_id, notification_id);
+CREATE INDEX ix_notification_outbox_due ON notification_outbox (status, available_at);
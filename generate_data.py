@@ -0,0 +1,215 @@
+# generate_data.py
+"""
+Synthetic data generator for benchmarking.
+
+Fills a fresh SQLite database with users, donor/NPO profiles, donations with
+items, pickups, distribution centers, inventory, distributed items and feedback.
+Donations follow a Zipf-like skew so a few large retail donors account for most
+of the volume, like the real platform.
+
+    python generate_data.py --db bench_100k.db --donations 100000
+
+Every other volume is derived from --donations unless given explicitly. All
+synthetic users share the password "bench123".
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+CHUNK = 50000
+
+CITIES = ["Johannesburg", "Cape Town", "Durban", "Pretoria", "Port Elizabeth", "Bloemfontein",
+          "East London", "Polokwane", "Nelspruit", "Kimberley", "Rustenburg", "Pietermaritzburg"]
+ITEMS = ["rugby ball", "soccer ball", "netball", "cricket bat", "cricket ball", "tennis racket",
+         "tennis ball", "hockey stick", "running shoes", "soccer boots", "shin guards", "goalkeeper gloves",
+         "training cones", "skipping rope", "basketball", "volleyball", "swimming goggles", "team jersey",
+         "water bottle", "kit bag"]
+STATUSES = ["Scheduled", "Completed", "Cancelled"]
+STATUS_WEIGHTS = [0.25, 0.65, 0.10]
+ROUTE_STATUSES = ["planned", "in_transit", "completed"]
+ROUTE_WEIGHTS = [0.15, 0.15, 0.70]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", required=True, help="database file to create")
+    parser.add_argument("--donations", type=int, default=10000)
+    parser.add_argument("--donors", type=int, help="default: donations / 50")
+    parser.add_argument("--npos", type=int, help="default: donations / 500")
+    parser.add_argument("--centers", type=int, help="default: 12")
+    parser.add_argument("--items-per-donation", type=float, default=2.5, help="mean items per donation")
+    parser.add_argument("--pickups", type=int, help="default: donations / 4")
+    parser.add_argument("--distributions", type=int, help="default: donations / 2")
+    parser.add_argument("--feedback", type=int, help="default: donations / 10")
+    parser.add_argument("--skew", type=float, default=1.2, help="Zipf exponent for donor activity")
+    parser.add_argument("--years", type=int, default=3, help="history span ending today")
+    parser.add_argument("--seed", type=int, default=17)
+    parser.add_argument("--force", action="store_true", help="overwrite an existing --db file")
+    return parser.parse_args()
+
+
+def insert_chunked(table, rows):
+    from app import db
+    for start in range(0, len(rows), CHUNK):
+        db.session.execute(db.insert(table), rows[start:start + CHUNK])
+    db.session.commit()
+
+
+def random_dates(rng, n, years):
+    end = datetime.utcnow()
+    seconds = rng.integers(0, years * 365 * 86400, size=n)
+    return [end - timedelta(seconds=int(s)) for s in seconds]
+
+
+def zipf_weights(n, exponent):
+    w = 1.0 / np.arange(1, n + 1) ** exponent
+    return w / w.sum()
+
+
+def main():
+    args = parse_args()
+    n_don = args.donations
+    n_donors = args.donors or max(n_don // 50, 3)
+    n_npos = args.npos or max(n_don // 500, 2)
+    n_centers = args.centers or 12
+    n_pickups = args.pickups if args.pickups is not None else n_don // 4
+    n_dist = args.distributions if args.distributions is not None else n_don // 2
+    n_feedback = args.feedback if args.feedback is not None else n_don // 10
+
+    path = os.path.abspath(args.db)
+    if os.path.exists(path):
+        if not args.force:
+            sys.exit(f"{path} exists; pass --force to overwrite")
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+    from werkzeug.security import generate_password_hash
+    from app import create_app, db, init_db
+    from app.metrics import rebuild_summaries
+    from app.models import (User, DonorProfile, NPOProfile, DonationRecord, DonationItem, Pickup, DistributionCenter,
+                            Inventory, DistributedItem, InventoryMovement, DeliveryRoute, DeliveryConfirmation,
+                            FeedbackReview, Geocode)
+    from app.rollups import refresh_rollups
+    from app.routing import CITY_CENTROIDS, address_key
+
+    app = create_app(DATABASE_PATH=path)
+    rng = np.random.default_rng(args.seed)
+    started = time.perf_counter()
+    with app.app_context():
+        init_db(seed=False)
+        password_hash = generate_password_hash("bench123")  # hashing is slow; share one
+        now = datetime.utcnow()
+
+        # users: donors first, then NPOs, so ids are contiguous per role
+        users = [{"name": f"Donor Store {i}", "email": f"donor{i}@bench.example", "password_hash": password_hash, "role": "donor", "created_at": now}
+                 for i in range(n_donors)]
+        users += [{"name": f"NPO {i}", "email": f"npo{i}@bench.example", "password_hash": password_hash, "role": "npo", "created_at": now}
+                  for i in range(n_npos)]
+        insert_chunked(User.__table__, users)
+        donor_ids = np.array([uid for (uid,) in db.session.query(User.user_id).filter(User.role == "donor").order_by(User.user_id)])
+        npo_ids = np.array([uid for (uid,) in db.session.query(User.user_id).filter(User.role == "npo").order_by(User.user_id)])
+        cities = rng.choice(CITIES, size=n_donors + n_npos)
+        insert_chunked(DonorProfile.__table__, [
+            {"donor_store_id": int(uid), "first_name": "Donor", "last_name": f"Store {i}", "email": f"donor{i}@bench.example",
+             "city": str(cities[i]), "country": "South Africa", "address": f"{i + 1} Main Road, {cities[i]}", "created_at": now, "updated_at": now}
+            for i, uid in enumerate(donor_ids)])
+        insert_chunked(NPOProfile.__table__, [
+            {"npo_id": int(uid), "npo_name": f"NPO {i}", "email": f"npo{i}@bench.example", "city": str(cities[n_donors + i]),
+             "country": "South Africa", "address": f"{i + 1} NPO Road, {cities[n_donors + i]}", "created_at": now, "updated_at": now}
+            for i, uid in enumerate(npo_ids)])
+        insert_chunked(DistributionCenter.__table__, [
+            {"center_name": f"{CITIES[i % len(CITIES)]} Center {i}", "city": CITIES[i % len(CITIES)], "country": "South Africa", "created_at": now}
+            for i in range(n_centers)])
+        center_ids = np.array([cid for (cid,) in db.session.query(DistributionCenter.center_id).order_by(DistributionCenter.center_id)])
+
+        # donations: Zipf-skewed donors, ~5% NPO requests without a donor
+        donor_pick = donor_ids[rng.choice(n_donors, size=n_don, p=zipf_weights(n_donors, args.skew))]
+        is_request = rng.random(n_don) < 0.05
+        request_npos = rng.choice(npo_ids, size=n_don)
+        amounts = np.round(rng.lognormal(5, 1.2, size=n_don), 2) * (rng.random(n_don) < 0.3)
+        dates = sorted(random_dates(rng, n_don, args.years))
+        insert_chunked(DonationRecord.__table__, [
+            {"donor_store_id": None if is_request[i] else int(donor_pick[i]), "donation_date": dates[i],
+             "donation_amount": 0.0 if is_request[i] else float(amounts[i]),
+             "donation_type": "request" if is_request[i] else ("financial" if amounts[i] else "item"),
+             "npo_id": int(request_npos[i]) if is_request[i] else None,
+             "notes": f"Requested by NPO {int(request_npos[i])}" if is_request[i] else "Item donation"}
+            for i in range(n_don)])
+        first_donation = db.session.query(db.func.min(DonationRecord.donation_id)).scalar()
+
+        per_donation = rng.poisson(args.items_per_donation - 1, size=n_don) + 1
+        n_items = int(per_donation.sum())
+        item_donations = np.repeat(np.arange(first_donation, first_donation + n_don), per_donation)
+        item_names = rng.choice(ITEMS, size=n_items)
+        quantities = rng.geometric(0.3, size=n_items)
+        values = np.round(rng.uniform(20, 900, size=n_items), 2)
+        insert_chunked(DonationItem.__table__, [
+            {"donation_id": int(item_donations[i]), "item_name": str(item_names[i]), "item_description": "good condition",
+             "item_quantity": int(quantities[i]), "item_value": float(values[i])}
+            for i in range(n_items)])
+
+        # pickups at the donor's city; every address gets a geocode within ~10 km of the city centre
+        pickup_pick = rng.choice(n_donors, size=n_pickups, p=zipf_weights(n_donors, args.skew))
+        statuses = rng.choice(STATUSES, size=n_pickups, p=STATUS_WEIGHTS)
+        addresses = [f"{i % 500 + 1} Main Road, {cities[pickup_pick[i]]}" for i in range(n_pickups)]
+        insert_chunked(Pickup.__table__, [
+            {"donor_store_id": int(donor_ids[pickup_pick[i]]), "scheduled_date": d, "pickup_address": addresses[i],
+             "contact_person": "Store Manager", "contact_phone": "0820000000", "status": str(statuses[i])}
+            for i, d in enumerate(random_dates(rng, n_pickups, args.years))])
+        geocodes = {}
+        for i, address in enumerate(addresses):
+            key = address_key(address)
+            if key not in geocodes:
+                lat, lon = CITY_CENTROIDS[str(cities[pickup_pick[i]])]
+                dlat, dlon = rng.normal(0, 0.06, size=2)
+                geocodes[key] = {"address_key": key, "latitude": lat + dlat, "longitude": lon + dlon, "region": str(cities[pickup_pick[i]])}
+        insert_chunked(Geocode.__table__, list(geocodes.values()))
+
+        stock = [{"center_id": int(cid), "item_name": name, "quantity": int(rng.integers(0, 500)), "last_updated": now}
+                 for cid in center_ids for name in ITEMS]
+        insert_chunked(Inventory.__table__, stock)
+        insert_chunked(InventoryMovement.__table__, [
+            {"center_id": r["center_id"], "item_name": r["item_name"], "delta": r["quantity"], "reason": "opening", "created_at": now}
+            for r in stock if r["quantity"]])
+
+        # distributions go to NPOs with the same skew; ~90% get a route, completed routes a confirmation
+        dist_centers = rng.choice(center_ids, size=n_dist)
+        dist_npos = npo_ids[rng.choice(n_npos, size=n_dist, p=zipf_weights(n_npos, args.skew))]
+        dist_items = rng.choice(ITEMS, size=n_dist)
+        dist_qty = rng.geometric(0.2, size=n_dist)
+        insert_chunked(DistributedItem.__table__, [
+            {"center_id": int(dist_centers[i]), "npo_id": int(dist_npos[i]), "item_name": str(dist_items[i]),
+             "item_quantity": int(dist_qty[i]), "distribution_date": d}
+            for i, d in enumerate(random_dates(rng, n_dist, args.years))])
+        first_dist = db.session.query(db.func.min(DistributedItem.distribution_id)).scalar()
+        routed = np.flatnonzero(rng.random(n_dist) < 0.9)
+        route_status = rng.choice(ROUTE_STATUSES, size=len(routed), p=ROUTE_WEIGHTS)
+        insert_chunked(DeliveryRoute.__table__, [
+            {"distribution_id": first_dist + int(i), "origin_address": "Distribution center",
+             "destination_address": f"{int(dist_npos[i])} NPO Road", "estimated_delivery_time": "2 days",
+             "route_status": str(route_status[k])}
+            for k, i in enumerate(routed)])
+        insert_chunked(DeliveryConfirmation.__table__, [
+            {"distribution_id": first_dist + int(i), "received_by": "NPO staff", "received_date": now, "notes": "Received"}
+            for i in routed[route_status == "completed"]])
+
+        fb_donors = rng.choice(donor_ids, size=n_feedback)
+        fb_npos = rng.choice(npo_ids, size=n_feedback)
+        ratings = rng.choice([1, 2, 3, 4, 5], size=n_feedback, p=[0.05, 0.05, 0.15, 0.35, 0.40])
+        insert_chunked(FeedbackReview.__table__, [
+            {"donor_store_id": int(fb_donors[i]), "npo_id": int(fb_npos[i]), "rating": int(ratings[i]), "comments": "Thank you!", "review_date": d}
+            for i, d in enumerate(random_dates(rng, n_feedback, args.years))])
+
+        rebuild_summaries()
+        refresh_rollups()
+
+    print(f"{path}: {n_donors} donors, {n_npos} NPOs, {n_centers} centers, {n_don} donations, {n_items} items, "
+          f"{n_pickups} pickups, {n_dist} distributions, {n_feedback} reviews in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
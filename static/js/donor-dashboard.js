@@ -0,0 +1,201 @@
+const logoutBtn = document.getElementById('logoutBtn');
+logoutBtn?.addEventListener('click', () => {
+  localStorage.removeItem('user');
+  sessionStorage.removeItem('user');
+  window.location.href = '/';
+});
+
+// ------------------------------
+// LOAD TOTAL DONATIONS & ITEMS
+// ------------------------------
+function renderTotals(data) {
+  document.getElementById("totalDonations").innerText = data.total_donations || 0;
+  document.getElementById("totalItems").innerText = data.total_items || 0;
+}
+
+async function loadTotalDonations() {
+  try {
+    const res = await fetch(`${API_BASE}/donor/${user.user_id}/metrics`);
+    renderTotals(await res.json());
+  } catch (err) {
+    console.error("Failed to load donor metrics", err);
+  }
+}
+
+// ------------------------------
+// LOAD PICKUPS (a page at a time, latest first)
+// ------------------------------
+const PICKUPS_PAGE_SIZE = 50;
+let pickupsCursor = null;
+
+async function loadPickups() {
+  const res = await fetch(`${API_BASE}/pickups/${user.user_id}?limit=${PICKUPS_PAGE_SIZE}`);
+  renderPickups(await res.json());
+}
+
+function renderPickups({ pickups, next_cursor }) {
+  const tbody = document.getElementById("pickupTable");
+  tbody.innerHTML = "";
+
+  if (!Array.isArray(pickups) || pickups.length === 0) {
+    tbody.innerHTML = `<tr><td colspan="3" class="text-center">No pickups scheduled yet.</td></tr>`;
+  } else {
+    appendPickups(pickups);
+  }
+  setPickupsCursor(next_cursor);
+}
+
+function appendPickups(pickups) {
+  const tbody = document.getElementById("pickupTable");
+  pickups.forEach(p => {
+    tbody.innerHTML += `
+      <tr data-pickup-id="${p.pickup_id}">
+        <td>${p.scheduled_date}</td>
+        <td>${p.pickup_address}</td>
+        <td class="pickup-status">${p.status}</td>
+      </tr>
+    `;
+  });
+}
+
+function setPickupsCursor(cursor) {
+  pickupsCursor = cursor || null;
+  document.getElementById("loadMorePickups").classList.toggle("d-none", !pickupsCursor);
+}
+
+document.getElementById("loadMorePickups").addEventListener("click", async (e) => {
+  e.target.disabled = true;
+  try {
+    const res = await fetch(`${API_BASE}/pickups/${user.user_id}?limit=${PICKUPS_PAGE_SIZE}&cursor=${encodeURIComponent(pickupsCursor)}`);
+    const page = await res.json();
+    appendPickups(page.pickups);
+    setPickupsCursor(page.next_cursor);
+  } catch (err) {
+    console.error("Failed to load more pickups", err);
+  } finally {
+    e.target.disabled = false;
+  }
+});
+
+// ------------------------------
+// LOAD IMPACT REPORTS
+// ------------------------------
+function renderImpactReports(reports) {
+  const list = document.getElementById("impactList");
+  list.innerHTML = "";
+
+  if (!Array.isArray(reports) || reports.length === 0) {
+    list.innerHTML = `<li class="list-group-item text-center">No impact reports available yet.</li>`;
+    return;
+  }
+
+  reports.forEach(r => {
+    list.innerHTML += `
+      <li class="list-group-item">
+        <strong>${r.center_name || "Distribution center"}:</strong> Distributed ${r.item_quantity} ${r.item_name}
+        <span class="text-muted">(${r.bucket})</span>
+      </li>
+    `;
+  });
+}
+
+// ------------------------------
+// SUBMIT DONATION
+// ------------------------------
+document.getElementById("donationForm").addEventListener("submit", async (e) => {
+  e.preventDefault();
+
+  const itemName = document.getElementById("item_name").value;
+  const itemQuantity = parseInt(document.getElementById("item_quantity").value);
+  const itemCondition = document.getElementById("item_condition").value;
+
+  try {
+    // 1️⃣ Create donation record
+    const donationRes = await fetch(`${API_BASE}/donations`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({
+        donor_store_id: user.user_id,
+        donation_amount: 0,
+        donation_type: "item",
+        notes: "Item donation"
+      })
+    });
+
+    const donation = await donationRes.json();
+    const donationId = donation.donation_id;
+
+    // 2️⃣ Add donation item
+    await fetch(`${API_BASE}/donations/${donationId}/items`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({
+        donation_id: donationId,
+        item_name: itemName,
+        item_quantity: itemQuantity,
+        item_description: itemCondition
+      })
+    });
+
+    // 3️⃣ Reset form
+    document.getElementById("donationForm").reset();
+
+    // 4️⃣ Reload metrics immediately (the live stream updates them when connected)
+    if (!localStorage.getItem("token")) await loadTotalDonations();
+
+    alert("Donation logged successfully!");
+
+  } catch (err) {
+    console.error("Failed to log donation", err);
+    alert("Error logging donation, please try again.");
+  }
+});
+
+// ------------------------------
+// LIVE UPDATES (server-sent events)
+// ------------------------------
+function addToCounter(id, delta) {
+  const el = document.getElementById(id);
+  el.innerText = (parseInt(el.innerText) || 0) + delta;
+}
+
+function subscribe() {
+  const token = localStorage.getItem("token");
+  if (!token || !window.EventSource) return;
+  // EventSource reconnects by itself and sends Last-Event-ID, so missed events are replayed
+  const events = new EventSource(`${API_BASE}/events?access_token=${encodeURIComponent(token)}`);
+  events.addEventListener("pickup.status", (e) => {
+    const { pickup_id, status } = JSON.parse(e.data);
+    const cell = document.querySelector(`tr[data-pickup-id="${pickup_id}"] .pickup-status`);
+    if (cell) cell.innerText = status; else loadPickups();
+  });
+  events.addEventListener("donation.created", (e) => {
+    const { item_quantity } = JSON.parse(e.data);
+    addToCounter("totalDonations", 1);
+    addToCounter("totalItems", item_quantity);
+  });
+  events.addEventListener("donation.item_added", (e) => {
+    addToCounter("totalItems", JSON.parse(e.data).item_quantity);
+  });
+  events.addEventListener("reset", () => {
+    loadPickups();
+    loadTotalDonations();
+  });
+}
+
+// ------------------------------
+// INITIAL LOAD (all panels in one request, or none if the server embedded them)
+// ------------------------------
+async function loadDashboard() {
+  let data = BOOTSTRAP && BOOTSTRAP.donor_id === user.user_id ? BOOTSTRAP : null;
+  if (!data) {
+    const res = await fetch(`${API_BASE}/donor/${user.user_id}/dashboard`);
+    data = await res.json();
+  }
+  renderTotals(data.metrics);
+  renderPickups(data.pickups);
+  renderImpactReports(data.impact_reports);
+}
+
+loadDashboard().catch(err => console.error("Failed to load dashboard", err));
+subscribe();
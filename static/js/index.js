@@ -0,0 +1,40 @@
+const API_BASE = window.location.hostname === 'localhost'
+  ? 'http://localhost:5000/api'
+  : window.location.origin + '/api';
+
+document.getElementById("exploreDashboardsBtn").addEventListener("click", () => {
+  const user = JSON.parse(sessionStorage.getItem("user") || localStorage.getItem("user"));
+  if (!user) { alert("Please login first."); return; }
+  if (user.role === "donor") window.location.href = document.body.dataset.donorDashboard;
+  else if (user.role === "npo") window.location.href = document.body.dataset.npoDashboard;
+});
+
+document.addEventListener("DOMContentLoaded", () => {
+  const user = JSON.parse(sessionStorage.getItem("user") || localStorage.getItem("user"));
+  if (user) {
+    document.getElementById("dashboardCards").style.display = "none";
+    const container = document.querySelector("#dashboards .container");
+    const btn = document.createElement("a");
+    btn.className = "btn btn-brand btn-lg mt-3";
+    btn.textContent = "Go To Your Dashboard";
+    btn.href = user.role === "donor" ? document.body.dataset.donorDashboard : document.body.dataset.npoDashboard;
+    container.appendChild(btn);
+  }
+});
+
+async function fetchKPIs() {
+  try {
+    const res = await fetch(API_BASE + "/kpis");
+    const data = await res.json();
+    const bar = document.createElement("div");
+    bar.className = "container d-flex justify-content-center gap-3 my-4";
+    bar.innerHTML = `
+      <div class="p-2 bg-white shadow-sm rounded">Donations: <strong>${data.total_donations}</strong></div>
+      <div class="p-2 bg-white shadow-sm rounded">Monetary (ZAR): <strong>R${data.total_monetary.toFixed(2)}</strong></div>
+      <div class="p-2 bg-white shadow-sm rounded">Items in-kind: <strong>${data.total_items_in_kind}</strong></div>
+      <div class="p-2 bg-white shadow-sm rounded">Pickups Scheduled: <strong>${data.pickups_scheduled}</strong></div>
+    `;
+    document.querySelector(".hero .container-fluid").appendChild(bar);
+  } catch (err) { console.error("KPI load failed", err); }
+}
+fetchKPIs();
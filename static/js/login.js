@@ -0,0 +1,34 @@
+    document.getElementById("loginForm").addEventListener("submit", async function (e) {
+      e.preventDefault(); // stop the HTML redirect
+      const email = document.getElementById("emailInput").value;
+      const password = document.getElementById("passwordInput").value;
+      const response = await fetch(`${API_BASE}/login`, {
+        method: "POST",
+        headers: {"Content-Type": "application/json"},
+        body: JSON.stringify({ email, password })
+      });
+      const result = await response.json();
+      if (!response.ok) {
+        document.getElementById("alertBox").innerHTML = `
+          <div class="alert alert-danger">${result.error}</div>
+        `;
+        return;
+      }
+      // Save user info (optional)
+      localStorage.setItem("user", JSON.stringify(result.user));
+      // Signed, expiring token for authenticated API calls (Authorization: Bearer <token>)
+      localStorage.setItem("token", result.token);
+
+      //succcess alert
+      document.getElementById("alertBox").innerHTML = `
+  <div class="alert alert-success">Login successful! Redirecting...</div>
+`;
+      // Redirect based on role
+      if (result.user.role === "donor") {
+        window.location.href = `/donor-dashboard?user_id=${result.user.user_id}`;
+      } else if (result.user.role === "npo") {
+        window.location.href = `/npo-dashboard?user_id=${result.user.user_id}`;
+      } else {
+        window.location.href = "/";
+      }
+    });
@@ -0,0 +1,192 @@
+/* ------------------------------
+    SIGN OUT FUNCTIONALITY
+------------------------------ */
+document.getElementById("signout-btn").addEventListener("click", () => {
+  localStorage.removeItem("user");
+  sessionStorage.removeItem("user");
+  window.location.href = "/"; // redirect to index
+});
+
+/* ------------------------------
+    LOAD METRICS
+------------------------------ */
+async function loadNpoMetrics() {
+  try {
+    const res = await fetch(`${API_BASE}/metrics/npo/${npoId}`);
+    renderNpoMetrics(await res.json());
+  } catch (err) {
+    console.error("Error loading metrics:", err);
+  }
+}
+
+function renderNpoMetrics(data) {
+  document.getElementById('total-donations').textContent = data.total_donations || 0;
+  document.getElementById('total-pickups').textContent = data.total_pickups || 0;
+  document.getElementById('avg-feedback').textContent =
+    data.average_feedback_rating ? data.average_feedback_rating.toFixed(2) : "No feedback yet";
+}
+
+/* ------------------------------
+    LOAD DELIVERY TRACKING
+------------------------------ */
+function deliveryRow(delivery) {
+  const tr = document.createElement("tr");
+  tr.innerHTML = `
+    <td>${delivery.delivery_id}</td>
+    <td>${delivery.item_name}</td>
+    <td>${delivery.quantity}</td>
+    <td>${delivery.status}</td>
+    <td>${delivery.delivery_date ? new Date(delivery.delivery_date).toLocaleDateString() : "Pending"}</td>
+  `;
+  return tr;
+}
+
+async function loadDeliveries() {
+  try {
+    const res = await fetch(`${API_BASE}/deliveries/${npoId}`);
+    renderDeliveries(await res.json());  // first page, newest first
+  } catch (err) {
+    console.error("Error loading deliveries:", err);
+    const tbody = document.getElementById("delivery-table-body");
+    tbody.innerHTML = `<tr><td colspan="5" class="text-center text-muted">Error loading deliveries</td></tr>`;
+  }
+}
+
+function renderDeliveries({ deliveries }) {
+  const tbody = document.getElementById("delivery-table-body");
+  tbody.innerHTML = "";
+
+  if (!deliveries || deliveries.length === 0) {
+    tbody.innerHTML = `<tr><td colspan="5" class="text-center text-muted">No deliveries found.</td></tr>`;
+    return;
+  }
+
+  deliveries.forEach(delivery => tbody.appendChild(deliveryRow(delivery)));
+}
+
+/* ------------------------------
+    LOAD DASHBOARD (all panels in one request, or none if the server embedded them)
+------------------------------ */
+async function loadDashboard() {
+  try {
+    let data = BOOTSTRAP && BOOTSTRAP.npo_id === npoId ? BOOTSTRAP : null;
+    if (!data) {
+      const res = await fetch(`${API_BASE}/npo/${npoId}/dashboard`);
+      data = await res.json();
+    }
+    renderNpoMetrics(data.metrics);
+    renderDeliveries(data.deliveries);
+  } catch (err) {
+    console.error("Error loading dashboard:", err);
+    const tbody = document.getElementById("delivery-table-body");
+    tbody.innerHTML = `<tr><td colspan="5" class="text-center text-muted">Error loading deliveries</td></tr>`;
+  }
+}
+
+/* ------------------------------
+    SUBMIT EQUIPMENT REQUEST
+    (posts a donation record without donor_store_id -> donation_type='request')
+------------------------------ */
+document.getElementById("equipment-form").addEventListener("submit", async (e) => {
+  e.preventDefault();
+  const form = new FormData(e.target);
+
+  try {
+    const res = await fetch(`${API_BASE}/donations`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({
+        // donor_store_id omitted intentionally for requests
+        donation_amount: 0,
+        donation_type: "request",
+        npo_id: npoId,
+        notes: `Requested by NPO ${npoId}`,
+        items: [{
+          item_name: form.get("item_name"),
+          item_quantity: parseInt(form.get("quantity") || 0),
+          item_value: 0
+        }]
+      })
+    });
+
+    const data = await res.json();
+    if (!res.ok) {
+      alert("Request failed: " + (data.error || JSON.stringify(data)));
+      return;
+    }
+    alert(`Request submitted! Donation ID: ${data.donation_id}`);
+    e.target.reset();
+    loadNpoMetrics();
+  } catch (err) {
+    console.error("Request failed:", err);
+    alert("Failed to submit request");
+  }
+});
+
+/* ------------------------------
+    SUBMIT FEEDBACK
+    (npo_id is required)
+------------------------------ */
+document.getElementById("feedback-form").addEventListener("submit", async (e) => {
+  e.preventDefault();
+  const form = new FormData(e.target);
+
+  try {
+    const payload = {
+      npo_id: npoId,
+      rating: parseInt(form.get("rating")),
+      comments: form.get("comments")
+    };
+    // optional delivery/donor id if user provided it (not required)
+    const deliveryId = form.get("delivery_id");
+    if (deliveryId) {
+      payload.delivery_id = parseInt(deliveryId);
+    }
+
+    const res = await fetch(`${API_BASE}/feedback`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify(payload)
+    });
+
+    const data = await res.json();
+    if (!res.ok) {
+      alert("Failed to submit feedback: " + (data.error || JSON.stringify(data)));
+      return;
+    }
+    alert("Feedback submitted!");
+    e.target.reset();
+    loadNpoMetrics();
+  } catch (err) {
+    console.error("Feedback failed:", err);
+    alert("Failed to submit feedback");
+  }
+});
+
+/* ------------------------------
+    LIVE UPDATES (server-sent events)
+------------------------------ */
+function subscribe() {
+  const token = localStorage.getItem("token");
+  if (!token || !window.EventSource) return;
+  // EventSource reconnects by itself and sends Last-Event-ID, so missed events are replayed
+  const events = new EventSource(`${API_BASE}/events?access_token=${encodeURIComponent(token)}`);
+  events.addEventListener("delivery.created", (e) => {
+    const tbody = document.getElementById("delivery-table-body");
+    if (!tbody.querySelector("tr td + td")) tbody.innerHTML = "";  // drop the "No deliveries" row
+    tbody.prepend(deliveryRow(JSON.parse(e.data)));
+  });
+  events.addEventListener("feedback.created", (e) => {
+    document.getElementById('avg-feedback').textContent = JSON.parse(e.data).average_feedback_rating.toFixed(2);
+  });
+  events.addEventListener("reset", () => {
+    loadNpoMetrics();
+    loadDeliveries();
+  });
+}
+
+/* Initialize */
+window.addEventListener("DOMContentLoaded", () => {
+  loadDashboard();
+  subscribe();
+});
@@ -0,0 +1,30 @@
+document.getElementById("registerForm").addEventListener("submit", async function(e) {
+  e.preventDefault(); // stop page reload
+
+  const name = document.getElementById("nameInput").value;
+  const email = document.getElementById("emailInput").value;
+  const password = document.getElementById("passwordInput").value;
+  const role = document.getElementById("roleInput").value;
+
+  const response = await fetch(`${API_BASE}/register`, {
+      method: "POST",
+      headers: {"Content-Type": "application/json"},
+      body: JSON.stringify({ name, email, password, role })
+  });
+
+  const result = await response.json();
+
+  if (!response.ok) {
+      document.getElementById("alertBox").innerHTML = `<div class="alert alert-danger">${result.error}</div>`;
+      return;
+  }
+
+  document.getElementById("alertBox").innerHTML = `<div class="alert alert-success">Registration successful! Redirecting to login...</div>`;
+
+  // Optional: store user info
+  localStorage.setItem("user", JSON.stringify({user_id: result.user_id, name, email, role}));
+
+  setTimeout(() => {
+    window.location.href = "/login";
+}, 1500);
+});
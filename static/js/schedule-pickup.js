@@ -0,0 +1,49 @@
+const API_BASE = "http://127.0.0.1:5000/api";
+const user = JSON.parse(localStorage.getItem("user") || sessionStorage.getItem("user") || "{}");
+
+if (!user || !user.user_id) {
+  alert("You must be logged in to schedule a pickup.");
+  window.location.href = "/login";
+}
+
+document.getElementById("pickupForm").addEventListener("submit", async (e) => {
+  e.preventDefault();
+  const data = {
+    donor_store_id: user.user_id,
+    pickup_address: document.getElementById("pickupAddress").value,
+    contact_person: document.getElementById("contactPerson").value,
+    contact_phone: document.getElementById("contactPhone").value,
+    scheduled_date: document.getElementById("scheduledDate").value
+  };
+
+  const alertBox = document.getElementById("pickupAlert");
+
+  try {
+    const res = await fetch(`${API_BASE}/pickups`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify(data)
+    });
+
+    const result = await res.json();
+
+    if (res.ok) {
+      alertBox.innerHTML = `<div class="alert alert-success">${result.message}</div>`;
+      document.getElementById("pickupForm").reset();
+
+      // Update scheduled pickups in donor dashboard automatically
+      // Store a flag so dashboard can refresh after returning
+      localStorage.setItem("refreshPickups", "true");
+
+      // Optional: redirect to donor dashboard after 1 second
+      setTimeout(() => { window.location.href = "/donor-dashboard"; }, 1000);
+
+    } else {
+      alertBox.innerHTML = `<div class="alert alert-danger">${result.error || "Failed to schedule pickup."}</div>`;
+    }
+
+  } catch (err) {
+    console.error(err);
+    alertBox.innerHTML = `<div class="alert alert-danger">Unable to schedule pickup.</div>`;
+  }
+});
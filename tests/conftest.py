@@ -0,0 +1,40 @@
+# tests/conftest.py
+"""
+Every test runs against its own app from create_app('testing'): a throwaway database,
+no response cache (repeat queries reach SQLite) and no background notification workers.
+"""
+import pytest
+
+from app import create_app, init_db
+from app.models import User
+
+
+def build_app(path, seed=True, **overrides):
+    app = create_app('testing', DATABASE_PATH=str(path), **overrides)
+    with app.app_context():
+        init_db(seed=seed)
+    return app
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    """build_app on a database under tmp_path, for tests that need their own settings."""
+    return lambda seed=True, **overrides: build_app(tmp_path / "app.db", seed=seed, **overrides)
+
+
+@pytest.fixture(scope="module")
+def app(tmp_path_factory):
+    """One seeded app per test module; the module's own fixtures add the data it needs."""
+    return build_app(tmp_path_factory.mktemp("db") / "app.db")
+
+
+@pytest.fixture(scope="module")
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture(scope="module")
+def accounts(app):
+    """(donor_id, npo_id) of the seeded sample donor and NPO."""
+    with app.app_context():
+        return tuple(User.query.filter_by(email=email).first().user_id for email in ("donor@example.com", "npo@example.com"))
@@ -0,0 +1,128 @@
+# tests/test_query_plans.py
+"""
+Query-plan regression suite for the API.
+
+Seeds a database, calls every GET endpoint through the test client, captures the
+SELECTs each one issues and runs EXPLAIN QUERY PLAN on them. A query fails if it
+falls back to a full table scan or a temp B-tree sort that is not allowed below.
+"""
+import re
+
+import pytest
+from sqlalchemy import event
+
+from app import db
+
+# endpoint -> plan details that are expected for it (whole-table reads by design)
+ALLOWED = {
+    "/api/inventory": {"SCAN inventory"},
+    "/api/centers": {"SCAN distribution_centers"},
+    "/api/export/donations": {"SCAN donation_records"},
+    # watermark probe (three scalar max() subqueries) and the periodic full rebuild of the stock index
+    "/api/matches": {"SCAN CONSTANT ROW", "SCAN inventory"},
+    # group/sort over the handful of 'total' / recent bucket rows
+    "/api/kpis": {"USE TEMP B-TREE FOR GROUP BY", "USE TEMP B-TREE FOR ORDER BY", "USE TEMP B-TREE FOR DISTINCT"},
+    # ranking sorts every full-text match by (bm25, rowid); LIMIT keeps that a bounded top-N sort
+    "/api/search": {"USE TEMP B-TREE FOR ORDER BY"},
+    "/api/impact-reports": {"USE TEMP B-TREE FOR GROUP BY", "USE TEMP B-TREE FOR ORDER BY", "USE TEMP B-TREE FOR DISTINCT",
+                            "USE TEMP B-TREE FOR RIGHT PART OF ORDER BY"},
+}
+ALLOWED["/api/donor/<id>/dashboard"] = ALLOWED["/api/impact-reports"]  # embeds the impact reports panel
+
+FULL_SCAN = re.compile(r"^SCAN (\w+)(?!.*(?:USING (?:COVERING )?INDEX|VIRTUAL TABLE INDEX))")
+TEMP_SORT = re.compile(r"^USE TEMP B-TREE")
+
+# filled in from the seeded fixture: {donor}, {npo} and the second-page cursors
+URLS = [
+    "/api/donations",
+    "/api/donations?donor_store_id={donor}",
+    "/api/donations?donor_store_id={donor}&include=items",
+    "/api/donations?donor_store_id={donor}&limit=10&cursor={donations_cursor}",
+    "/api/pickups",
+    "/api/pickups?donor_store_id={donor}",
+    "/api/pickups/{donor}",
+    "/api/pickups/{donor}?limit=5&cursor={pickups_cursor}",
+    "/api/pickups/routes?date=2026-01-05",
+    "/api/inventory",
+    "/api/inventory?center_id=1",
+    "/api/inventory/movements?center_id=1",
+    "/api/inventory/movements?center_id=1&item_name=item%203",
+    "/api/distributed_items",
+    "/api/deliveries/{npo}",
+    "/api/deliveries/{npo}?limit=5&cursor={deliveries_cursor}",
+    "/api/feedback",
+    "/api/feedback?npo_id={npo}",
+    "/api/feedback?donor_store_id={donor}",
+    "/api/matches",
+    "/api/search?q=rugby%20balls",
+    "/api/search?q=seed&type=npos,donations",
+    "/api/matches?npo_id={npo}",
+    "/api/metrics/npo/{npo}",
+    "/api/donor/{donor}/metrics",
+    "/api/donor/{donor}/dashboard",
+    "/api/npo/{npo}/dashboard",
+    "/api/users/{donor}",
+    "/api/centers",
+    "/api/kpis?grain=month",
+    "/api/impact-reports",
+    "/api/export/donations?since=2025-06-01",
+]
+
+
+@pytest.fixture(scope="module")
+def seeded(client, accounts):
+    donor_id, npo_id = accounts
+    centers = [client.post("/api/centers", json={"center_name": f"Center {n}", "city": "Pretoria"}).json["center_id"] for n in range(3)]
+    batch = [{
+        "donor_store_id": donor_id,
+        "donation_date": f"2025-{m:02d}-{d:02d}",
+        "items": [{"item_name": "rugby ball", "item_quantity": 2, "item_value": 150.0}]
+    } for m in range(1, 13) for d in range(1, 28)]
+    client.post("/api/donations/bulk", json=batch)
+    client.post("/api/donations", json={"donation_type": "request", "npo_id": npo_id, "items": [
+        {"item_name": f"Item {d}s", "item_quantity": 2} for d in range(1, 28, 3)]})
+    for d in range(1, 28):
+        client.post("/api/pickups", json={"donor_store_id": donor_id, "scheduled_date": f"2026-01-{d:02d}", "pickup_address": "1 Main Rd"})
+        client.post("/api/feedback", json={"donor_store_id": donor_id, "npo_id": npo_id, "rating": 1 + d % 5})
+        client.post("/api/inventory", json={"center_id": centers[d % 3], "item_name": f"item {d}", "quantity": d})
+        dist = client.post("/api/distributed_items", json={"center_id": centers[d % 3], "npo_id": npo_id, "item_name": f"item {d}", "item_quantity": 1}).json
+        if d % 2:
+            client.post("/api/delivery_routes", json={"distribution_id": dist["distribution_id"], "route_status": "in_transit"})
+        if d % 4 == 1:
+            client.post(f"/api/deliveries/{dist['distribution_id']}/confirm", json={"received_by": "Seed NPO"})
+    return {
+        "donor": donor_id,
+        "npo": npo_id,
+        "donations_cursor": client.get(f"/api/donations?donor_store_id={donor_id}&limit=10").json["next_cursor"],
+        "pickups_cursor": client.get(f"/api/pickups/{donor_id}?limit=5").json["next_cursor"],
+        "deliveries_cursor": client.get(f"/api/deliveries/{npo_id}?limit=5").json["next_cursor"],
+    }
+
+
+@pytest.mark.parametrize("url", URLS)
+def test_no_full_scans(app, client, seeded, url):
+    url = url.format(**seeded)
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and not executemany:
+            captured.append((statement, parameters))
+
+    with app.app_context():
+        engine = db.engine
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            resp = client.get(url)
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+        assert resp.status_code == 200
+
+        allowed = ALLOWED.get(re.sub(r"/\d+", "/<id>", url.split("?")[0]), set())
+        problems = []
+        with engine.connect() as conn:
+            for statement, parameters in captured:
+                details = [row[3] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)]
+                bad = [d for d in details if (FULL_SCAN.match(d) or TEMP_SORT.match(d)) and d not in allowed]
+                if bad:
+                    problems.append(f"{' '.join(statement.split())}\n    " + "\n    ".join(bad))
+    assert not problems, "\n".join(problems)
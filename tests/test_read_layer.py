@@ -0,0 +1,138 @@
+# tests/test_read_layer.py
+"""
+Byte-for-byte tests for the Core read path of the list endpoints.
+
+Seeds ROWS rows in each listed table, using awkward text (quotes, control characters,
+DEL, accents, emoji, NULLs) and datetimes with and without microseconds. Every list URL
+is served with each rows encoder (stdlib, orjson), and each body must equal the one
+the ORM + jsonify implementation kept below produces. benchmark_read_layer.py times
+both paths on the same data.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from flask import jsonify
+
+from app import db
+from app.models import Pickup, Inventory, DistributedItem, FeedbackReview, DistributionCenter
+from app.rows import stdlib_encode_rows, orjson_encode_rows
+
+ROWS = 500
+
+TEXT = [
+    "plain", 'quote " and \\ backslash', "tab\tnew\nline\r", "ctrl \x01\x1f del \x7f", "Zoë café",
+    "emoji \U0001F600 ⚽", "separators   ", "<script>&amp;</script>", "", None,
+]
+
+
+# -- the implementations the read layer replaced --------------------------------
+def legacy_pickups(donor_store_id=None):
+    query = Pickup.query.filter_by(donor_store_id=donor_store_id) if donor_store_id else Pickup.query
+    return jsonify([{
+        "pickup_id": p.pickup_id,
+        "donor_store_id": p.donor_store_id,
+        "scheduled_date": p.scheduled_date.isoformat(),
+        "pickup_address": p.pickup_address,
+        "contact_person": p.contact_person,
+        "contact_phone": p.contact_phone,
+        "status": p.status
+    } for p in query.order_by(Pickup.scheduled_date.desc()).all()])
+
+
+def legacy_inventory(center_id=None):
+    query = Inventory.query
+    if center_id:
+        query = query.filter(Inventory.center_id == center_id)
+    return jsonify([{"inventory_id": r.inventory_id, "center_id": r.center_id, "item_name": r.item_name, "quantity": r.quantity,
+                     "last_updated": r.last_updated.isoformat() if r.last_updated else None} for r in query.all()])
+
+
+def legacy_distributed_items():
+    rows = DistributedItem.query.order_by(DistributedItem.distribution_date.desc()).all()
+    return jsonify([{"distribution_id": r.distribution_id, "center_id": r.center_id, "npo_id": r.npo_id, "item_name": r.item_name,
+                     "item_quantity": r.item_quantity, "distribution_date": r.distribution_date.isoformat()} for r in rows])
+
+
+def legacy_feedback(npo_id=None):
+    q = FeedbackReview.query
+    if npo_id:
+        q = q.filter_by(npo_id=npo_id)
+    rows = q.order_by(FeedbackReview.review_date.desc()).all()
+    return jsonify([{"review_id": r.review_id, "donor_store_id": r.donor_store_id, "npo_id": r.npo_id, "rating": r.rating,
+                     "comments": r.comments, "review_date": r.review_date.isoformat()} for r in rows])
+
+
+def legacy_centers():
+    rows = DistributionCenter.query.order_by(DistributionCenter.created_at.desc()).all()
+    return jsonify([{"center_id": r.center_id, "center_name": r.center_name, "address": r.address, "city": r.city,
+                     "state": r.state, "zip_code": r.zip_code, "country": r.country} for r in rows])
+
+
+def seed(rows, donor_id, npo_id):
+    start = datetime(2024, 1, 1)
+
+    def when(i):
+        # every third timestamp has no microseconds: isoformat() drops them
+        return start + timedelta(seconds=i * 37, microseconds=0 if i % 3 == 0 else i % 999983)
+
+    def text(i):
+        return TEXT[i % len(TEXT)]
+
+    n_centers = max(rows // 100, 1)
+    db.session.execute(db.insert(DistributionCenter), [
+        {"center_name": f"Center {i} {text(i) or ''}", "address": text(i + 1), "city": text(i + 2), "state": text(i + 3),
+         "zip_code": text(i + 4), "country": text(i + 5), "created_at": when(i)} for i in range(n_centers)])
+    center_ids = [c for (c,) in db.session.query(DistributionCenter.center_id)]
+    db.session.execute(db.insert(Pickup), [
+        {"donor_store_id": donor_id if i % 2 else None, "scheduled_date": when(i), "pickup_address": text(i),
+         "contact_person": text(i + 1), "contact_phone": text(i + 2), "status": ("Scheduled", "Completed", None)[i % 3]}
+        for i in range(rows)])
+    db.session.execute(db.insert(Inventory), [
+        {"center_id": center_ids[i % len(center_ids)], "item_name": f"{text(i) or 'item'} {i}", "quantity": i % 50,
+         "last_updated": when(i) if i % 7 else None} for i in range(rows)])
+    db.session.execute(db.insert(DistributedItem), [
+        {"center_id": center_ids[i % len(center_ids)], "npo_id": npo_id if i % 2 else None, "item_name": text(i) or "item",
+         "item_quantity": i % 9, "distribution_date": when(i)} for i in range(rows)])
+    db.session.execute(db.insert(FeedbackReview), [
+        {"donor_store_id": donor_id, "npo_id": npo_id if i % 2 else None, "rating": 1 + i % 5, "comments": text(i),
+         "review_date": when(i)} for i in range(rows)])
+    db.session.commit()
+
+
+# (url, legacy implementation) per list URL; {donor} and {npo} are the sample accounts
+CASES = [
+    ("/api/pickups", lambda ids: legacy_pickups()),
+    ("/api/pickups?donor_store_id={donor}", lambda ids: legacy_pickups(ids["donor"])),
+    ("/api/pickups/{donor}", lambda ids: legacy_pickups(ids["donor"])),
+    ("/api/inventory", lambda ids: legacy_inventory()),
+    ("/api/inventory?center_id=1", lambda ids: legacy_inventory(1)),
+    ("/api/distributed_items", lambda ids: legacy_distributed_items()),
+    ("/api/feedback", lambda ids: legacy_feedback()),
+    ("/api/feedback?npo_id={npo}", lambda ids: legacy_feedback(ids["npo"])),
+    ("/api/centers", lambda ids: legacy_centers()),
+]
+
+
+@pytest.fixture(scope="module")
+def seeded(app, accounts):
+    donor_id, npo_id = accounts
+    with app.app_context():
+        seed(ROWS, donor_id, npo_id)
+    return {"donor": donor_id, "npo": npo_id}
+
+
+@pytest.fixture(params=["stdlib", "orjson"])
+def encoder(request):
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+        return orjson_encode_rows
+    return stdlib_encode_rows
+
+
+@pytest.mark.parametrize("url, legacy", CASES, ids=[url for url, _ in CASES])
+def test_matches_orm_and_jsonify(app, client, seeded, encoder, url, legacy):
+    url = url.format(**seeded)
+    with app.test_request_context(url):
+        expected = legacy(seeded).get_data()
+    app.extensions["rows_encoder"] = encoder
+    assert client.get(url).get_data() == expected
@@ -0,0 +1,119 @@
+# tests/test_write_queue.py
+"""
+A write_queue batch has its side effects only once it commits.
+
+One group commit goes through the write queue (WRITE_QUEUE_ENABLED). Two jobs insert
+a row, notify() a user and queue a notification. Between them sits a job that does the
+same and then fails. Every job runs in its own SAVEPOINT, and SQLAlchemy fires
+after_commit / after_rollback for those too. So the test records three side effects:
+change events reaching the broker, cache versions being bumped, and the notification
+worker being woken. Each must happen after the batch commits, i.e. once a second
+connection can see the batch's rows. The failed job's event must be dropped, and the
+other jobs' events must survive its rollback.
+"""
+import sqlite3
+
+import pytest
+
+from app import db
+from app.cache import MemoryCache
+from app.events import MemoryBroker, notify
+from app.models import DistributionCenter
+from app.outbox import enqueue_notification
+
+COMMITTED = ("first", "last")
+
+
+def batch_committed(path):
+    with sqlite3.connect(path) as conn:
+        rows = conn.execute("SELECT COUNT(*) FROM distribution_centers WHERE center_name IN (?, ?)", COMMITTED).fetchone()[0]
+    return rows == len(COMMITTED)
+
+
+class RecordingBroker(MemoryBroker):
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        self.published = []  # (event, batch committed at the time)
+
+    def publish(self, channel, event, data):
+        self.published.append((event, batch_committed(self.path)))
+        return super().publish(channel, event, data)
+
+
+class RecordingCache(MemoryCache):
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        self.bumped = []  # (key, batch committed at the time)
+
+    def incr(self, key):
+        self.bumped.append((key, batch_committed(self.path)))
+        return super().incr(key)
+
+
+class JobFailed(Exception):
+    pass
+
+
+def job(name, fail=False):
+    def fn():
+        center = DistributionCenter(center_name=name, city="Pretoria")
+        db.session.add(center)
+        db.session.flush()
+        notify(1, name)
+        enqueue_notification('stock_available', center.center_id, f"{name} opened")
+        if fail:
+            raise JobFailed(name)
+        return name
+    return fn
+
+
+@pytest.fixture
+def batch(tmp_path, make_app):
+    """Three jobs (the middle one failing) sent through one group commit; returns (app, path, broker, cache, woken, results)."""
+    path = str(tmp_path / "app.db")
+    broker, cache = RecordingBroker(path), RecordingCache(path)
+    # a wide batch window so the three jobs below land in one group commit
+    app = make_app(seed=False, WRITE_QUEUE_ENABLED=True, WRITE_BATCH_WINDOW_MS=500, EVENT_BROKER=broker, RESPONSE_CACHE_BACKEND=cache)
+    cache.bumped.clear()
+
+    worker = app.extensions['notification_worker']
+    woken = []
+    worker_wake = worker.wake
+    worker.wake = lambda: (woken.append(batch_committed(path)), worker_wake())
+
+    write_queue = app.extensions['write_queue']
+    futures = [write_queue.submit(job("first")), write_queue.submit(job("failing", fail=True)),
+               write_queue.submit(job("last"))]
+    results = []
+    for future in futures:
+        try:
+            results.append(future.result(timeout=10))
+        except JobFailed:
+            results.append(None)
+    return app, path, broker, cache, woken, results
+
+
+def test_failed_job_rolls_back_alone(batch):
+    app, path, *_, results = batch
+    assert app.extensions['write_queue'].batches == 1
+    assert results == ["first", None, "last"]
+    with sqlite3.connect(path) as conn:
+        names = [r[0] for r in conn.execute("SELECT center_name FROM distribution_centers ORDER BY center_id")]
+    assert names == list(COMMITTED)
+
+
+def test_side_effects_follow_the_commit(batch):
+    _, _, broker, cache, woken, _ = batch
+    assert sorted(broker.published) == [(name, True) for name in COMMITTED]
+    assert cache.bumped and all(committed for _, committed in cache.bumped)
+    assert woken == [True]
+
+
+def test_committed_notifications_are_delivered(batch):
+    app = batch[0]
+    worker = app.extensions['notification_worker']
+    with app.app_context():
+        assert worker.drain() == len(COMMITTED)
+    assert not worker.counts['failed']
@@ -0,0 +1,17 @@
+# wsgi.py
+"""
+WSGI entry point for production servers, pre-fork ones included:
+
+    flask --app wsgi init-db                      # once, before the first start
+    gunicorn --workers 4 --preload wsgi:app
+
+APP_CONFIG picks the create_app() preset (default production).
+"""
+import gc
+
+from app import create_app
+
+app = create_app()
+# Everything built so far lives as long as the process. Frozen, the collector never walks it,
+# so workers forked from a preloaded master keep sharing those pages instead of copying them.
+gc.freeze()